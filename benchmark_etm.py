@@ -0,0 +1,231 @@
+#! /usr/bin/env python3
+"""
+Headless latency benchmark for the Textual view.
+
+DynamicViewApp is driven through Textual's run_test/Pilot against a synthetic
+database created by make_examples and the time from each key press until the
+app has settled is recorded. Settled means that no navigation update or
+controller fetch is pending and the screen has been refreshed.
+
+    python benchmark_etm.py                       # 10,000 records, every scenario
+    python benchmark_etm.py --items 2000 -o out.json weeks find
+    python benchmark_etm.py --db my.db --repeat 5
+
+The report is printed, or written to --output, as JSON: for each action the
+count, total, mean, p50, p95, p99 and max latency in milliseconds. Run with
+ETM_INSTRUMENT=1 to include the controller, model and view spans as well.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import random
+import sys
+import tempfile
+from time import perf_counter
+
+from etm.controller import Controller
+from etm.instrument import Instrumentation, instrumentation
+from etm.view import (
+    DynamicViewApp,
+    FullScreenList,
+    ScrollableList,
+    SearchScreen,
+    WeeksScreen,
+)
+from make_examples import make_examples
+
+# Seconds to wait for the app to settle before giving up on an action
+SETTLE_TIMEOUT = 30.0
+
+# Search term matching every generated record, whose details end with #lorem
+FIND_TERM = "lorem"
+
+
+async def settle(app: DynamicViewApp, pilot, done=None):
+    """
+    Wait until the app is no longer busy and done(), if given, is true.
+    """
+    start = perf_counter()
+    while True:
+        await pilot.pause()
+        if not app.busy and (done is None or done()):
+            return
+        if perf_counter() - start > SETTLE_TIMEOUT:
+            raise TimeoutError("the app did not settle")
+        await asyncio.sleep(0.001)
+
+
+async def timed_press(latencies, name, app, pilot, *keys, done=None):
+    """Press keys and record the time until the app settles as the action name."""
+    start = perf_counter()
+    await pilot.press(*keys)
+    await settle(app, pilot, done)
+    latencies.record(name, perf_counter() - start)
+
+
+async def weeks(latencies, app, pilot, repeat):
+    """Page forward 52 weeks and back again, one week per key press."""
+    for _ in range(repeat):
+        for key, name in (("right", "weeks.next_week"), ("left", "weeks.previous_week")):
+            for _ in range(52):
+                await timed_press(latencies, name, app, pilot, key)
+        await timed_press(latencies, "weeks.next_period", app, pilot, "shift+right")
+        await timed_press(latencies, "weeks.current_period", app, pilot, "space")
+
+
+async def open_list(latencies, name, app, pilot, *keys):
+    await timed_press(
+        latencies,
+        name,
+        app,
+        pilot,
+        *keys,
+        done=lambda: isinstance(app.screen, FullScreenList),
+    )
+
+
+async def close_list(app, pilot):
+    app.pop_screen()
+    await settle(app, pilot, lambda: isinstance(app.screen, WeeksScreen))
+
+
+async def lists(latencies, app, pilot, repeat):
+    """Open the next and last instances lists."""
+    for _ in range(repeat):
+        for key, name in (("N", "lists.open_next"), ("L", "lists.open_last")):
+            await open_list(latencies, name, app, pilot, key)
+            await close_list(app, pilot)
+
+
+async def find(latencies, app, pilot, repeat):
+    """
+    Type a term matching every record into Find, one key at a time, and search
+    the results.
+    """
+    for _ in range(repeat):
+        await timed_press(
+            latencies,
+            "find.open",
+            app,
+            pilot,
+            "F",
+            done=lambda: isinstance(app.screen, SearchScreen),
+        )
+        for key in FIND_TERM:
+            await timed_press(latencies, "find.type", app, pilot, key)
+        await timed_press(latencies, "find.enter", app, pilot, "enter")
+        await timed_press(latencies, "find.search", app, pilot, "/", *"item", "enter")
+        await timed_press(latencies, "find.next_match", app, pilot, ">")
+        await timed_press(latencies, "find.clear_search", app, pilot, "escape")
+        await close_list(app, pilot)
+
+
+async def scroll(latencies, app, pilot, repeat):
+    """Page through the next instances list and jump to its end and back."""
+    await open_list(latencies, "scroll.open_next", app, pilot, "N")
+    scrollable_list = app.screen.query_one(ScrollableList)
+    scrollable_list.focus()
+    for _ in range(repeat):
+        for _ in range(10):
+            await timed_press(latencies, "scroll.page_down", app, pilot, "pagedown")
+        await timed_press(
+            latencies,
+            "scroll.end",
+            app,
+            pilot,
+            "end",
+            done=lambda: scrollable_list.scroll_y >= scrollable_list.max_scroll_y,
+        )
+        await timed_press(
+            latencies,
+            "scroll.home",
+            app,
+            pilot,
+            "home",
+            done=lambda: scrollable_list.scroll_y == 0,
+        )
+    await close_list(app, pilot)
+
+
+SCENARIOS = {
+    "weeks": weeks,
+    "lists": lists,
+    "find": find,
+    "scroll": scroll,
+}
+
+
+async def run(db_path: str, scenarios, repeat: int, size) -> dict:
+    latencies = Instrumentation(enabled=True)
+    app = DynamicViewApp(Controller(db_path))
+    async with app.run_test(size=size) as pilot:
+        await settle(app, pilot, lambda: isinstance(app.screen, WeeksScreen))
+        instrumentation.reset()
+        for name in scenarios:
+            await SCENARIOS[name](latencies, app, pilot, repeat)
+        app.exit()
+    report = {"actions": latencies.summary()["spans"]}
+    if instrumentation.enabled:
+        report["instrumentation"] = instrumentation.summary()
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "scenarios",
+        nargs="*",
+        help=f"the scenarios to run from {', '.join(SCENARIOS)}, default all",
+    )
+    parser.add_argument("--db", help="use this database instead of generating one")
+    parser.add_argument("--items", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--width", type=int, default=100)
+    parser.add_argument("--height", type=int, default=40)
+    parser.add_argument("-o", "--output", help="write the JSON report to this file")
+    args = parser.parse_args()
+    unknown = [name for name in args.scenarios if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(unknown)}")
+    output = os.path.abspath(args.output) if args.output else None
+
+    report = {
+        "database": args.db or f"make_examples({args.items}, seed={args.seed})",
+        "size": [args.width, args.height],
+        "repeat": args.repeat,
+    }
+    with tempfile.TemporaryDirectory() as tmpdir:
+        db_path = os.path.abspath(args.db) if args.db else None
+        # log_msg writes to the current working directory
+        os.chdir(tmpdir)
+        # keep progress messages out of the report
+        with contextlib.redirect_stdout(sys.stderr):
+            if db_path is None:
+                random.seed(args.seed)
+                db_path = os.path.join(tmpdir, "benchmark.db")
+                make_examples(db_path, args.items)
+            report.update(
+                asyncio.run(
+                    run(
+                        db_path,
+                        args.scenarios or list(SCENARIOS),
+                        args.repeat,
+                        (args.width, args.height),
+                    )
+                )
+            )
+
+    text = json.dumps(report, indent=2)
+    if output:
+        with open(output, "w") as fo:
+            fo.write(text)
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+#! /usr/bin/env python3
+"""
+Compare the dispatch of tokens to their handlers by Item, through the table of
+Item.handlers, with the token_keys lookup and getattr it replaced over a
+corpus of entries.
+
+    python benchmark_item.py
+    python benchmark_item.py --repeat 20
+
+For each implementation, the best times over --repeat runs are printed as
+JSON: of resolving the handler of every token of the corpus, in nanoseconds
+per token, and of dispatching every token and parsing every entry, in
+microseconds per token and per entry. Most of the time of a token is spent in
+its handler, e.g., in dateutil parsing a date, so the resolution is the
+overhead removed by the table.
+"""
+
+import argparse
+import json
+from time import perf_counter
+
+from etm.item import NO_HANDLER, Item, ParsedToken, ParseDiagnostics
+
+CORPUS = [
+    "- Thanksgiving @s 2010/11/26 ",
+    "* Thanksgiving @s 2010/11/26 @r y &m 11 &w +4TH",
+    "- with alerts @s 2025-03-14 4pm @e 90m @a 30m, 15m, 0m, -1h: d, c, e @d testing alert",
+    "* rdates and exdates @s 2024-08-07 4p @r w &i 2 &w WE @r w &w MO @+ 2024-08-09 2p, 2024-08-16 2p @- 2024-08-21 4p",
+    "* meeting @s 2024-08-07 4pm @r w &i 2 &w WE @t work @+ 2024-08-09 2pm @- 2024-08-21 4pm @t team",
+    "- dog house @s 2024-08-07 4:00pm @t job @j paint &i 4 &p 1, 2 @j buy paint &i 5",
+    "* lunch @s 2025-01-10 12pm @e 1h @a 15m: d @l cafe @d with Bob",
+    "- call the dentist @l phone @t health @d reschedule the cleaning",
+    "% reading notes @t books @d chapters 3 and 4",
+    "* standup @s 2025-01-06 9:30am @e 15m @r w &w MO,TU,WE,TH,FR @l office",
+]
+
+
+class LookupItem(Item):
+    """Item with the dispatch before the table of Item.handlers."""
+
+    def _dispatch_token(self, token, start_pos, end_pos, token_type) -> ParsedToken:
+        span = (start_pos, end_pos)
+        if token_type == "@":
+            self.do_at()
+            self.diagnostics.record(token, span, "do_at")
+            return ParsedToken(token, token_type, True, None)
+        if token_type not in self.token_keys:
+            self.diagnostics.record(
+                token, span, "", False, f"No handler for token: {token}"
+            )
+            return ParsedToken(token, token_type, True, None)
+        method_name = self.token_keys[token_type][2]
+        method = getattr(self, method_name)
+        is_valid, result, sub_tokens = method(token)
+        self.diagnostics.record(token, span, method_name, is_valid, result)
+        if is_valid and token_type in ("r", "j"):
+            is_valid = self._dispatch_sub_tokens(sub_tokens, token_type, result, span)
+        return ParsedToken(token, token_type, is_valid, result)
+
+
+def corpus_tokens(item: Item):
+    """Return (token, start, end, token_type) for the tokens of the corpus."""
+    tokens = []
+    for entry in CORPUS:
+        item.previous_entry = ""
+        item._tokenize(entry)
+        tokens.extend(
+            (token, start, end, item._token_type(token, i))
+            for i, (token, start, end) in enumerate(item.tokens)
+        )
+    return tokens
+
+
+def best_time(run, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        start = perf_counter()
+        run()
+        times.append(perf_counter() - start)
+    return min(times)
+
+
+def time_dispatch(item: Item, tokens, repeat: int) -> float:
+    def run():
+        for token in tokens:
+            item._dispatch_token(*token)
+
+    return best_time(run, repeat)
+
+
+def time_lookup(item: Item, token_types, repeat: int) -> float:
+    """The time of resolving handlers as _dispatch_token did before the table."""
+
+    def run():
+        for token_type in token_types:
+            if token_type in item.token_keys:
+                getattr(item, item.token_keys[token_type][2])
+
+    return best_time(run, repeat)
+
+
+def time_table(item: Item, token_types, repeat: int) -> float:
+    """The time of resolving handlers from the table of Item.handlers."""
+
+    def run():
+        for token_type in token_types:
+            handler, takes_item = item._handlers.get(token_type, NO_HANDLER)
+
+    return best_time(run, repeat)
+
+
+def time_parse(item_class, repeat: int) -> float:
+    diagnostics = ParseDiagnostics()
+
+    def run():
+        for entry in CORPUS:
+            item_class(diagnostics).parse_input(entry)
+
+    return best_time(run, repeat)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--loops", type=int, default=100, help="passes over the corpus per run")
+    args = parser.parse_args()
+
+    diagnostics = ParseDiagnostics()
+    before, after = LookupItem(diagnostics), Item(diagnostics)
+    tokens = corpus_tokens(after) * args.loops
+    per_token = 1e6 / len(tokens)
+    per_entry = 1e6 / len(CORPUS)
+
+    token_types = [token[3] for token in tokens if token[3] != "@"]
+    per_type = 1e9 / len(token_types)
+    report = {
+        "entries": len(CORPUS),
+        "tokens": len(tokens) // args.loops,
+        "repeat": args.repeat,
+        "resolve_ns_per_token": {
+            "before": round(time_lookup(before, token_types, args.repeat) * per_type, 1),
+            "after": round(time_table(after, token_types, args.repeat) * per_type, 1),
+        },
+        "dispatch_us_per_token": {
+            "before": round(time_dispatch(before, tokens, args.repeat) * per_token, 3),
+            "after": round(time_dispatch(after, tokens, args.repeat) * per_token, 3),
+        },
+        "parse_us_per_entry": {
+            "before": round(time_parse(LookupItem, args.repeat) * per_entry, 3),
+            "after": round(time_parse(Item, args.repeat) * per_entry, 3),
+        },
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
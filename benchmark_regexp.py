@@ -0,0 +1,106 @@
+#! /usr/bin/env python3
+"""
+Compare the SQLite REGEXP function of etm.model with the re.search version it
+replaced over a table of synthetic records.
+
+    python benchmark_regexp.py                # 100,000 records
+    python benchmark_regexp.py --records 20000 --repeat 5
+
+For each pattern the query
+
+    SELECT COUNT(*) FROM Records WHERE name REGEXP ? OR details REGEXP ?
+
+is run --repeat times with each implementation and the best time in
+milliseconds and the speedup are printed as JSON.
+"""
+
+import argparse
+import json
+import random
+import re
+import sqlite3
+from time import perf_counter
+
+import lorem
+
+from etm.model import regexp
+
+PATTERNS = [
+    "lorem",  # literal
+    "(?i)LOREM",  # case-insensitive literal
+    r"(?i)dolor\.",  # case-insensitive literal with an escape
+    "consectetur adipisci",  # literal spanning words
+    "^Quiquia",  # anchored
+    r"\bsed\b",  # word boundary
+    "(?i)eius|tempora",  # alternation
+]
+
+
+def regexp_search(pattern, value):
+    """The REGEXP function before the compiled-pattern cache."""
+    try:
+        return re.search(pattern, value) is not None
+    except TypeError:
+        return False  # Handle None values gracefully
+
+
+def make_records(conn: sqlite3.Connection, count: int):
+    conn.execute("CREATE TABLE Records (id INTEGER PRIMARY KEY, name TEXT, details TEXT)")
+    sentences = [lorem.sentence() for _ in range(500)]
+    paragraphs = [lorem.paragraph() for _ in range(200)]
+    conn.executemany(
+        "INSERT INTO Records (name, details) VALUES (?, ?)",
+        (
+            (
+                random.choice(sentences)[:40],
+                random.choice(paragraphs) if random.random() < 0.8 else None,
+            )
+            for _ in range(count)
+        ),
+    )
+    conn.commit()
+
+
+def best_time(conn: sqlite3.Connection, pattern: str, repeat: int):
+    times = []
+    for _ in range(repeat):
+        start = perf_counter()
+        count = conn.execute(
+            "SELECT COUNT(*) FROM Records WHERE name REGEXP ? OR details REGEXP ?",
+            (pattern, pattern),
+        ).fetchone()[0]
+        times.append(perf_counter() - start)
+    return count, round(min(times) * 1000, 3)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--records", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    before = sqlite3.connect(":memory:")
+    make_records(before, args.records)
+    before.create_function("REGEXP", 2, regexp_search)
+    after = sqlite3.connect(":memory:")
+    before.backup(after)
+    after.create_function("REGEXP", 2, regexp, deterministic=True)
+
+    report = {"records": args.records, "repeat": args.repeat, "patterns": {}}
+    for pattern in PATTERNS:
+        count_before, ms_before = best_time(before, pattern, args.repeat)
+        count_after, ms_after = best_time(after, pattern, args.repeat)
+        assert count_before == count_after, pattern
+        report["patterns"][pattern] = {
+            "matches": count_after,
+            "before_ms": ms_before,
+            "after_ms": ms_after,
+            "speedup": round(ms_before / ms_after, 2) if ms_after else None,
+        }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -16,12 +16,14 @@ import re
 import inspect
 from rich.theme import Theme
 from rich import box
-from typing import List, Tuple, Dict
+from rich.markup import escape
+from typing import Dict, Iterator, List, Optional, Tuple, Union
 from bisect import bisect_left, bisect_right
 
 from prompt_toolkit.key_binding import KeyBindings
 from prompt_toolkit.keys import Keys
 from prompt_toolkit.shortcuts import PromptSession
+import copy
 import string
 import shutil
 import subprocess
@@ -29,6 +31,9 @@ import shlex
 from typing import Literal
 
 from .model import DatabaseManager
+from .query import parse_find_query
+from .rows import FittedRows, ListRows, PagedRows, Row, RowSource
+from .instrument import timed
 
 from .common import truncate_string, format_extent
 from .shared import (
@@ -56,6 +61,10 @@ PASTDUE_COLOR = NAMED_COLORS["DarkOrange"]
 BEGIN_COLOR = NAMED_COLORS["Gold"]
 INBOX_COLOR = NAMED_COLORS["OrangeRed"]
 TODAY_COLOR = NAMED_COLORS["Tomato"]
+# goals behind, about on and ahead of schedule for the week
+GOAL_BEHIND_COLOR = NAMED_COLORS["Tomato"]
+GOAL_PACE_COLOR = NAMED_COLORS["Gold"]
+GOAL_AHEAD_COLOR = NAMED_COLORS["LightSkyBlue"]
 SELECTED_BACKGROUND = "#4e4e4e"
 # SELECTED_BACKGROUND = "#3b3b3b"
 # SELECTED_BACKGROUND = "#3d3d3d"
@@ -87,6 +96,9 @@ ONEDAY = timedelta(days=1)
 ONEWK = 7 * ONEDAY
 alpha = [x for x in string.ascii_lowercase]
 
+# Records found between the row sources yielded by find_records_stream
+FIND_BATCH = 500
+
 TYPE_TO_COLOR = {
     "*": EVENT_COLOR,  # event
     "-": AVAILABLE_COLOR,  # available task
@@ -339,6 +351,18 @@ def get_busy_bar(events):
 
 
 class Controller:
+    # The attributes set by the display methods, see for_worker and adopt
+    DISPLAY_STATE = (
+        "tag_to_id",
+        "list_tag_to_id",
+        "yrwk_to_details",
+        "rownum_to_yrwk",
+        "rownum_to_details",
+        "selected_week",
+        "afill",
+        "find_results",
+    )
+
     def __init__(self, database_path: str):
         # Initialize the database manager
         self.db_manager = DatabaseManager(database_path)
@@ -351,6 +375,49 @@ class Controller:
         )  # Currently selected week
         self.tag_to_id = {}  # Maps tag numbers to event IDs
         self.list_tag_to_id = {}  # Maps tag numbers to event IDs
+        # (query, events) of the last find, see find_records_stream
+        self.find_results = ("", None)
+
+    def for_worker(self) -> "Controller":
+        """
+        Return a copy of the controller for a worker thread. The copy reads
+        through its own read-only connection, db_manager.reader(), and has its
+        own copies of the tag and week maps, so that the results of a worker
+        whose output is discarded never reach this controller. Call close() on
+        the copy when the worker is done, unless it returned a row source that
+        still formats rows through it, and adopt() to keep its results.
+        """
+        worker = copy.copy(self)
+        worker.db_manager = self.db_manager.reader()
+        worker.tag_to_id = {k: dict(v) for k, v in self.tag_to_id.items()}
+        worker.list_tag_to_id = {k: dict(v) for k, v in self.list_tag_to_id.items()}
+        worker.yrwk_to_details = dict(self.yrwk_to_details)
+        worker.rownum_to_yrwk = dict(self.rownum_to_yrwk)
+        return worker
+
+    def adopt(self, worker: "Controller"):
+        """Take over the display state of a copy from for_worker."""
+        for name in self.DISPLAY_STATE:
+            if hasattr(worker, name):
+                setattr(self, name, getattr(worker, name))
+
+    def close(self):
+        self.db_manager.close()
+
+    def interrupt(self):
+        """Abort the query in progress, for a copy from for_worker."""
+        self.db_manager.interrupt()
+
+    def extend_period(self, start_date: datetime):
+        """
+        Generate the datetimes needed to display the 4-week period starting with
+        start_date. This writes to the database, so must be called before
+        get_grid_and_list is called on a copy from for_worker.
+        """
+        current_start_year, current_start_week, _ = start_date.isocalendar()
+        self.db_manager.extend_datetimes_for_weeks(
+            current_start_year, current_start_week, 4
+        )
 
     def get_record_details_as_string(self, record_id):
         """
@@ -363,15 +430,7 @@ class Controller:
             str: A formatted string with the record's details.
         """
         # log_msg(f"Fetching details for record ID {record_id}")
-        self.db_manager.cursor.execute(
-            """
-            SELECT id, type, name, details, rrulestr, extent
-            FROM Records
-            WHERE id = ?
-            """,
-            (record_id,),
-        )
-        record = self.db_manager.cursor.fetchone()
+        record = self.db_manager.get_record(record_id)
         # log_msg(f"Record: {record = }")
 
         if not record:
@@ -385,6 +444,13 @@ class Controller:
         # log_msg(f"Content: {content}")
         return content
 
+    def prefetch_details(self, tag_to_id: Dict[str, int]):
+        """
+        Warm the record cache for the records listed in tag_to_id so that pressing
+        one of the tags displays its details without another query.
+        """
+        self.db_manager.prefetch_records(tag_to_id.values())
+
     def populate_alerts(self):
         self.db_manager.populate_alerts()
 
@@ -427,26 +493,28 @@ class Controller:
             # need command to execute command with arguments
             self.db_manager.mark_alert_executed(alert_id)
 
-    def get_active_alerts(self, width: int = 70):
+    @timed("controller.get_active_alerts_rows")
+    def get_active_alerts_rows(self) -> RowSource:
+        """
+        Return the remaining alerts for today as rows whose name column is
+        fitted to the width of the list.
+        """
         # now_fmt = datetime.now().strftime("%A, %B %-d %H:%M:%S")
         alerts = self.db_manager.get_active_alerts()
         header = "Remaining alerts for today"
         results = [header]
         if not alerts:
             results.append(f" [{HEADER_COLOR}]none scheduled[/{HEADER_COLOR}]")
-            return results
-
-        table = Table(title="Remaining alerts for today", expand=True, box=HEAVY_EDGE)
-        table.add_column("row", justify="center", width=3, style="dim")
-        table.add_column("cmd", justify="center", width=3)
-        table.add_column("time", justify="left", width=24)
-        table.add_column("name", width=25, overflow="ellipsis", no_wrap=True)
+            return ListRows(results)
 
-        # 4*2 + 2*3 + 7 + 14 = 35 => name width = width - 35
-        name_width = width - 35
+        # the name column takes the width left over by the others
         results.append(
-            # f"{'row':^3}  {'cmd':^3}  {'time':^24}  {'name':^{name_width}}",
-            f"[bold]{'row':^3}  {'cmd':^3}  {'alert':^7}  {'event time':^14}  {'name':^{name_width}}[/bold]",
+            Row(
+                f"[bold]{'row':^3}  {'cmd':^3}  {'alert':^7}  {'event time':^14}  ",
+                "name",
+                "[/bold]",
+                align="^",
+            )
         )
 
         self.list_tag_to_id.setdefault("alerts", {})
@@ -472,18 +540,107 @@ class Controller:
             tdtime = format_timedelta(start_datetime - trigger_datetime)
             sttime = format_datetime(start_datetime)
             # starting = f"{format_datetime(trigger_datetime):<7} {format_timedelta(start_datetime - trigger_datetime):>4} → {format_datetime(start_datetime)}"
-            name = truncate_string(record_name, name_width)
-            row = "  ".join(
+            before = "  ".join(
                 [
                     f"[dim]{tag:^3}[/dim]",
                     f"[bold yellow]{alert_name:^3}[/bold yellow]",
                     f"[bold yellow]{trtime:<7}[/bold yellow]",
                     f"[{EVENT_COLOR}]{tdtime:>4} → {sttime:<7}[/{EVENT_COLOR}]",
-                    f"[{AVAILABLE_COLOR}]{name:<{name_width}}[/{AVAILABLE_COLOR}]",
+                    f"[{AVAILABLE_COLOR}]",
                 ]
             )
-            results.append(row)
-        return results
+            results.append(Row(before, record_name, f"[/{AVAILABLE_COLOR}]"))
+        self.prefetch_details(self.list_tag_to_id["alerts"])
+        return FittedRows(ListRows(results))
+
+    @timed("controller.get_jobs_rows")
+    def get_jobs_rows(self) -> RowSource:
+        """
+        Return the available jobs as rows under a heading for each location,
+        from the Jobs table rather than by parsing the tasks.
+        """
+        jobs = self.db_manager.get_available_jobs()
+        results = [f"Available jobs ({len(jobs)})"]
+        tag_to_id = self.list_tag_to_id["jobs"] = {}
+        if not jobs:
+            results.append(f" [{HEADER_COLOR}]Nothing found[/{HEADER_COLOR}]")
+            return ListRows(results)
+
+        self.afill = 1 if len(jobs) <= 26 else 2 if len(jobs) <= 676 else 3
+        location = None
+        for indx, (record_id, _, task_name, job_name, job_location) in enumerate(jobs):
+            if job_location != location:
+                location = job_location
+                heading = escape(location) if location else "no location"
+                results.append(
+                    f"[not bold][{HEADER_COLOR}]{heading}[/{HEADER_COLOR}][/not bold]"
+                )
+            tag = indx_to_tag(indx, self.afill)
+            tag_to_id[tag] = record_id
+            results.append(
+                Row(
+                    f"  [dim]{tag}[/dim]  [{AVAILABLE_COLOR}]",
+                    f"{job_name}: {task_name}",
+                    f"[/{AVAILABLE_COLOR}]",
+                )
+            )
+        return FittedRows(ListRows(results))
+
+    @timed("controller.get_goals_rows")
+    def get_goals_rows(self) -> RowSource:
+        """
+        Return the status of the goals in the current week as rows, each
+        "done/quota+needed (average)", with the active goals colored by
+        comparing done/quota with the fraction of the week that has passed.
+        """
+        goals = self.db_manager.get_goal_status()
+        results = [f"Goals ({len(goals)})"]
+        tag_to_id = self.list_tag_to_id["goals"] = {}
+        if not goals:
+            results.append(f" [{HEADER_COLOR}]Nothing found[/{HEADER_COLOR}]")
+            return ListRows(results)
+
+        weekday = datetime.now().isoweekday()
+        self.afill = 1 if len(goals) <= 26 else 2 if len(goals) <= 676 else 3
+        state = "active"
+        for indx, goal in enumerate(goals):
+            if goal.state != state:
+                state = goal.state
+                results.append(
+                    f"[not bold][{HEADER_COLOR}]{state}[/{HEADER_COLOR}][/not bold]"
+                )
+            if goal.state == "ended":
+                color = FINISHED_COLOR
+            elif goal.state == "inactive":
+                color = WAITING_COLOR
+            elif goal.done / goal.quota < (weekday - 1) / 7:
+                color = GOAL_BEHIND_COLOR
+            elif goal.done / goal.quota < weekday / 7:
+                color = GOAL_PACE_COLOR
+            else:
+                color = GOAL_AHEAD_COLOR
+            progress = f"{goal.done}/{abs(goal.quota)}"
+            if goal.needed:
+                progress += f"+{goal.needed}"
+            tag = indx_to_tag(indx, self.afill)
+            tag_to_id[tag] = goal.record_id
+            results.append(
+                Row(
+                    f"  [dim]{tag}[/dim]  [{color}]",
+                    f"{progress} ({goal.average:.1f}) {goal.name}",
+                    f"[/{color}]",
+                )
+            )
+        return FittedRows(ListRows(results))
+
+    @timed("controller.get_active_alerts")
+    def get_active_alerts(self, width: int = 70):
+        """
+        Return the remaining alerts for today as markup strings fitted to width.
+        """
+        rows = self.get_active_alerts_rows()
+        rows.set_width(width)
+        return list(rows)
 
     def get_record_details(self, record_id):
         """
@@ -496,15 +653,7 @@ class Controller:
             str: A formatted string with the record's details.
         """
         # log_msg(f"Fetching details for record ID {record_id}")
-        self.db_manager.cursor.execute(
-            """
-            SELECT id, type, name, details, rrulestr, extent
-            FROM Records
-            WHERE id = ?
-            """,
-            (record_id,),
-        )
-        record = self.db_manager.cursor.fetchone()
+        record = self.db_manager.get_record(record_id)
         # log_msg(f"Record: {record = }")
 
         if not record:
@@ -531,7 +680,7 @@ class Controller:
         if view == "week":
             log_msg(f"{self.selected_week = }")
             tag_to_id = self.tag_to_id[selected_week]
-        elif view in ["next", "last", "find"]:
+        elif view in ["next", "last", "find", "jobs", "goals"]:
             tag_to_id = self.list_tag_to_id[view]
         elif view == "alerts":
             tag_to_id = self.list_tag_to_id["alerts"]
@@ -551,62 +700,27 @@ class Controller:
 
         return [f"There is no item corresponding to tag '{tag}'."]
 
-    def generate_table(self, start_date, selected_week, grouped_events):
+    @timed("controller.generate_grid")
+    def generate_grid(self, start_date, grouped_events):
         """
-        Generate a Rich table displaying events for the specified 4-week period.
+        Generate the title and the cells for the specified 4-week period.
+
+        Returns the title and a list with one (yr_wk, cells) tuple for each
+        week where cells holds the markup for the 7 days of the week. The
+        selected week is not highlighted - see generate_table.
         """
-        # self.selected_week = selected_week
-        selected_week = self.selected_week
         end_date = start_date + timedelta(weeks=4) - ONEDAY  # End on a Sunday
-        start_date = start_date
         today_year, today_week, today_weekday = datetime.now().isocalendar()
-        tomorrow_year, tomorrow_week, tomorrow_day = (
-            datetime.now() + ONEDAY
-        ).isocalendar()
         title = format_date_range(start_date, end_date)
 
-        table = Table(
-            show_header=True,
-            header_style=HEADER_STYLE,
-            show_lines=True,
-            style=FRAME_COLOR,
-            expand=True,
-            box=box.SQUARE,
-            # title=title,
-            # title_style="bold",
-        )
-
-        weekdays = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
-        # table.add_column(f"[{DIM_COLOR}]Wk[/{DIM_COLOR}]", justify="center", width=3)
-        for day in weekdays:
-            table.add_column(
-                day,
-                justify="center",
-                style=DAY_COLOR,
-                width=8,
-                ratio=1,
-            )
-
         self.rownum_to_details = {}  # Reset for this period
         current_date = start_date
         weeks = []
-        row_num = 0
         while current_date <= end_date:
             yr_wk = current_date.isocalendar()[:2]
             iso_year, iso_week = yr_wk
-            if yr_wk not in weeks:
-                weeks.append(yr_wk)
-            # row_num += 1
             row_num = f"{yr_wk[1]:>2}"
             self.rownum_to_yrwk[row_num] = yr_wk
-            # row = [f"[{DIM_COLOR}]{row_num}[{DIM_COLOR}]\n"]
-            SELECTED = yr_wk == selected_week
-            # row = (
-            #     [f"[{SELECTED_COLOR}]{row_num}[/{SELECTED_COLOR}]\n"]
-            #     if SELECTED
-            #     else [f"[{DIM_COLOR}]{row_num}[{DIM_COLOR}]\n"]
-            # )
-            # row = [f"[{DIM_COLOR}]{row_num}[{DIM_COLOR}]\n"]
             row = []
 
             for weekday in range(1, 8):  # ISO weekdays: 1 = Monday, 7 = Sunday
@@ -622,14 +736,8 @@ class Controller:
                     and iso_week == today_week
                     and weekday == today_weekday
                 )
-                tomorrow = (
-                    iso_year == tomorrow_year
-                    and iso_week == tomorrow_week
-                    and weekday == tomorrow_day
-                )
 
                 mday = f"{monthday_str:>2}"
-                # mday = monthday_str
                 if today:
                     mday = (
                         f"[bold][{TODAY_COLOR}]{monthday_str:>2}[/{TODAY_COLOR}][/bold]"
@@ -638,7 +746,6 @@ class Controller:
                 if events:
                     tups = [event_tuple_to_minutes(ev[0], ev[1]) for ev in events]
                     aday_str, busy_str = get_busy_bar(tups)
-                    # log_msg(f"{date = }, {tups = }, {busy_str = }")
                     if aday_str:
                         row.append(f"{aday_str + mday + aday_str:>4}{busy_str}")
                     else:
@@ -646,31 +753,83 @@ class Controller:
                 else:
                     row.append(f"{mday}\n")
 
-                if SELECTED:
-                    # row = [
-                    #     f"[{SELECTED_COLOR}]{cell}[/{SELECTED_COLOR}]" for cell in row
-                    # ]
-                    # row = [
-                    #     f"[{DIM_COLOR}]{row[0]}[{DIM_COLOR}]",
-                    # ] + [
-                    #     f"[{SELECTED_COLOR}]{cell}[/{SELECTED_COLOR}]"
-                    #     for cell in row[1:]
-                    # ]
-                    row = [
-                        f"[{SELECTED_COLOR}]{cell}[/{SELECTED_COLOR}]" for cell in row
-                    ]
-            if SELECTED:
-                # table.add_row(*row)
-                table.add_row(*row, style=f"on {SELECTED_BACKGROUND}")
-                # table.add_row(Panel.fit(row))
+            weeks.append((yr_wk, row))
+            self.yrwk_to_details[yr_wk] = self.get_week_details((iso_year, iso_week))
+            current_date += timedelta(weeks=1)
+
+        return title, weeks
+
+    @timed("controller.generate_table")
+    def generate_table(self, start_date, selected_week, grouped_events):
+        """
+        Generate a Rich table displaying events for the specified 4-week period.
+        """
+        # self.selected_week = selected_week
+        selected_week = self.selected_week
+        title, weeks = self.generate_grid(start_date, grouped_events)
+
+        table = Table(
+            show_header=True,
+            header_style=HEADER_STYLE,
+            show_lines=True,
+            style=FRAME_COLOR,
+            expand=True,
+            box=box.SQUARE,
+            # title=title,
+            # title_style="bold",
+        )
+
+        weekdays = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+        for day in weekdays:
+            table.add_column(
+                day,
+                justify="center",
+                style=DAY_COLOR,
+                width=8,
+                ratio=1,
+            )
 
+        for yr_wk, row in weeks:
+            if yr_wk == selected_week:
+                row = [f"[{SELECTED_COLOR}]{cell}[/{SELECTED_COLOR}]" for cell in row]
+                table.add_row(*row, style=f"on {SELECTED_BACKGROUND}")
             else:
                 table.add_row(*row)
-            self.yrwk_to_details[yr_wk] = self.get_week_details((iso_year, iso_week))
-            current_date += timedelta(weeks=1)
 
         return title, table
 
+    def _prepare_period(self, start_date: datetime, selected_week: Tuple[int, int]):
+        """
+        Make sure the datetimes for the 4-week period starting with start_date
+        have been generated and return the events grouped by year, week and
+        weekday.
+        """
+        log_msg(f"Getting table for {start_date = }, {selected_week = }")
+        self.selected_week = selected_week
+        self.extend_period(start_date)
+        return self.db_manager.process_events(
+            start_date, start_date + timedelta(weeks=4)
+        )
+
+    def _selected_details(self, selected_week: Tuple[int, int]):
+        if selected_week in self.yrwk_to_details:
+            self.prefetch_details(self.tag_to_id.get(selected_week, {}))
+            return self.yrwk_to_details[selected_week]
+        return "No week selected."
+
+    @timed("controller.get_grid_and_list")
+    def get_grid_and_list(self, start_date: datetime, selected_week: Tuple[int, int]):
+        """
+        As get_table_and_list but return the (yr_wk, cells) rows from
+        generate_grid in place of the rich table, for views that render the
+        grid themselves.
+        """
+        grouped_events = self._prepare_period(start_date, selected_week)
+        title, weeks = self.generate_grid(start_date, grouped_events)
+        self.selected_week = selected_week
+        return title, weeks, self._selected_details(selected_week)
+
+    @timed("controller.get_table_and_list")
     def get_table_and_list(self, start_date: datetime, selected_week: Tuple[int, int]):
         """
         - rich_display(start_datetime, selected_week)
@@ -682,31 +841,15 @@ class Controller:
             - return table
             - return details for selected_week
         """
-        # today_year, today_week, today_weekday = datetime.now().isocalendar()
-        # tomorrow_year, tomorrow_week, tomorrow_day = (
-        #     datetime.now() + ONEDAY
-        # ).isocalendar()
-        log_msg(f"Getting table for {start_date = }, {selected_week = }")
-        self.selected_week = selected_week
-        current_start_year, current_start_week, _ = start_date.isocalendar()
-        self.db_manager.extend_datetimes_for_weeks(
-            current_start_year, current_start_week, 4
-        )
-        grouped_events = self.db_manager.process_events(
-            start_date, start_date + timedelta(weeks=4)
-        )
+        grouped_events = self._prepare_period(start_date, selected_week)
 
         # terminal_width = shutil.get_terminal_size().columns
         # Generate the table
         title, table = self.generate_table(start_date, selected_week, grouped_events)
         log_msg(f"Generated table for {title}, {selected_week = }")
+        return title, table, self._selected_details(selected_week)
 
-        if selected_week in self.yrwk_to_details:
-            details = self.yrwk_to_details[selected_week]
-        else:
-            details = "No week selected."
-        return title, table, details
-
+    @timed("controller.get_week_details")
     def get_week_details(self, yr_wk):
         """
         Fetch and format details for a specific week.
@@ -723,7 +866,6 @@ class Controller:
         events = self.db_manager.get_events_for_period(start_datetime, end_datetime)
         # log_msg(f"from get_events_for_period:\n{events = }")
         this_week = format_date_range(start_datetime, end_datetime - ONEDAY)
-        terminal_width = shutil.get_terminal_size().columns
 
         # header = f"Items for {this_week} #{yr_wk[1]} ({len(events)})"
         header = f"{this_week} #{yr_wk[1]} ({len(events)})"
@@ -814,165 +956,218 @@ class Controller:
         self.yrwk_to_details[yr_wk] = details
         return details
 
-    def get_next(self):
-        """
-        Fetch and format details for the next instances.
+    def _instance_rows(self, view: str, header: str, events, descending: bool):
         """
-        events = self.db_manager.get_next_instances()
-        header = f"next instances ({len(events)})"
-        # details = [f"[not bold][{header_color}]{header}[/{header_color}][/not bold]"]
-        details = [header]
+        Return the rows for the next or last instances in events, sorted by the
+        timestamp in the last column, as a title followed by the events of each
+        month under a "yy-mm" heading.
 
+        The month groups are found by bisecting the timestamps, so only the rows
+        that are displayed are formatted. The tags of the formatted rows are
+        added to list_tag_to_id[view] and their records prefetched.
+        """
         if not events:
-            details.append(f" [{header_color}]nothing found[/{header_color}]")
-            # return "\n".join(details)
-            return details
+            return ListRows(
+                [header, f" [{HEADER_COLOR}]Nothing found[/{HEADER_COLOR}]"]
+            )
 
         # use a, ..., z if len(events) <= 26 else use aa, ..., zz
-        self.afill = 1 if len(events) <= 26 else 2 if len(events) <= 676 else 3
-
-        self.list_tag_to_id.setdefault("next", {})
-        yr_mnth_to_events = {}
-
-        # for start_ts, end_ts, type, name, id in events:
-        for id, name, description, type, start_ts in events:
-            start_dt = datetime.fromtimestamp(start_ts)
-            # log_msg(f"Week details {name = }, {start_dt = }, {end_dt = }")
-            monthday = start_dt.strftime("%d")
-            # start_end = f"{start_dt.strftime('%-d %H:%M'):>8}"
-            start_end = f"{format_hours_mins(start_dt, HRS_MINS):>8}"
-            type_color = TYPE_TO_COLOR[type]
-            escaped_start_end = f"[not bold]{start_end}[/not bold]"
-            row = [
-                id,
-                f"[{type_color}]{type} {escaped_start_end:<12}  {name}[/{type_color}]",
-            ]
-            yr_mnth_to_events.setdefault(start_dt.strftime("%y-%m"), []).append(row)
-
-        indx = 0
+        self.afill = afill = 1 if len(events) <= 26 else 2 if len(events) <= 676 else 3
+        tag_to_id = self.list_tag_to_id.setdefault(view, {})
+
+        # bisect needs ascending keys
+        keys = [-ev[-1] for ev in events] if descending else [ev[-1] for ev in events]
+        groups = []  # (yy-mm, index of the first event, display row of the heading)
+        first = 0
+        while first < len(events):
+            month = datetime.fromtimestamp(events[first][-1]).replace(
+                day=1, hour=0, minute=0, second=0, microsecond=0
+            )
+            if descending:
+                stop = bisect_right(keys, -month.timestamp(), lo=first)
+            else:
+                next_month = (month + timedelta(days=32)).replace(day=1)
+                stop = bisect_left(keys, next_month.timestamp(), lo=first)
+            groups.append((month.strftime("%y-%m"), first, 1 + first + len(groups)))
+            first = stop
+        heading_rows = [group[2] for group in groups]
+
+        def fetch(offset: int, limit: int) -> List[str]:
+            lines = []
+            ids = {}
+            for row in range(offset, offset + limit):
+                if row == 0:
+                    lines.append(header)
+                    continue
+                ym, first, heading_row = groups[bisect_right(heading_rows, row) - 1]
+                if row == heading_row:
+                    lines.append(
+                        f"[not bold][{HEADER_COLOR}]{ym}[/{HEADER_COLOR}][/not bold]"
+                    )
+                    continue
+                indx = first + row - heading_row - 1
+                event_id, name, _, type, start_ts = events[indx]
+                start_dt = datetime.fromtimestamp(start_ts)
+                start_end = f"{format_hours_mins(start_dt, HRS_MINS):>8}"
+                type_color = TYPE_TO_COLOR[type]
+                escaped_start_end = f"[not bold]{start_end}[/not bold]"
+                tag = indx_to_tag(indx, afill)
+                tag_to_id[tag] = ids[tag] = event_id
+                lines.append(
+                    f"  [dim]{tag}[/dim]  [{type_color}]{type} {escaped_start_end:<12}  {name}[/{type_color}]"
+                )
+            self.prefetch_details(ids)
+            return lines
 
-        tag = indx_to_tag(indx, self.afill)
+        return PagedRows(1 + len(groups) + len(events), fetch)
 
-        for ym, events in yr_mnth_to_events.items():
-            if events:
-                details.append(
-                    # f" [bold][yellow]{day.strftime('%A, %B %-d')}[/yellow][/bold]"
-                    f"[not bold][{HEADER_COLOR}]{ym}[/{HEADER_COLOR}][/not bold]"
-                )
-                for event in events:
-                    event_id, event_str = event
-                    # log_msg(f"{event_str = }")
-                    tag = indx_to_tag(indx, self.afill)
-                    self.list_tag_to_id["next"][tag] = event_id
-                    details.append(f"  [dim]{tag}[/dim]  {event_str}")
-                    indx += 1
-        # NOTE: maybe return list for scrollable view?
-        # details_str = "\n".join(details)
-        return details
+    @timed("controller.get_next_rows")
+    def get_next_rows(self) -> RowSource:
+        """
+        Fetch the next instances and return a row source formatting them as needed.
+        """
+        events = self.db_manager.get_next_instances()
+        header = f"next instances ({len(events)})"
+        return self._instance_rows("next", header, events, descending=False)
 
-    def get_last(self):
+    @timed("controller.get_next")
+    def get_next(self):
         """
         Fetch and format details for the next instances.
         """
+        return list(self.get_next_rows())
+
+    @timed("controller.get_last_rows")
+    def get_last_rows(self) -> RowSource:
+        """
+        Fetch the last instances and return a row source formatting them as needed.
+        """
         events = self.db_manager.get_last_instances()
         header = f"Last instances ({len(events)})"
-        # details = [f"[not bold][{HEADER_COLOR}]{header}[/{HEADER_COLOR}][/not bold]"]
-        details = [header]
-
-        if not events:
-            details.append(f" [{HEADER_COLOR}]Nothing found[/{HEADER_COLOR}]")
-            # return "\n".join(details)
-            return details
-
-        # use a, ..., z if len(events) <= 26 else use aa, ..., zz
-        self.afill = 1 if len(events) <= 26 else 2 if len(events) <= 676 else 3
-
-        self.list_tag_to_id.setdefault("last", {})
-        yr_mnth_to_events = {}
+        return self._instance_rows("last", header, events, descending=True)
 
-        # for start_ts, end_ts, type, name, id in events:
-        for id, name, description, type, start_ts in events:
-            start_dt = datetime.fromtimestamp(start_ts)
-            # log_msg(f"Week details {name = }, {start_dt = }, {end_dt = }")
-            monthday = start_dt.strftime("%d")
-            # start_end = f"{start_dt.strftime('%-d %H:%M'):>8}"
-            start_end = f"{format_hours_mins(start_dt, HRS_MINS):>8}"
-            type_color = TYPE_TO_COLOR[type]
-            escaped_start_end = f"[not bold]{start_end}[/not bold]"
-            row = [
-                id,
-                f"[{type_color}]{type} {escaped_start_end:<12}  {name}[/{type_color}]",
-            ]
-            yr_mnth_to_events.setdefault(start_dt.strftime("%y-%m"), []).append(row)
-
-        indx = 0
-
-        tag = indx_to_tag(indx, self.afill)
-
-        for ym, events in yr_mnth_to_events.items():
-            if events:
-                details.append(
-                    # f" [bold][yellow]{day.strftime('%A, %B %-d')}[/yellow][/bold]"
-                    f"[not bold][{HEADER_COLOR}]{ym}[/{HEADER_COLOR}][/not bold]"
-                )
-                for event in events:
-                    event_id, event_str = event
-                    # log_msg(f"{event_str = }")
-                    tag = indx_to_tag(indx, self.afill)
-                    self.list_tag_to_id["last"][tag] = event_id
-                    details.append(f"  [dim]{tag}[/dim]  {event_str}")
-                    indx += 1
-        # NOTE: maybe return list for scrollable view?
-        # details_str = "\n".join(details)
-        return details
-
-    def find_records(self, search_str: str):
+    @timed("controller.get_last")
+    def get_last(self):
         """
-        Fetch and format details for the next instances.
+        Fetch and format details for the last instances.
         """
-        events = self.db_manager.find_records(search_str)
-        header = f"Items containg a match for [{SELECTED_COLOR}]{search_str}[/{SELECTED_COLOR}] ({len(events)})"
-        # details = [f"[not bold][{HEADER_COLOR}]{header}[/{HEADER_COLOR}][/not bold]"]
-        details = [header]
+        return list(self.get_last_rows())
 
+    @timed("controller.find_records_rows")
+    def find_records_rows(self, search_str: str) -> RowSource:
+        """
+        Find the records matching search_str, see query.py, and return a row
+        source formatting them as needed, with the name column fitted to the
+        width of the list.
+        """
+        try:
+            query = parse_find_query(search_str)
+        except ValueError as e:
+            return self.find_error_rows(search_str, e)
+        events = self.db_manager.find_records(query)
+        self.find_results = (search_str, events)
+        return self.find_rows(search_str, events)
+
+    def find_records_stream(self, search_str: str) -> Iterator[RowSource]:
+        """
+        Find the records matching search_str as find_records_rows does, but
+        yield a row source for the records found so far after each batch that
+        the database returns, and finally one for all of them.
+
+        If search_str extends the query of the previous call and both have only
+        words, e.g., "dent" -> "dentist", its results are narrowed in a single
+        step instead: only the ids of the matching records are queried and the
+        other columns are taken from the previous results.
+        """
+        try:
+            query = parse_find_query(search_str)
+        except ValueError as e:
+            yield self.find_error_rows(search_str, e)
+            return
+        previous_str, previous_events = self.find_results
+        if (
+            previous_events is not None
+            and search_str.startswith(previous_str)
+            and query.words_only
+            and parse_find_query(previous_str).words_only
+        ):
+            events = self.db_manager.find_records(query, within=previous_events)
+        else:
+            events = []
+            for batch in self.db_manager.iter_find_records(query, FIND_BATCH):
+                events.extend(batch)
+                if len(batch) == FIND_BATCH:
+                    yield self.find_rows(search_str, events, complete=False)
+        self.find_results = (search_str, events)
+        yield self.find_rows(search_str, events)
+
+    def find_error_rows(self, search_str: str, error: ValueError) -> RowSource:
+        """Return the rows reporting an invalid find query."""
+        self.list_tag_to_id["find"] = {}
+        header = f"Items containg a match for [{SELECTED_COLOR}]{search_str}[/{SELECTED_COLOR}]"
+        message = escape(str(error))
+        return ListRows([header, f" [{HEADER_COLOR}]{message}[/{HEADER_COLOR}]"])
+
+    def find_rows(self, search_str: str, events: list, complete: bool = True):
+        """
+        Return a row source for events, rows from DatabaseManager.find_records,
+        headed by a title showing search_str and the number of events, followed
+        by "..." unless complete.
+        """
+        more = "" if complete else " ..."
+        header = f"Items containg a match for [{SELECTED_COLOR}]{search_str}[/{SELECTED_COLOR}] ({len(events)}{more})"
+        # the tags of earlier results may have a different length
+        tag_to_id = self.list_tag_to_id["find"] = {}
         if not events:
-            details.append(f" [{HEADER_COLOR}]Nothing found[/{HEADER_COLOR}]")
-            # return "\n".join(details)
-            return details
+            return ListRows(
+                [header, f" [{HEADER_COLOR}]Nothing found[/{HEADER_COLOR}]"]
+            )
 
         # use a, ..., z if len(events) <= 26 else use aa, ..., zz
-        self.afill = 1 if len(events) <= 26 else 2 if len(events) <= 676 else 3
-
-        self.list_tag_to_id.setdefault("find", {})
+        self.afill = afill = 1 if len(events) <= 26 else 2 if len(events) <= 676 else 3
+
+        def fetch(offset: int, limit: int) -> List[Union[str, Row]]:
+            lines = []
+            ids = {}
+            for row in range(offset, offset + limit):
+                if row == 0:
+                    lines.append(header)
+                    continue
+                indx = row - 1
+                id, name, _, type, last_ts, next_ts = events[indx]
+                last_dt = (
+                    datetime.fromtimestamp(last_ts).strftime("%y-%m-%d %H:%M")
+                    if last_ts
+                    else "~"
+                )
+                last_fmt = f"{last_dt:^14}"
+                next_dt = (
+                    datetime.fromtimestamp(next_ts).strftime("%y-%m-%d %H:%M")
+                    if next_ts
+                    else "~"
+                )
+                next_fmt = f"{next_dt:^14}"
+                # yy-mm-dd hh:mm
+                type_color = TYPE_TO_COLOR[type]
+                escaped_last = f"[not bold]{last_fmt}[/not bold]"
+                escaped_next = f"[not bold]{next_fmt}[/not bold]"
+                tag = indx_to_tag(indx, afill)
+                tag_to_id[tag] = ids[tag] = id
+                lines.append(
+                    Row(
+                        f"  [dim]{tag}[/dim]  [{type_color}]{type} ",
+                        name,
+                        f" {escaped_last} {escaped_next}[/{type_color}]",
+                    )
+                )
+            self.prefetch_details(ids)
+            return lines
 
-        indx = 0
+        return FittedRows(PagedRows(1 + len(events), fetch))
 
-        tag = indx_to_tag(indx, self.afill)
-        # for start_ts, end_ts, type, name, id in events:
-        for id, name, _, type, last_ts, next_ts in events:
-            name = f"{truncate_string(name, 30):<30}"
-            last_dt = (
-                datetime.fromtimestamp(last_ts).strftime("%y-%m-%d %H:%M")
-                if last_ts
-                else "~"
-            )
-            last_fmt = f"{last_dt:^14}"
-            next_dt = (
-                datetime.fromtimestamp(next_ts).strftime("%y-%m-%d %H:%M")
-                if next_ts
-                else "~"
-            )
-            next_fmt = f"{next_dt:^14}"
-            # yy-mm-dd hh:mm
-            # log_msg(f"Week details {name = }, {start_dt = }, {end_dt = }")
-            type_color = TYPE_TO_COLOR[type]
-            escaped_last = f"[not bold]{last_fmt}[/not bold]"
-            escaped_next = f"[not bold]{next_fmt}[/not bold]"
-            row = f"[{type_color}]{type} {name} {escaped_last} {escaped_next}[/{type_color}]"
-            tag = indx_to_tag(indx, self.afill)
-            self.list_tag_to_id["find"][tag] = id
-            details.append(f"  [dim]{tag}[/dim]  {row}")
-            indx += 1
-        # NOTE: maybe return list for scrollable view?
-        # details_str = "\n".join(details)
-        return details
+    @timed("controller.find_records")
+    def find_records(self, search_str: str):
+        """
+        Fetch and format details for the records matching search_str.
+        """
+        return list(self.find_records_rows(search_str))
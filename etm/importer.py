@@ -0,0 +1,248 @@
+"""
+Bulk import of reminders from a text file into the database.
+
+A reminder begins with a line whose first character is an item type, e.g.,
+"* ", "- " or "~ ", and continues until the next one. Blank lines and lines
+beginning with "#" are skipped.
+
+    python -m etm.importer etm.db reminders.text
+    python -m etm.importer etm.db reminders.text --workers 4 --errors rejected.text
+
+The reminders are read lazily, parsed by Item in a pool of worker processes,
+since parsing is pure CPU work, and written in batches, each in a single
+transaction, by DatabaseManager.add_records. Rejected reminders are written to
+the error file, each preceded by "#" lines giving the reasons, so that the
+file can be corrected and imported in turn.
+"""
+
+import argparse
+import os
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from time import perf_counter
+from typing import Callable, Iterable, Iterator, List, NamedTuple, Optional, TextIO, Tuple
+
+from .item import Item, ParseDiagnostics, type_keys
+from .model import DatabaseManager
+from .query import RECORD_TYPES
+
+# Number of reminders sent to a worker process at a time
+PARSE_CHUNK_SIZE = 200
+
+# Number of records written in each transaction
+BATCH_SIZE = 1000
+
+
+class ImportResult(NamedTuple):
+    """The counts and time of an import, see import_reminders."""
+
+    reminders: int = 0
+    imported: int = 0
+    rejected: int = 0
+    seconds: float = 0.0
+
+    @property
+    def per_second(self) -> float:
+        """The number of reminders read per second."""
+        return self.reminders / self.seconds if self.seconds else 0.0
+
+    def __str__(self):
+        return (
+            f"{self.imported} of {self.reminders} reminders imported, "
+            f"{self.rejected} rejected, in {self.seconds:.2f} s "
+            f"({self.per_second:.0f} reminders/s)"
+        )
+
+
+def iter_reminders(lines: Iterable[str]) -> Iterator[str]:
+    """Yield the reminders of lines, each with its lines joined by newlines."""
+    reminder = []
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        if line[0] in type_keys and reminder:
+            yield "\n".join(reminder)
+            reminder = []
+        reminder.append(line)
+    if reminder:
+        yield "\n".join(reminder)
+
+
+def item_to_record(item: Item) -> Tuple:
+    """
+    Return the arguments of DatabaseManager.add_record for a parsed item.
+    Raises ValueError if the item cannot be stored as a record.
+    """
+    itemtype = item.item.get("itemtype")
+    if itemtype not in RECORD_TYPES:
+        raise ValueError(f"item type {itemtype!r} cannot be imported")
+    rrstr = item.item.get("rruleset")
+    if rrstr is None:
+        dates = ([item.dtstart] if item.dtstart else []) + item.rdates
+        rrstr = (
+            "RDATE:" + ",".join(dt.strftime("%Y%m%dT%H%M%S") for dt in dates)
+            if dates
+            else ""
+        )
+    goal = None
+    if itemtype == "~" and item.item.get("q"):
+        if item.dtstart is None:
+            raise ValueError("a goal requires @s")
+        goal = (item.dtstart.date(), *item.item["q"])
+    return (
+        itemtype,
+        item.item.get("subject", ""),
+        item.item.get("d", "").strip(),
+        rrstr,
+        item.item.get("e", 0) // 60,
+        item.item.get("a", ""),
+        item.item.get("l", ""),
+        item.item.get("j"),
+        goal,
+    )
+
+
+def parse_reminder(reminder: str) -> Tuple[Optional[Tuple], Optional[str]]:
+    """
+    Return (record, None) for a reminder that can be imported and
+    (None, reasons) for one that cannot.
+    """
+    try:
+        item = Item(ParseDiagnostics())
+        item.parse_input(reminder)
+        if item.parse_ok:
+            return item_to_record(item), None
+    except Exception as e:
+        return None, str(e) or type(e).__name__
+    # parse again, collecting the reasons
+    diagnostics = ParseDiagnostics(enabled=True)
+    try:
+        Item(diagnostics).parse_input(reminder)
+    except Exception:
+        pass
+    reasons = [f"{event.token.strip()}: {event.error}" for event in diagnostics.errors()]
+    return None, "\n".join(reasons) or "invalid reminder"
+
+
+def parse_chunk(reminders: List[str]) -> List[Tuple[Optional[Tuple], Optional[str]]]:
+    """Return parse_reminder for each of reminders, in a worker process."""
+    return [parse_reminder(reminder) for reminder in reminders]
+
+
+def iter_parsed(
+    reminders: Iterable[str],
+    workers: Optional[int] = None,
+    chunk_size: int = PARSE_CHUNK_SIZE,
+) -> Iterator[Tuple[str, Optional[Tuple], Optional[str]]]:
+    """
+    Yield (reminder, record, reasons) for each of reminders in order. The
+    reminders are parsed in chunks by workers processes, os.cpu_count() if
+    None, with at most two chunks per process read ahead, or in this process
+    if workers is 0.
+    """
+    reminders = iter(reminders)
+    chunks = iter(lambda: list(islice(reminders, chunk_size)), [])
+    if workers == 0:
+        for chunk in chunks:
+            for reminder, parsed in zip(chunk, parse_chunk(chunk)):
+                yield (reminder, *parsed)
+        return
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for chunk in chunks:
+            pending.append((chunk, executor.submit(parse_chunk, chunk)))
+            if len(pending) < 2 * workers:
+                continue
+            chunk, future = pending.popleft()
+            for reminder, parsed in zip(chunk, future.result()):
+                yield (reminder, *parsed)
+        for chunk, future in pending:
+            for reminder, parsed in zip(chunk, future.result()):
+                yield (reminder, *parsed)
+
+
+def write_rejected(errors: TextIO, reminder: str, reasons: str):
+    for reason in reasons.splitlines():
+        errors.write(f"# {reason}\n")
+    errors.write(f"{reminder}\n\n")
+
+
+def import_reminders(
+    db_manager: DatabaseManager,
+    lines: Iterable[str],
+    workers: Optional[int] = None,
+    batch_size: int = BATCH_SIZE,
+    errors: Optional[TextIO] = None,
+    progress: Optional[Callable[[ImportResult], None]] = None,
+) -> ImportResult:
+    """
+    Import the reminders of lines into db_manager, writing the rejected ones
+    to errors if given, and return the counts. progress is called with the
+    counts so far after each batch is written.
+    """
+    start = perf_counter()
+    reminders = imported = rejected = 0
+    batch = []
+
+    def write_batch():
+        nonlocal imported
+        imported += len(db_manager.add_records(batch))
+        batch.clear()
+        if progress is not None:
+            progress(
+                ImportResult(reminders, imported, rejected, perf_counter() - start)
+            )
+
+    for reminder, record, reasons in iter_parsed(iter_reminders(lines), workers):
+        reminders += 1
+        if record is None:
+            rejected += 1
+            if errors is not None:
+                write_rejected(errors, reminder, reasons)
+            continue
+        batch.append(record)
+        if len(batch) >= batch_size:
+            write_batch()
+    if batch:
+        write_batch()
+    return ImportResult(reminders, imported, rejected, perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("db", help="the etm database")
+    parser.add_argument("file", help="the text file of reminders")
+    parser.add_argument(
+        "--workers", type=int, help="parsing processes, 0 to parse in this one"
+    )
+    parser.add_argument("--batch", type=int, default=BATCH_SIZE, help="records per transaction")
+    parser.add_argument("--errors", help="file for the rejected reminders")
+    args = parser.parse_args()
+    if not os.path.exists(args.file):
+        parser.error(f"no such file: {args.file}")
+
+    db_manager = DatabaseManager(args.db)
+    errors = open(args.errors, "w") if args.errors else None
+    try:
+        with open(args.file) as lines:
+            result = import_reminders(
+                db_manager,
+                lines,
+                workers=args.workers,
+                batch_size=args.batch,
+                errors=errors,
+                progress=lambda result: print(result, file=sys.stderr),
+            )
+    finally:
+        if errors is not None:
+            errors.close()
+        db_manager.close()
+    print(result)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+"""
+Lightweight span-based timing for the controller, model and views.
+
+Instrumentation is off unless the environmental variable ETM_INSTRUMENT is set
+to a non-empty value other than "0" or enable() is called. When it is off,
+timed() wrappers cost a single attribute check and nothing is recorded. SQL
+statements are only timed for a DatabaseManager created while it is on.
+
+    from .instrument import instrumentation, span, timed
+
+    with span("model.process_events"):
+        ...
+
+    @timed("controller.get_week_details")
+    def get_week_details(self, yr_wk):
+        ...
+
+Timings are aggregated in memory by span name and summary() reports the count,
+total, mean, p50, p95, p99 and max in milliseconds. If ETM_INSTRUMENT_FILE is
+set, the summary is also written to that path as JSON when the process exits.
+"""
+
+import atexit
+import functools
+import json
+import os
+import re
+from collections import deque
+from contextlib import contextmanager
+from time import perf_counter
+from typing import Any, Callable, Dict, List, Optional
+
+# Number of recent samples kept for each span name to compute percentiles
+MAX_SAMPLES = 4096
+
+SQL_TABLE_REGEX = re.compile(
+    r"\b(?:FROM|INTO|UPDATE|TABLE(?:\s+IF\s+NOT\s+EXISTS)?)\s+(\w+)", re.IGNORECASE
+)
+
+
+def percentile(ordered: List[float], pct: float) -> float:
+    """
+    Return the nearest-rank percentile pct (0-100) of the sorted list ordered.
+    """
+    if not ordered:
+        return 0.0
+    rank = max(1, -(-len(ordered) * pct // 100))  # ceil without importing math
+    return ordered[min(len(ordered), int(rank)) - 1]
+
+
+class SpanStats:
+    """Aggregated timings for a single span name."""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.samples = deque(maxlen=MAX_SAMPLES)
+
+    def add(self, seconds: float):
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+        self.samples.append(seconds)
+
+    def summary(self) -> Dict[str, float]:
+        ordered = sorted(self.samples)
+        ms = 1000.0
+        return {
+            "count": self.count,
+            "total_ms": round(self.total * ms, 3),
+            "mean_ms": round(self.total / self.count * ms, 3) if self.count else 0.0,
+            "p50_ms": round(percentile(ordered, 50) * ms, 3),
+            "p95_ms": round(percentile(ordered, 95) * ms, 3),
+            "p99_ms": round(percentile(ordered, 99) * ms, 3),
+            "max_ms": round(self.max * ms, 3),
+        }
+
+
+class Instrumentation:
+    """
+    Collect span timings and simple event counters in memory.
+    """
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self.spans: Dict[str, SpanStats] = {}
+        self.counters: Dict[str, int] = {}
+        self._dump_registered = False
+
+    def enable(self, json_path: Optional[str] = None):
+        """Turn on collection and, if json_path is given, dump the summary there on exit."""
+        self.enabled = True
+        if json_path and not self._dump_registered:
+            atexit.register(self.dump_json, json_path)
+            self._dump_registered = True
+
+    def disable(self):
+        self.enabled = False
+
+    def reset(self):
+        self.spans.clear()
+        self.counters.clear()
+
+    def record(self, name: str, seconds: float):
+        """Add a timing, in seconds, for the span name."""
+        if not self.enabled:
+            return
+        stats = self.spans.get(name)
+        if stats is None:
+            stats = self.spans[name] = SpanStats()
+        stats.add(seconds)
+
+    def incr(self, name: str, amount: int = 1):
+        """Increment the counter name."""
+        if not self.enabled:
+            return
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    @contextmanager
+    def span(self, name: str):
+        """Time the body of a with statement as the span name."""
+        if not self.enabled:
+            yield
+            return
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, perf_counter() - start)
+
+    def timed(self, name: str) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+        """Decorator timing each call of the wrapped function as the span name."""
+
+        def decorator(func: Callable[..., Any]) -> Callable[..., Any]:
+            @functools.wraps(func)
+            def wrapper(*args: Any, **kwargs: Any) -> Any:
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                start = perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.record(name, perf_counter() - start)
+
+            return wrapper
+
+        return decorator
+
+    def summary(self) -> Dict[str, Any]:
+        """Return the span statistics and counters as a JSON-ready dictionary."""
+        return {
+            "spans": {
+                name: stats.summary() for name, stats in sorted(self.spans.items())
+            },
+            "counters": dict(sorted(self.counters.items())),
+        }
+
+    def as_lines(self) -> List[str]:
+        """Return the summary as markup lines suitable for DetailsScreen."""
+        lines = ["Timings (ms)"]
+        if not self.enabled:
+            lines.append(" Instrumentation is off. Set ETM_INSTRUMENT=1 to enable it.")
+            return lines
+        summary = self.summary()
+        if not summary["spans"] and not summary["counters"]:
+            lines.append(" Nothing recorded yet.")
+            return lines
+        name_width = max([len(x) for x in summary["spans"]] + [4])
+        lines.append(
+            f"[bold]{'span':<{name_width}}  {'count':>6}  {'p50':>8}  {'p95':>8}  {'p99':>8}  {'max':>8}[/bold]"
+        )
+        for name, row in summary["spans"].items():
+            lines.append(
+                f"{name:<{name_width}}  {row['count']:>6}  {row['p50_ms']:>8.2f}  {row['p95_ms']:>8.2f}  {row['p99_ms']:>8.2f}  {row['max_ms']:>8.2f}"
+            )
+        if summary["counters"]:
+            lines.append("")
+            lines.append("[bold]counters[/bold]")
+            for name, count in summary["counters"].items():
+                lines.append(f"{name:<{name_width}}  {count:>6}")
+        return lines
+
+    def dump_json(self, path: str):
+        """Write the summary to path as JSON."""
+        with open(path, "w") as fo:
+            json.dump(self.summary(), fo, indent=2)
+
+
+class InstrumentedCursor:
+    """
+    Wrap a sqlite3 cursor so that each execute/executemany is recorded as a
+    span named 'sql <VERB> <table>'.
+    """
+
+    def __init__(self, cursor, instrumentation: Instrumentation):
+        self._cursor = cursor
+        self._instrumentation = instrumentation
+
+    @staticmethod
+    def span_name(sql: str) -> str:
+        words = sql.split(None, 1)
+        verb = words[0].upper() if words else "?"
+        match = SQL_TABLE_REGEX.search(sql)
+        return f"sql {verb} {match.group(1)}" if match else f"sql {verb}"
+
+    def execute(self, sql, *args):
+        with self._instrumentation.span(self.span_name(sql)):
+            self._cursor.execute(sql, *args)
+        return self
+
+    def executemany(self, sql, *args):
+        with self._instrumentation.span(self.span_name(sql)):
+            self._cursor.executemany(sql, *args)
+        return self
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+instrumentation = Instrumentation()
+span = instrumentation.span
+timed = instrumentation.timed
+
+if os.environ.get("ETM_INSTRUMENT", "") not in ("", "0"):
+    instrumentation.enable(os.environ.get("ETM_INSTRUMENT_FILE"))
@@ -6,19 +6,44 @@ from datetime import date, datetime, timedelta
 from dateutil.tz import gettz
 import pytz
 import textwrap
+from types import MethodType
 
-from collections import defaultdict
-from math import ceil
+from collections import defaultdict, deque
 
-from typing import Union, Tuple, Optional
-from typing import List, Dict, Any, Callable, Mapping
-from common import timedelta_string_to_seconds
+from typing import Iterable, Iterator, Union, Tuple, Optional
+from typing import List, Dict, Any, Callable, Mapping, NamedTuple
+
+try:
+    from .common import timedelta_string_to_seconds
+    from .rruleset import canonical_rruleset
+except ImportError:  # imported as a top-level module, as by test_item.py
+    from common import timedelta_string_to_seconds
+    from rruleset import canonical_rruleset
 
 # JOB_PATTERN = re.compile(r"(^@j) (\d*):\s*(.*)")
 # JOB_PATTERN = re.compile(r"^@j ( +)(\S.*)")
 JOB_PATTERN = re.compile(r"^@j ( *)([^&]*)(?:(&.*))?")
 LETTER_SET = set("abcdefghijklmnopqrstuvwxyz")  # Define once
 
+# The tokens of an entry: the item type, the subject and the @-key tokens
+TOKEN_PATTERN = re.compile(r"(@\w+ [^@]+)|(^\S+)|(\S[^@]*)")
+
+# The parts of an @r or @j token: the @-key part and the &-key parts
+SUB_TOKEN_PATTERN = re.compile(r"(@\w+ [^&]+)|(^\S+)|(\S[^&]*)")
+
+# The @-key of a token, e.g., the "@s " of "@s 2024-08-07"
+AT_KEY_PATTERN = re.compile(r"^@. ")
+
+# A weekday, optionally prepended with an integer, e.g., "MO" or "+4TH"
+WEEKDAY_PATTERN = re.compile(r"(?<![\w-])([+-][1-4])?(MO|TU|WE|TH|FR|SA|SU)(?!\w)")
+
+# An optional integer followed by a string, e.g., "+4" and "TH" in "+4TH"
+INT_STR_PATTERN = re.compile(r"^([+-]?\d*)(.{1,})$")
+
+MONTHS_USAGE = (
+    "months: a comma separated list of integer month numbers from 1, 2, ..., 12"
+)
+
 
 def is_lowercase_letter(char):
     return char in LETTER_SET  # O(1) lookup
@@ -137,8 +162,6 @@ def ruleset_to_rulehsh(rrset: rruleset) -> dict[str, str]:
 
 
 def ruleset_to_rulestr(rrset: rruleset) -> str:
-    print(f"rrset: {rrset}; {type(rrset) = }; {rrset.__dict__}")
-    print(f"{list(rrset) = }")
     parts = []
     # parts.append("rrules:")
     for rule in rrset._rrule:
@@ -239,6 +262,193 @@ class Paragraph:
         return unwrapped_text
 
 
+# Number of recent events kept by ParseDiagnostics
+MAX_PARSE_EVENTS = 1000
+
+
+class ParseEvent(NamedTuple):
+    """
+    A step of parsing an entry: handler, the name of the Item method, applied
+    to token, the text at span in the entry, and its result or error.
+    """
+
+    token: str
+    span: Tuple[int, int]
+    handler: str
+    result: Any = None
+    error: Optional[str] = None
+
+
+class ParseDiagnostics:
+    """
+    Collect ParseEvents from Item parsing. It is off unless enabled, when
+    record() costs a single attribute check, so that parsing does no I/O and
+    builds no messages. If callback is given, e.g., print, each event is also
+    passed to it as it is recorded.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = False,
+        callback: Optional[Callable[[ParseEvent], None]] = None,
+    ):
+        self.enabled = enabled
+        self.callback = callback
+        self.events = deque(maxlen=MAX_PARSE_EVENTS)
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def reset(self):
+        self.events.clear()
+
+    def record(self, token: str, span, handler: str, ok: bool = True, result=None):
+        """Record handler's result for token, or its error if not ok."""
+        if not self.enabled:
+            return
+        if ok:
+            event = ParseEvent(token, span, handler, result)
+        else:
+            event = ParseEvent(token, span, handler, error=str(result))
+        self.events.append(event)
+        if self.callback is not None:
+            self.callback(event)
+
+    def errors(self) -> List[ParseEvent]:
+        """Return the recorded events with an error."""
+        return [event for event in self.events if event.error is not None]
+
+
+# The diagnostics used by an Item unless it is given its own
+parse_diagnostics = ParseDiagnostics()
+
+# The Item.handlers entry of a key without a handler
+NO_HANDLER = (None, False)
+
+
+# The item type of a job with each status in Item.finalize_jobs
+JOB_ITEMTYPES = {"available": "-", "waiting": "+", "finished": "x"}
+
+
+class JobGraph:
+    """
+    The jobs of a task as a DAG. A job waits for the jobs nested under it in
+    the @j outline, its descendants, and is available when all of them are
+    finished. parents[i] is the index of the job that job i is nested under,
+    always less than i, or None, and unfinished[i] counts the unfinished
+    descendants of job i, so finishing or reopening a job updates only the
+    counts of its ancestors.
+    """
+
+    def __init__(self, parents: List[Optional[int]], finished: Iterable[int] = ()):
+        self.parents = list(parents)
+        self.finished = set(finished)
+        self.unfinished = [0] * len(self.parents)
+        for i in range(len(self.parents) - 1, -1, -1):
+            parent = self.parents[i]
+            if parent is not None:
+                self.unfinished[parent] += self.unfinished[i] + (i not in self.finished)
+        self.waiting = sum(
+            1
+            for i, count in enumerate(self.unfinished)
+            if count and i not in self.finished
+        )
+        self.available = len(self.parents) - self.waiting - len(self.finished)
+
+    @classmethod
+    def from_nodes(cls, nodes: List[int], finished: Iterable[int] = ()) -> "JobGraph":
+        """
+        Return the graph of jobs with the outline depths nodes, the "node" of
+        the jobs returned by Item.do_job: a job is nested under the closest
+        job before it with a smaller depth.
+        """
+        parents = []
+        path = []
+        for i, node in enumerate(nodes):
+            while path and nodes[path[-1]] >= node:
+                path.pop()
+            parents.append(path[-1] if path else None)
+            path.append(i)
+        return cls(parents, finished)
+
+    def prerequisites(self) -> List[int]:
+        """
+        Return, for each job, a bitmap of the jobs it waits for, its
+        descendants, with bit j set for job j.
+        """
+        bitmaps = [0] * len(self.parents)
+        for i in range(len(self.parents) - 1, -1, -1):
+            parent = self.parents[i]
+            if parent is not None:
+                bitmaps[parent] |= bitmaps[i] | 1 << i
+        return bitmaps
+
+    def ancestors(self, i: int) -> Iterator[int]:
+        parent = self.parents[i]
+        while parent is not None:
+            yield parent
+            parent = self.parents[parent]
+
+    def status(self, i: int) -> str:
+        """Return "finished", "waiting" or "available" for job i."""
+        if i in self.finished:
+            return "finished"
+        return "waiting" if self.unfinished[i] else "available"
+
+    @property
+    def summary(self) -> str:
+        """The numbers of available, waiting and finished jobs, e.g., "1/3/2"."""
+        return f"{self.available}/{self.waiting}/{len(self.finished)}"
+
+    def finish(self, i: int) -> List[int]:
+        """Finish job i and return the jobs that became available."""
+        if i in self.finished:
+            return []
+        if self.unfinished[i]:
+            self.waiting -= 1
+        else:
+            self.available -= 1
+        self.finished.add(i)
+        available = []
+        for ancestor in self.ancestors(i):
+            self.unfinished[ancestor] -= 1
+            if not self.unfinished[ancestor] and ancestor not in self.finished:
+                self.waiting -= 1
+                self.available += 1
+                available.append(ancestor)
+        return available
+
+    def reopen(self, i: int) -> List[int]:
+        """Undo finishing job i and return the jobs that became waiting."""
+        if i not in self.finished:
+            return []
+        self.finished.discard(i)
+        if self.unfinished[i]:
+            self.waiting += 1
+        else:
+            self.available += 1
+        waiting = []
+        for ancestor in self.ancestors(i):
+            self.unfinished[ancestor] += 1
+            if self.unfinished[ancestor] == 1 and ancestor not in self.finished:
+                self.available -= 1
+                self.waiting += 1
+                waiting.append(ancestor)
+        return waiting
+
+
+class ParsedToken(NamedTuple):
+    """The result of dispatching a token of an entry, see Item._dispatch_token."""
+
+    token: str
+    token_type: str
+    ok: bool
+    result: Any
+
+
 class Item:
     token_keys = {
         "itemtype": [
@@ -289,6 +499,11 @@ class Item:
             "priority from 0 (none) to 4 (urgent)",
             "do_priority",
         ],
+        "q": [
+            "quota",
+            "completions per week, optionally followed by a comma and the number of weeks",
+            "do_quota",
+        ],
         "z": [
             "timezone",
             "a timezone entry such as 'US/Eastern' or 'Europe/Paris' or 'float' to specify a naive/floating datetime",
@@ -381,7 +596,27 @@ class Item:
     )
     param_to_key = {v: k for k, v in key_to_param.items()}
 
-    def __init__(self):
+    @classmethod
+    def handlers(cls) -> Dict[str, Tuple[Optional[Callable], bool]]:
+        """
+        Return the dispatch table of the class, built on first use: for each
+        key of token_keys, the handler named there and whether it is called
+        with the item, i.e., whether it is a plain method rather than a
+        classmethod bound to the class. The handler is None if the class has
+        no method of that name.
+        """
+        table = cls.__dict__.get("_handler_table")
+        if table is None:
+            table = {}
+            for key, (_, _, method_name) in cls.token_keys.items():
+                handler = getattr(cls, method_name, None)
+                table[key] = (handler, not isinstance(handler, MethodType))
+            cls._handler_table = table
+        return table
+
+    def __init__(self, diagnostics: Optional[ParseDiagnostics] = None):
+        self.diagnostics = diagnostics if diagnostics is not None else parse_diagnostics
+        self._handlers = self.handlers()
         self.entry = ""
         self.tokens = []
         self.previous_entry = ""
@@ -396,53 +631,87 @@ class Item:
         self.rdates = []
         self.exdates = []
         self.dtstart = None
+        # the ParsedToken for each token of the entry, keyed by (start, end)
+        self.token_table = {}
+        # (start, previous end, end) of the change from the previous entry
+        self.change = None
+        # the JobGraph of the last jobs finalized and their outline depths
+        self.job_graph = None
+        self.job_nodes = None
 
     def parse_input(self, entry: str):
         """
         Parses the input string to extract tokens, then processes and validates the tokens.
         """
-        digits = "1234567890" * ceil(len(entry) / 10)
         self._tokenize(entry)
-        print(
-            f"entry to tokens:\n   |{digits[: len(entry)]}|\n   |{entry}|\n   {self.tokens}"
-        )
         self._parse_tokens(entry)
-        self.parse_ok = True
         self.previous_entry = entry
         self.previous_tokens = self.tokens.copy()
+        span = (0, len(entry))
         if self.rrule_tokens:
             success, rruleset_str = self.finalize_rruleset()
-            print(f"\n{success = } for:\n'{self.entry}'\n{rruleset_str}")
+            self.diagnostics.record(
+                entry, span, "finalize_rruleset", success, rruleset_str
+            )
         if self.jobs:
             success, jobs = self.finalize_jobs()
-            print(f"\n{success = } for:\n'{self.entry}'")
-            for job in jobs:
-                print(job)
-        if self.tags:
-            print(f"\n{success = } for:\n'{self.entry}'")
-            print(f"tags: {', '.join(self.tags)}")
+            self.diagnostics.record(entry, span, "finalize_jobs", success, jobs)
 
     def _tokenize(self, entry: str):
+        """
+        Split entry into (token, start, end) tuples. After the first entry, the
+        tokens before the change from the previous entry are kept and matching
+        resumes at the last one of them, which may extend into the change. It
+        stops at the first token past the change that is also a previous token,
+        since the previous tokens from there on are unchanged but for their
+        positions.
+        """
         self.entry = entry
-        pattern = r"(@\w+ [^@]+)|(^\S+)|(\S[^@]*)"
-        matches = re.finditer(pattern, self.entry)
-        tokens_with_positions = []
-        for match in matches:
-            # Get the matched token
-            token = match.group(0)
-            # Get the start and end positions
-            start_pos = match.start()
-            end_pos = match.end()
-            # Append the token and its positions as a tuple
-            tokens_with_positions.append((token, start_pos, end_pos))
-        self.tokens = tokens_with_positions
+        if not self.previous_entry:
+            self.change = None
+            self.tokens = [
+                (match.group(0), match.start(), match.end())
+                for match in TOKEN_PATTERN.finditer(entry)
+            ]
+            return
+        self.change = start, end_prev, end_curr = self._find_changes(
+            self.previous_entry, entry
+        )
+        shift = end_curr - end_prev
+        previous = self.previous_tokens
+        first = None
+        for i, (_, token_start, _) in enumerate(previous):
+            if token_start >= start:
+                break
+            first = i
+        if first is None:
+            tokens, resume, following = [], 0, 0
+        else:
+            tokens, resume, following = previous[:first], previous[first][1], first
+        for match in TOKEN_PATTERN.finditer(entry, resume):
+            if match.start() >= end_curr:
+                while (
+                    following < len(previous)
+                    and previous[following][1] + shift < match.start()
+                ):
+                    following += 1
+                if (
+                    following < len(previous)
+                    and previous[following][1] + shift == match.start()
+                    and previous[following][0] == match.group(0)
+                ):
+                    tokens.extend(
+                        (token, token_start + shift, token_end + shift)
+                        for token, token_start, token_end in previous[following:]
+                    )
+                    break
+            tokens.append((match.group(0), match.start(), match.end()))
+        self.tokens = tokens
 
     def _sub_tokenize(self, entry):
-        pattern = r"(@\w+ [^&]+)|(^\S+)|(\S[^&]*)"
-        matches = re.finditer(pattern, entry)
+        matches = SUB_TOKEN_PATTERN.finditer(entry)
         tokens_with_positions = []
         for match in matches:
-            print(f"{match = }")
             # Get the matched token
             token = match.group(0)
             # Get the start and end positions
@@ -454,42 +723,90 @@ class Item:
         return tokens_with_positions
 
     def _parse_tokens(self, entry: str):
-        if not self.previous_entry:
-            # If there is no previous entry, parse all tokens
-            self._parse_all_tokens()
-            return
-
-        # Identify the affected tokens based on the change
-        changes = self._find_changes(self.previous_entry, entry)
-        affected_tokens = self._identify_affected_tokens(changes)
-
-        # Parse only the affected tokens
-        for token_info in affected_tokens:
-            token, start_pos, end_pos = token_info
-            # Check if the token has actually changed
-            if self._token_has_changed(token_info):
-                print(f"processing changed token: {token_info}")
-                if start_pos == 0:
-                    self._dispatch_token(token, start_pos, end_pos, "itemtype")
-                elif start_pos == 2:
-                    self._dispatch_token(token, start_pos, end_pos, "subject")
-                else:
-                    self._dispatch_token(token, start_pos, end_pos)
-
-    def _parse_all_tokens(self):
-        for i, token_info in enumerate(self.tokens):
-            token, start_pos, end_pos = token_info
-            if i == 0:
-                self._dispatch_token(token, start_pos, end_pos, "itemtype")
-            elif i == 1:
-                self._dispatch_token(token, start_pos, end_pos, "subject")
-            else:
-                token_type = token.split()[0][
-                    1:
-                ]  # Extract token type (e.g., 's' from '@s')
-                self._dispatch_token(token, start_pos, end_pos, token_type)
+        """
+        Dispatch the tokens of entry that are not in the token table of the
+        previous entry, with the same text and type at the same position
+        allowing for the change, and keep the results of the others. Then
+        rebuild the item from the results in entry order.
+        """
+        previous = self.token_table
+        table = {}
+        for i, (token, start_pos, end_pos) in enumerate(self.tokens):
+            token_type = self._token_type(token, i)
+            parsed = None
+            if self.change is not None:
+                start, end_prev, end_curr = self.change
+                if end_pos <= start:
+                    parsed = previous.get((start_pos, end_pos))
+                elif start_pos >= end_curr:
+                    shift = end_curr - end_prev
+                    parsed = previous.get((start_pos - shift, end_pos - shift))
+                if parsed is not None and (parsed.token, parsed.token_type) != (
+                    token,
+                    token_type,
+                ):
+                    parsed = None
+            if parsed is None:
+                parsed = self._dispatch_token(token, start_pos, end_pos, token_type)
+            table[(start_pos, end_pos)] = parsed
+        self.token_table = table
+        self._assemble()
+
+    @staticmethod
+    def _token_type(token: str, index: int) -> str:
+        """Return the type of the token at index in the tokens of an entry."""
+        if index == 0:
+            return "itemtype"
+        if index == 1:
+            return "subject"
+        if token.startswith("@") and token != "@":
+            return token.split()[0][1:]  # Extract token type (e.g., 's' from '@s')
+        return token
+
+    def _assemble(self):
+        """
+        Rebuild item, the rrule and job tokens, rrules, jobs, tags, rdates,
+        exdates and dtstart from the token table.
+        """
+        self.item = {}
+        self.rrule_tokens = []
+        self.job_tokens = []
+        self.jobs = []
+        self.tags = []
+        self.rdates = []
+        self.exdates = []
+        self.parse_ok = True
+        for token, start_pos, end_pos in self.tokens:
+            parsed = self.token_table[(start_pos, end_pos)]
+            if not parsed.ok:
+                self.parse_ok = False
+                continue
+            token_type, result = parsed.token_type, parsed.result
+            if token_type == "r":
+                # a copy, since DTSTART depends on the @s token
+                self.rrule_tokens.append((token, dict(result)))
+            elif token_type == "j":
+                self.job_tokens.append((token, result))
+                self.jobs.append(result)
+            elif token_type == "+":
+                self.rdates.extend(result)
+            elif token_type == "-":
+                self.exdates.extend(result)
+            elif token_type in self.token_keys and token_type != "@":
+                if token_type == "t":
+                    self.tags.append(result)
+                self.item[token_type] = result
+        self.dtstart = self.item.get("s")
+        if self.dtstart:
+            for _, rrule_params in self.rrule_tokens:
+                rrule_params["DTSTART"] = self.dtstart.strftime("%Y%m%dT%H%M%S")
+        self.rrules = [rrule_params for _, rrule_params in self.rrule_tokens]
 
     def _find_changes(self, previous: str, current: str):
+        """
+        Return (start, end_prev, end_curr) where previous[start:end_prev] was
+        replaced by current[start:end_curr].
+        """
         # Find the range of changes between the previous and current strings
         start = 0
         while (
@@ -510,83 +827,57 @@ class Item:
             end_prev -= 1
             end_curr -= 1
 
-        return start, end_curr
-
-    def _identify_affected_tokens(self, changes):
-        start, end = changes
-        affected_tokens = []
-        for token_info in self.tokens:
-            token, start_pos, end_pos = token_info
-            if start <= end_pos and end >= start_pos:
-                affected_tokens.append(token_info)
-        return affected_tokens
-
-    def _token_has_changed(self, token_info):
-        return token_info not in self.previous_tokens
-
-    def _dispatch_token(self, token, start_pos, end_pos, token_type=None):
-        print(
-            f"dispatching token: {token = }, {start_pos = }, {end_pos = }, {token_type = }"
+        return start, end_prev, end_curr
+
+    def _dispatch_token(self, token, start_pos, end_pos, token_type) -> ParsedToken:
+        span = (start_pos, end_pos)
+        if token_type == "@":
+            self.do_at()
+            self.diagnostics.record(token, span, "do_at")
+            return ParsedToken(token, token_type, True, None)
+        handler, takes_item = self._handlers.get(token_type, NO_HANDLER)
+        if handler is None:
+            self.diagnostics.record(
+                token, span, "", False, f"No handler for token: {token}"
+            )
+            return ParsedToken(token, token_type, True, None)
+        is_valid, result, sub_tokens = (
+            handler(self, token) if takes_item else handler(token)
         )
-        if token_type is None:
-            if token == "@":
-                self.do_at()
-                return
-            elif token.startswith("@"):
-                token_type = token.split()[0][
-                    1:
-                ]  # Extract token type (e.g., 's' from '@s')
-            else:
-                token_type = token
-        if token_type in self.token_keys:
-            print(f"Dispatching token: {token} as {token_type}")
-            method_name = self.token_keys[token_type][2]
-            print(f"method_name = {method_name}")
-            method = getattr(self, method_name)
-            is_valid, result, sub_tokens = method(token)
-            if is_valid:
-                if token_type == "r":
-                    print(f"appending {result} to self.rrules")
-                    self.rrules.append(result)
-                    self._dispatch_sub_tokens(sub_tokens, "r")
-                elif token_type == "j":
-                    print(f"appending {result} to self.jobs")
-                    self.jobs.append(result)
-                    self._dispatch_sub_tokens(sub_tokens, "j")
-                elif token_type == "+":
-                    self.rdates.extend(result)
-                elif token_type == "-":
-                    self.exdates.extend(result)
-                else:
-                    self.item[token_type] = result
-            else:
-                self.parse_ok = False
-                print(f"Error processing '{token_type}': {result}")
-        else:
-            print(f"No handler for token: {token}")
+        self.diagnostics.record(token, span, handler.__name__, is_valid, result)
+        if is_valid and token_type in ("r", "j"):
+            is_valid = self._dispatch_sub_tokens(sub_tokens, token_type, result, span)
+        return ParsedToken(token, token_type, is_valid, result)
 
-    def _dispatch_sub_tokens(self, sub_tokens, prefix):
+    def _dispatch_sub_tokens(self, sub_tokens, prefix, params, span) -> bool:
+        """
+        Add the results of the &-key sub_tokens of an @r or @j token to its
+        params and return False if any of them is invalid. span is that of the
+        token.
+        """
+        ok = True
         for part in sub_tokens:
             if part.startswith("&"):
                 token_type = prefix + part[1:2]  # Prepend prefix to token type
                 token_value = part[2:].strip()
-                print(f"token_type = '{token_type}': token_value = '{token_value}'")
-                if token_type in self.token_keys:
-                    method_name = self.token_keys[token_type][2]
-                    method = getattr(self, method_name)
-                    is_valid, result = method(token_value)
-                    print(f"{token_value} => {is_valid}, {result}")
+                handler, takes_item = self._handlers.get(token_type, NO_HANDLER)
+                if handler is not None:
+                    is_valid, result = (
+                        handler(self, token_value) if takes_item else handler(token_value)
+                    )
+                    self.diagnostics.record(
+                        part, span, handler.__name__, is_valid, result
+                    )
                     if is_valid:
-                        if prefix == "r":
-                            self.rrule_tokens[-1][1][token_type] = result
-                        elif prefix == "j":
-                            self.job_tokens[-1][1][token_type] = result
+                        params[token_type] = result
                     else:
-                        self.parse_ok = False
-                        print(f"Error processing sub-token '{token_type}': {result}")
+                        ok = False
                 else:
-                    self.parse_ok = False
-                    print(f"No handler for sub-token: {token_type}")
+                    ok = False
+                    self.diagnostics.record(
+                        part, span, "", False, f"No handler for sub-token: {token_type}"
+                    )
+        return ok
 
     def _validate(self):
         # Overall validation logic if needed
@@ -602,15 +893,14 @@ class Item:
                 # the leading space is needed for parsing
                 content = f" {content}"
             return number, summary, content
-        return None, text  # If no match, return None for number and the entire string
+        # If no match, return None for number and the entire string
+        return None, text, None
 
     @classmethod
     def do_itemtype(cls, token):
         # Process item type token
-        print(f"Processing item type token: {token}")
-        valid_itemtypes = {"*", "-", "%", "~", "+", "!"}
         itemtype = token[0]
-        if itemtype in valid_itemtypes:
+        if itemtype in type_keys:
             return True, itemtype, []
         else:
             return False, f"Invalid item type: {itemtype}", []
@@ -618,7 +908,6 @@ class Item:
     @classmethod
     def do_summary(cls, token):
         # Process subject token
-        print(f"Processing subject token: {token}")
         if len(token) >= 1:
             return True, token.strip(), []
         else:
@@ -627,10 +916,8 @@ class Item:
     @classmethod
     def do_duration(cls, arg: str):
         """ """
-        print(f"processing duration: {arg}")
         if not arg:
             return False, f"time period {arg}"
-        print(f"calling timedelta_string_to_seconds with {arg}")
         ok, res = timedelta_string_to_seconds(arg)
         return ok, res
 
@@ -640,7 +927,7 @@ class Item:
         Process an alert string, validate it and return a corresponding string
         with the timedelta components replaced by integer seconds.
         """
-        alerts = [x.strip() for x in arg.split(";")]
+        alerts = [x.strip() for x in AT_KEY_PATTERN.sub("", arg.strip()).split(";")]
         if not alerts:
             return False, "missing alerts", []
         res = []
@@ -677,8 +964,7 @@ class Item:
         return True, "; ".join(res), []
 
     def do_description(self, token):
-        print(f"Processing description: {token}")
-        description = re.sub("^@. ", "", token)
+        description = AT_KEY_PATTERN.sub("", token)
         if not description:
             return False, "missing description", []
         ok, rep = Item.do_paragraph(description)
@@ -690,8 +976,7 @@ class Item:
 
     def do_extent(self, token):
         # Process datetime token
-        extent = re.sub("^@. ", "", token.strip())
-        print(f"Processing extent token: '{extent}'")
+        extent = AT_KEY_PATTERN.sub("", token.strip())
         ok, extent_obj = timedelta_string_to_seconds(extent)
         if ok:
             self.extent = extent_obj
@@ -704,7 +989,6 @@ class Item:
 
         obj, rep, parts = self.do_string(token)
         if obj:
-            self.tags.append(obj)
             return True, obj, []
         else:
             return False, rep, []
@@ -770,7 +1054,7 @@ class Item:
 
     def do_string(self, token):
         try:
-            obj = re.sub("^@. ", "", token.strip())
+            obj = AT_KEY_PATTERN.sub("", token.strip())
             rep = obj
         except:
             obj = None
@@ -779,58 +1063,45 @@ class Item:
 
     def do_datetime(self, token):
         # Process datetime token
-        print(f"Processing datetime token: {token}")
         try:
-            datetime_str = re.sub("^@. ", "", token)
+            datetime_str = AT_KEY_PATTERN.sub("", token)
             datetime_obj = parse(datetime_str)
-            self.dtstart = datetime_obj
             return True, datetime_obj, []
         except ValueError as e:
             return False, f"Invalid datetime: {datetime_str}. Error: {e}", []
 
     def do_rrule(self, token):
         # Process rrule token
-        print(f"Processing rrule token: {token}")
         parts = self._sub_tokenize(token)
-        print(f"do_rrule {parts = }")
         if len(parts) < 1:
             return False, f"Missing rrule frequency: {token}", []
         elif parts[0][1] not in self.freq_map:
             keys = ", ".join([f"{k}: {v}" for k, v in self.freq_map.items()])
             return (
                 False,
-                f"'{parts[1]}', is not one of the supported frequencies from: \n   {keys}",
+                f"'{parts[0][1]}', is not one of the supported frequencies from: \n   {keys}",
                 [],
             )
         freq = self.freq_map[parts[0][1]]
+        # DTSTART is added from the @s token by _assemble
         rrule_params = {"FREQ": freq}
-        if self.dtstart:
-            rrule_params["DTSTART"] = self.dtstart.strftime("%Y%m%dT%H%M%S")
 
         # Collect & tokens that follow @r
         sub_tokens = self._extract_sub_tokens(token, "&")
 
-        self.rrule_tokens.append((token, rrule_params))
-        print(f"{self.rrule_tokens = }")
         return True, rrule_params, sub_tokens
 
     def do_job(self, token):
         # Process journal token
-        print(f"Processing job token: {token}")
         node, summary, tokens_remaining = self._extract_job_node_and_summary(token)
-        print(f"{node = }; {summary = }; {tokens_remaining = }")
-        parts = self._sub_tokenize(tokens_remaining)
-        print(f"do_job {parts = }")
+        parts = self._sub_tokenize(tokens_remaining) if tokens_remaining else []
         # if len(parts) < 1:
         #     return False, f"Missing job subject: {token}", []
-        print(f"job parts = {parts}")
 
         job_params = {"j": summary}
 
         for part in parts:
-            print(f"processing part: {part}")
             key, *value = part
-            print(f"processing key: {key}, value: {value}")
             k = key[1]
             v = " ".join(value)
             job_params[k] = v
@@ -842,9 +1113,6 @@ class Item:
         # Collect & tokens that follow @j
         # sub_tokens = self._extract_sub_tokens(token, '&')
         sub_tokens = []
-        # self.job_tokens.append((token, job_params))
-        self.job_tokens.append((token, job_params))
-        print(f"returning {job_params = }; {sub_tokens = }")
         return True, job_params, []
 
     def _extract_sub_tokens(self, token, delimiter):
@@ -854,10 +1122,12 @@ class Item:
         return matches
 
     def do_at(self):
-        print(f"TODO: do_at() -> show available @ tokens")
+        # TODO: show available @ tokens
+        pass
 
     def do_amp(self):
-        print(f"TODO: do_amp() -> show available & tokens")
+        # TODO: show available & tokens
+        pass
 
     @classmethod
     def do_weekdays(cls, wkd_str: str):
@@ -865,20 +1135,15 @@ class Item:
         Converts a string representation of weekdays into a list of rrule objects.
         """
         wkd_str = wkd_str.upper()
-        wkd_regex = r"(?<![\w-])([+-][1-4])?(MO|TU|WE|TH|FR|SA|SU)(?!\w)"
-        print(f"in do_weekdays with wkd_str = |{wkd_str}|")
-        matches = re.findall(wkd_regex, wkd_str)
-        _ = [f"{x[0]}{x[1]}" for x in matches]
+        matches = WEEKDAY_PATTERN.findall(wkd_str)
+        _ = {f"{x[0]}{x[1]}" for x in matches}
         all = [x.strip() for x in wkd_str.split(",")]
         bad = [x for x in all if x not in _]
         problem_str = ""
         problems = []
-        print(f"{all = }, {bad = }")
         for x in bad:
             probs = []
-            print(f"splitting {x}")
             i, w = cls.split_int_str(x)
-            print(f"{x = }, i = |{i}|, w = |{w}|")
             if i is not None:
                 abs_i = abs(int(i))
                 if abs_i > 4 or abs_i == 0:
@@ -907,6 +1172,24 @@ class Item:
         else:
             return True, f"BYDAY={good_str}"
 
+    @classmethod
+    def do_quota(cls, token):
+        """
+        Process the quota of a goal, e.g., "@q 3" for 3 completions a week
+        indefinitely or "@q 3, 5" for 5 weeks, as (quota, weeks), with weeks
+        None if indefinite. A zero quota ends the goal and a negative one
+        makes it inactive.
+        """
+        arg = AT_KEY_PATTERN.sub("", token.strip())
+        ok, res = cls.integer_list(arg, None, None, True, "quota")
+        if not ok:
+            return False, res, []
+        if len(res) == 1:
+            return True, (res[0], None), []
+        if len(res) == 2 and res[1] > 0:
+            return True, (res[0], res[1]), []
+        return False, f"quota: expects a quota and a positive number of weeks, not {arg}", []
+
     def do_interval(cls, arg: int):
         """
         Process an integer interval as the rrule frequency.
@@ -925,9 +1208,6 @@ class Item:
         """
         Process a comma separated list of integer month numbers from 1, 2, ..., 12
         """
-        monthsstr = (
-            "months: a comma separated list of integer month numbers from 1, 2, ..., 12"
-        )
         if arg:
             args = arg.split(",")
             ok, res = cls.integer_list(args, 0, 12, False, "")
@@ -936,10 +1216,10 @@ class Item:
                 rep = f"{arg}"
             else:
                 obj = None
-                rep = f"invalid months: {res}. Required for {monthsstr}"
+                rep = f"invalid months: {res}. Required for {MONTHS_USAGE}"
         else:
             obj = None
-            rep = monthsstr
+            rep = MONTHS_USAGE
         if obj is None:
             return False, rep
 
@@ -1035,7 +1315,7 @@ class Item:
 
     @classmethod
     def split_int_str(cls, s):
-        match = re.match(r"^([+-]?\d*)(.{1,})$", s)
+        match = INT_STR_PATTERN.match(s)
         if match:
             integer_part = match.group(1)
             string_part = match.group(2)
@@ -1047,9 +1327,7 @@ class Item:
 
     def do_rdate(self, token):
         # Process rdate token
-        print(f"Processing rdate token: {token}")
-        parts = re.sub("^@. ", "", token)
-        print(f"rdate {parts = }")
+        parts = AT_KEY_PATTERN.sub("", token)
         try:
             dates = [parse(dt) for dt in parts.split(",")]
             return True, dates, []
@@ -1058,9 +1336,7 @@ class Item:
 
     def do_exdate(self, token):
         # Process exdate token
-        print(f"Processing exdate token: {token}")
-        parts = re.sub("^@. ", "", token)
-        print(f"exdate {parts = }")
+        parts = AT_KEY_PATTERN.sub("", token)
         try:
             dates = [parse(dt) for dt in parts.split(",")]
             return True, dates, []
@@ -1146,13 +1422,11 @@ class Item:
 
         components = []
         rruleset_str = ""
-        print(
-            f"finalizing rruleset using {self.parse_ok = }, {len(self.rrule_tokens) = }; {len(components) = }; {len(rruleset_str) = }"
-        )
         for token in self.rrule_tokens:
             rule_parts = []
             _, rrule_params = token
-            print(f"finalizing rrule {token = }:  {_ = } with {rrule_params = }")
+            # the params are kept by the token table
+            rrule_params = dict(rrule_params)
             dtstart = rrule_params.pop("DTSTART", None)
             if dtstart:
                 components.append(f"DTSTART:{dtstart}")
@@ -1172,140 +1446,57 @@ class Item:
 
         if self.rdates:
             rdates = ",".join([x.strftime("%Y%m%dT%H%M%S") for x in self.rdates])
-            print(f"appending {rdates = }")
             components.append(f"RDATE:{rdates}")
 
         if self.exdates:
             exdates = ",".join([x.strftime("%Y%m%dT%H%M%S") for x in self.exdates])
-            print(f"appending {exdates = }")
             components.append(f"EXDATE:{exdates}")
 
-        rruleset_str = "\n".join(components)
+        # the same schedule gives the same string, whatever the order of its
+        # tokens and &-keys
+        rruleset_str = canonical_rruleset("\n".join(components))
         self.item["rruleset"] = rruleset_str
         self.item["r"] = self.rrule_to_entry(rruleset_str.rstrip())
-
-        # must reset these to avoid duplicates
-        self.rrule_tokens = []
-        self.rdates = []
-        self.exdates = []
         return True, rruleset_str
 
     def finalize_jobs(self):
         """
-        Format combined task subject and job subject
+        Set the status of each job from the JobGraph of the jobs and format
+        its subject with its location and the numbers of available, waiting
+        and finished jobs. If the outline of the jobs is that of the previous
+        call, only the jobs finished or reopened since are applied to its
+        graph.
         """
-        jobs = self.jobs
-        if not jobs:
+        if not self.jobs:
             return False, "No jobs to process"
         if not self.parse_ok:
             return False, "Error parsing tokens"
-        # available / waiting / completed
-        # completed if 'f' in item
 
-        subject = self.item["subject"]
-        job_hsh = {}
-
-        job_hsh = {i: x for i, x in enumerate(jobs)}
-
-        # finished = [i for i, x in enumerate(jobs) if "f" in x]
-        finished = set()
-        waiting = []
-        available = []
-        prereqs = {}
-        branch = []
-        branches = []
-        current_node = 0
-        job_names = {}
-        last_job_number = 0
-        last_job = {}
-        for i, job in job_hsh.items():
-            last_job_number = i
-            last_job = job
-            job_names[i] = job["j"]
-            if "f" in job:
-                finished.add(i)
-            if "node" in job:
-                if job["node"] > 0 and len(branch) > job["node"]:
-                    branches.append(branch)
-                    branch = branch[: job["node"]]
-                branch.append(i)
-
-        if "node" in last_job:
-            branch = branch[: last_job["node"]]
-            # prereqs[i] = branch
-            branch.append(last_job_number)
-            branches.append(branch)
-            branch = []
-
-        all = set()
-        if branches:
-            # available_names = set()
-            # waiting_names = set()
-            prereqs = {}
-            for branch in branches:
-                print(f"branch = {branch}")
-                for _ in branch:
-                    all.add(_)
-                # leaf = branch[-1]
-                for position, i in enumerate(branch):
-                    branch_tail = branch[position + 1 :]
-                    if branch_tail:
-                        prereqs.setdefault(i, set())
-                        for j in branch_tail:
-                            prereqs[i].add(j)
-        print(f"\n\n{all = }\n\n{prereqs = }\n\n{waiting = }")
-
-        for j, req in prereqs.items():
-            prereqs[j] = req - finished
-
-        print("\n\n{prereqs = }\n\n{available = }\n\n{waiting = }")
-
-        available = set()
-        waiting = set()
-        for j in all:
-            if j in prereqs:
-                if prereqs[j]:
-                    waiting.add(j)
-                else:
-                    available.add(j)
-            elif j not in finished:
-                available.add(j)
-
-        status = f"{len(available)}/{len(waiting)}/{len(finished)}"
-        jobs = []
-
-        for i, job in job_hsh.items():
-            if i in finished:
-                job["itemtype"] = "x"
-            elif i in waiting:
-                job["itemtype"] = "+"
-            elif i in available:
-                job["itemtype"] = "-"
-            else:
-                job["itemtype"] = "?"
+        # copies, since the jobs are kept by the token table
+        jobs = [dict(job) for job in self.jobs]
+        nodes = [job.get("node", 0) for job in jobs]
+        finished = {i for i, job in enumerate(jobs) if "f" in job}
+        graph = self.job_graph
+        if graph is not None and nodes == self.job_nodes:
+            for i in graph.finished - finished:
+                graph.reopen(i)
+            for i in finished - graph.finished:
+                graph.finish(i)
+        else:
+            graph = self.job_graph = JobGraph.from_nodes(nodes, finished)
+            self.job_nodes = nodes
+
+        status = graph.summary
+        for i, job in enumerate(jobs):
+            job["status"] = graph.status(i)
+            job["itemtype"] = JOB_ITEMTYPES[job["status"]]
+            job["parent"] = graph.parents[i]
             loc = job.get("l", "")
             loc = f" ({loc}) " if loc else " "
             job["subject"] = f"{job['j']}{loc}{status}"
             job["i"] = i
-            jobs.append(job)
-
-        # jobs_names = []
-        #
-        # for i, job in job_hsh.items():
-        #     if i in available:
-        #         job_names["itemtype"] = "-"
-        #     elif i in waiting:
-        #         job["itemtype"] = "+"
-        #     elif i in finished:
-        #         job["itemtype"] = "x"
-        #     else:
-        #         job["itemtype"] = "?"
-        #     job["subject"] = f"{job['j']}: {subject} {status}"
-        #     job["i"] = i
-        #     jobs.append(job)
 
         self.item["j"] = jobs
-        print(f"\n\n{prereqs = }\n\n{available = }\n\n{waiting = }")
         return True, jobs
 
 
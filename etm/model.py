@@ -1,6 +1,12 @@
+import functools
+import json
+import math
 import os
 import sqlite3
-from typing import Optional
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, NamedTuple, Optional, Union
 
 # from bisect import bisect_left, bisect_right
 # from collections import defaultdict
@@ -17,15 +23,66 @@ from .shared import (
     duration_in_words,
     datetime_in_words,
 )
+from .instrument import instrumentation, timed, InstrumentedCursor
+from .query import FIND_WORD_REGEX, HAS_COLUMNS, FindQuery, parse_find_query
+from .rruleset import canonical_rruleset, rruleset_hash
+from .item import JobGraph
 
 import re
 
 
+# Maximum number of patterns whose matchers are kept by regexp_matcher
+REGEXP_CACHE_SIZE = 256
+
+REGEX_SPECIAL = frozenset(".^$*+?{}[]|()")
+
+
+def literal_text(pattern: str) -> Optional[str]:
+    """
+    Return the text matched by pattern if it matches only that text, e.g.,
+    "a\\.b" -> "a.b", and None if pattern uses any other regex syntax.
+    """
+    chars = []
+    escaped = False
+    for char in pattern:
+        if escaped:
+            if char.isalnum():
+                # a class or an anchor such as \d or \b
+                return None
+            chars.append(char)
+            escaped = False
+        elif char == "\\":
+            escaped = True
+        elif char in REGEX_SPECIAL:
+            return None
+        else:
+            chars.append(char)
+    return None if escaped else "".join(chars)
+
+
+@functools.lru_cache(maxsize=REGEXP_CACHE_SIZE)
+def regexp_matcher(pattern: str) -> Callable[[str], bool]:
+    """
+    Return a function testing whether a string contains a match for pattern.
+    Literal patterns, optionally case-insensitive with a leading (?i), become
+    substring tests and others are compiled once.
+    """
+    ignore_case = pattern.startswith("(?i)")
+    literal = literal_text(pattern[4:] if ignore_case else pattern)
+    if literal is not None:
+        if ignore_case:
+            literal = literal.lower()
+            return lambda value: literal in value.lower()
+        return lambda value: literal in value
+    search = re.compile(pattern).search
+    return lambda value: search(value) is not None
+
+
 def regexp(pattern, value):
-    try:
-        return re.search(pattern, value) is not None
-    except TypeError:
+    """The SQLite REGEXP function: True if value contains a match for pattern."""
+    if not isinstance(value, str):
         return False  # Handle None values gracefully
+    return regexp_matcher(pattern)(value)
 
 
 # Constants for busy bar rendering
@@ -40,28 +97,277 @@ def regexp(pattern, value):
 
 DEFAULT_LOG_FILE = "log_msg.md"
 
+# Maximum number of Records rows kept in DatabaseManager.record_cache
+RECORD_CACHE_SIZE = 1024
+
+# Adds a record from the row returned by record_row
+RECORD_INSERT = """
+INSERT INTO Records (type, name, details, rrulestr, rrulehash, extent, alerts, location)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+# Maximum number of schedules whose occurrences are kept by rruleset_occurrences
+OCCURRENCES_CACHE_SIZE = 128
+
+# The order of the states of goals in get_goal_status
+GOAL_STATES = ("active", "inactive", "ended")
+
+# The text that RecordsFTS matches exactly, see fts_covers
+FTS_PLAIN_REGEX = re.compile(r"[^\W_]+(?:\s+[^\W_]+)*")
+
+# The Records columns used for the details of a record
+RECORD_DETAIL_COLUMNS = "id, type, name, details, rrulestr, extent"
+
+# The full-text index over Records used by find_records. It is an external
+# content table, so it stores only the index, and the triggers keep it in step
+# with Records. Prefix indexes make short prefix queries fast.
+FTS_TABLE = """
+CREATE VIRTUAL TABLE IF NOT EXISTS RecordsFTS USING fts5(
+    name, details, location,
+    content='Records', content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+)
+"""
+
+FTS_TRIGGERS = [
+    """
+    CREATE TRIGGER IF NOT EXISTS RecordsFTS_insert AFTER INSERT ON Records BEGIN
+        INSERT INTO RecordsFTS (rowid, name, details, location)
+        VALUES (new.id, new.name, new.details, new.location);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS RecordsFTS_delete AFTER DELETE ON Records BEGIN
+        INSERT INTO RecordsFTS (RecordsFTS, rowid, name, details, location)
+        VALUES ('delete', old.id, old.name, old.details, old.location);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS RecordsFTS_update
+    AFTER UPDATE OF name, details, location ON Records BEGIN
+        INSERT INTO RecordsFTS (RecordsFTS, rowid, name, details, location)
+        VALUES ('delete', old.id, old.name, old.details, old.location);
+        INSERT INTO RecordsFTS (rowid, name, details, location)
+        VALUES (new.id, new.name, new.details, new.location);
+    END
+    """,
+]
+
+
+def record_row(record_type, name, details, rrstr, extent, alerts, location) -> Tuple:
+    """
+    Return the RECORD_INSERT parameters for the arguments of add_record, with
+    rrstr in canonical form and its hash.
+    """
+    canonical = canonical_rruleset(rrstr or "")
+    return (
+        record_type,
+        name,
+        details,
+        canonical,
+        rruleset_hash(canonical),
+        extent,
+        alerts,
+        location,
+    )
+
+
+@functools.lru_cache(maxsize=OCCURRENCES_CACHE_SIZE)
+def rruleset_occurrences(
+    rule_str: str, start_date: datetime, end_date: datetime
+) -> Tuple[datetime, ...]:
+    """
+    Return the occurrences of rule_str from start_date through end_date. Records
+    with the same canonical rrulestr share the result.
+    """
+    rule = rrulestr(rule_str, dtstart=start_date)
+    return tuple(rule.between(start_date, end_date, inc=True))
+
+
+def occurrence_spans(
+    occurrences: Iterable[datetime], extent: int
+) -> List[Tuple[datetime, datetime]]:
+    """
+    Return (start_dt, end_dt) pairs for occurrences lasting extent minutes,
+    split at midnight into a pair for each day.
+    """
+    results = []
+    for start_dt in occurrences:
+        end_dt = start_dt + timedelta(minutes=extent) if extent else start_dt
+        while start_dt.date() != end_dt.date():
+            day_end = datetime.combine(start_dt.date(), datetime.max.time())
+            results.append((start_dt, day_end))
+            start_dt = datetime.combine(
+                start_dt.date() + timedelta(days=1), datetime.min.time()
+            )
+        results.append((start_dt, end_dt))
+    return results
+
+
+class GoalStatus(NamedTuple):
+    """The status of a goal in the current week, see get_goal_status."""
+
+    record_id: int
+    name: str
+    quota: int
+    done: int
+    needed: int
+    average: float
+    state: str
+
+
+def bitmap_bytes(bitmap: int) -> Optional[bytes]:
+    """Return bitmap as little-endian bytes, or None if it is 0."""
+    if not bitmap:
+        return None
+    return bitmap.to_bytes((bitmap.bit_length() + 7) // 8, "little")
+
+
+def fts_covers(text: str) -> bool:
+    """
+    True if the FTS5 terms of text match just what text does: its words, as
+    prefixes, separated only by spaces. Otherwise, e.g., for "C++" or "10:30",
+    the terms only narrow the records, which are then tested for text itself.
+    """
+    return FTS_PLAIN_REGEX.fullmatch(text) is not None
+
+
+def fts_terms(text: str) -> List[str]:
+    """Return FTS5 prefix queries for the words of text."""
+    return [f'"{word}"*' for word in FIND_WORD_REGEX.findall(text)]
+
+
+def fts_query(query: FindQuery) -> Optional[str]:
+    """
+    Return an FTS5 query for the words, phrases and locations of query: a word
+    beginning with each of the words, each phrase, and a word beginning with
+    each of the words of the locations in the location column. None if there
+    are none with word characters.
+    """
+    terms = []
+    for word in query.words:
+        terms.extend(fts_terms(word))
+    for phrase in query.phrases:
+        words = FIND_WORD_REGEX.findall(phrase)
+        if words:
+            terms.append(f'"{" ".join(words)}"')
+    for location in query.locations:
+        words = fts_terms(location)
+        if words:
+            terms.append(f"location : ({' '.join(words)})")
+    # FTS5 needs an explicit AND before a column filter with parentheses
+    return " AND ".join(terms) if terms else None
+
+
+def as_find_query(
+    query: Union[str, FindQuery], regex: Optional[str] = None
+) -> FindQuery:
+    """Return query, parsed if a string, with regex added to its regexes."""
+    if isinstance(query, str):
+        query = parse_find_query(query)
+    if regex:
+        query = query._replace(regexes=query.regexes + (regex,))
+    return query
+
+
+class RecordCache:
+    """
+    A bounded, least recently used cache of Records rows keyed by record id.
+    The cache is shared with the read-only managers used by worker threads,
+    so every operation holds a lock.
+    """
+
+    def __init__(self, maxsize: int = RECORD_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.rows = OrderedDict()
+        self.lock = threading.Lock()
+
+    def __contains__(self, record_id) -> bool:
+        return record_id in self.rows
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def get(self, record_id):
+        """Return the cached row for record_id, or None, marking it as recently used."""
+        with self.lock:
+            row = self.rows.get(record_id)
+            if row is not None:
+                self.rows.move_to_end(record_id)
+            return row
+
+    def put(self, record_id, row):
+        """Store row for record_id, evicting the least recently used rows if necessary."""
+        with self.lock:
+            self.rows[record_id] = row
+            self.rows.move_to_end(record_id)
+            while len(self.rows) > self.maxsize:
+                self.rows.popitem(last=False)
+
+    def invalidate(self, record_id=None):
+        """Drop the row for record_id or, if record_id is None, all rows."""
+        with self.lock:
+            if record_id is None:
+                self.rows.clear()
+            else:
+                self.rows.pop(record_id, None)
+
 
 class DatabaseManager:
-    def __init__(self, db_path, reset=False):
+    def __init__(self, db_path, reset=False, read_only=False, record_cache=None):
         """
         Initialize the database manager and optionally replace the database.
 
         Args:
             db_path (str): Path to the SQLite database file.
             replace (bool): Whether to replace the existing database.
+            read_only (bool): Open an existing database without setting it up,
+                see reader().
+            record_cache (RecordCache): A record cache to share.
         """
         self.db_path = db_path
-        if reset and os.path.exists(db_path):
-            os.remove(db_path)
-        self.conn = sqlite3.connect(self.db_path)
+        self.read_only = read_only
+        self.record_cache = record_cache if record_cache is not None else RecordCache()
+        # True when records may lack datetimes, see extend_datetimes_for_weeks
+        self.pending_records = not read_only
+        if read_only:
+            # the connection is made here but used only by the worker thread;
+            # as_uri escapes "#", "?" and "%" in the path
+            self.conn = sqlite3.connect(
+                Path(db_path).resolve().as_uri() + "?mode=ro",
+                uri=True,
+                check_same_thread=False,
+            )
+        else:
+            if reset and os.path.exists(db_path):
+                os.remove(db_path)
+            self.conn = sqlite3.connect(self.db_path)
         self.cursor = self.conn.cursor()
-        self.conn.create_function("REGEXP", 2, regexp)
+        if instrumentation.enabled:
+            self.cursor = InstrumentedCursor(self.cursor, instrumentation)
+        self.conn.create_function("REGEXP", 2, regexp, deterministic=True)
+        if read_only:
+            self.has_fts = self._table_exists("RecordsFTS")
+            return
         self.setup_database()
         yr, wk = datetime.now().isocalendar()[:2]
         log_msg(f"Generating weeks for 12 weeks starting from {yr} week number {wk}")
         self.extend_datetimes_for_weeks(yr, wk, 12)
         self.populate_alerts()
 
+    def reader(self) -> "DatabaseManager":
+        """
+        Return a manager for the same database with its own read-only connection
+        and this manager's record cache, for use by a single worker thread.
+        Writing through it raises sqlite3.OperationalError.
+        """
+        return DatabaseManager(
+            self.db_path, read_only=True, record_cache=self.record_cache
+        )
+
+    def close(self):
+        self.conn.close()
+
     def setup_database(self):
         """
         Set up the SQLite database schema.
@@ -73,6 +379,7 @@ class DatabaseManager:
             name TEXT NOT NULL,
             details TEXT,
             rrulestr TEXT,
+            rrulehash TEXT,
             extent INTEGER,
             alerts TEXT,
             location TEXT,
@@ -89,6 +396,15 @@ class DatabaseManager:
         )
         """)
 
+        # the last and next instances of a record for find_records
+        self.setup_unique_instances()
+
+        # the instances in a period, for get_events_for_period and the date
+        # range of find_records
+        self.cursor.execute("""
+        CREATE INDEX IF NOT EXISTS DateTimes_start ON DateTimes (start_datetime)
+        """)
+
         self.cursor.execute("""
         CREATE TABLE IF NOT EXISTS GeneratedWeeks (
             start_year INTEGER,
@@ -110,21 +426,184 @@ class DatabaseManager:
                 FOREIGN KEY (record_id) REFERENCES Records(id) ON DELETE CASCADE
             )
         """)
+        # the jobs of the records of tasks with their status, see insert_jobs
+        self.cursor.execute("""
+        CREATE TABLE IF NOT EXISTS Jobs (
+            record_id INTEGER NOT NULL,
+            job_index INTEGER NOT NULL,
+            name TEXT NOT NULL,
+            parent INTEGER,
+            unfinished INTEGER NOT NULL,
+            status TEXT CHECK(status IN ('available', 'waiting', 'finished')) NOT NULL,
+            location TEXT,
+            prereqs BLOB,
+            PRIMARY KEY (record_id, job_index),
+            FOREIGN KEY (record_id) REFERENCES Records (id) ON DELETE CASCADE
+        )
+        """)
+        # the available jobs at a location, see get_available_jobs
+        self.cursor.execute("""
+        CREATE INDEX IF NOT EXISTS Jobs_status_location ON Jobs (status, location)
+        """)
+        # foreign keys are not enforced, so the jobs of a record are deleted here
+        self.cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS Jobs_delete AFTER DELETE ON Records BEGIN
+            DELETE FROM Jobs WHERE record_id = old.id;
+        END
+        """)
+
+        # the goals of the records of goals, with the total of their
+        # completions, and their completions per week, see get_goal_status
+        self.cursor.execute("""
+        CREATE TABLE IF NOT EXISTS Goals (
+            record_id INTEGER PRIMARY KEY,
+            start_year INTEGER NOT NULL,
+            start_week INTEGER NOT NULL,
+            quota INTEGER NOT NULL,
+            weeks INTEGER,
+            total INTEGER NOT NULL DEFAULT 0,
+            FOREIGN KEY (record_id) REFERENCES Records (id) ON DELETE CASCADE
+        )
+        """)
+        self.cursor.execute("""
+        CREATE TABLE IF NOT EXISTS GoalHistory (
+            record_id INTEGER NOT NULL,
+            iso_year INTEGER NOT NULL,
+            iso_week INTEGER NOT NULL,
+            count INTEGER NOT NULL,
+            PRIMARY KEY (record_id, iso_year, iso_week),
+            FOREIGN KEY (record_id) REFERENCES Records (id) ON DELETE CASCADE
+        ) WITHOUT ROWID
+        """)
+        self.cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS Goals_delete AFTER DELETE ON Records BEGIN
+            DELETE FROM Goals WHERE record_id = old.id;
+            DELETE FROM GoalHistory WHERE record_id = old.id;
+        END
+        """)
+
+        self.setup_rrulehash()
+        self.setup_fts()
         self.conn.commit()
 
-    def add_record(self, record_type, name, details, rrstr, extent, alerts, location):
+    def _table_exists(self, name: str) -> bool:
+        self.cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (name,)
+        )
+        return self.cursor.fetchone() is not None
+
+    def setup_unique_instances(self):
+        """
+        Create DateTimes_record_start as a unique index of the instances, so
+        that generating a period again adds only the new ones. The duplicate
+        instances and the index of a database created before the index was
+        unique are dropped first.
+        """
+        self.cursor.execute(
+            "SELECT sql FROM sqlite_master WHERE type = 'index' AND name = 'DateTimes_record_start'"
+        )
+        row = self.cursor.fetchone()
+        if row is not None and "UNIQUE" in row[0].upper():
+            return
+        if row is not None:
+            self.cursor.execute("DROP INDEX DateTimes_record_start")
+        self.cursor.execute("""
+        DELETE FROM DateTimes WHERE rowid NOT IN (
+            SELECT MIN(rowid) FROM DateTimes
+            GROUP BY record_id, start_datetime, end_datetime
+        )
+        """)
+        self.cursor.execute("""
+        CREATE UNIQUE INDEX DateTimes_record_start
+        ON DateTimes (record_id, start_datetime, end_datetime)
+        """)
+
+    def add_missing_columns(self, table: str, columns: Dict[str, str]):
+        """
+        Add the columns, names with their types, that table, created by an
+        earlier version, lacks.
+        """
+        self.cursor.execute(f"PRAGMA table_info({table})")
+        existing = {row[1] for row in self.cursor.fetchall()}
+        for name, column_type in columns.items():
+            if name not in existing:
+                self.cursor.execute(f"ALTER TABLE {table} ADD COLUMN {name} {column_type}")
+
+    def setup_rrulehash(self):
+        """
+        Add the rrulehash column to a Records table created without it, put
+        the rrulestr of the records without a hash in canonical form with its
+        hash, and index the hashes, which identify the records with the same
+        schedule.
+        """
+        self.add_missing_columns("Records", {"rrulehash": "TEXT"})
+        self.cursor.execute(
+            "SELECT id, rrulestr FROM Records WHERE rrulehash IS NULL AND rrulestr <> ''"
+        )
+        updates = []
+        for record_id, rrstr in self.cursor.fetchall():
+            canonical = canonical_rruleset(rrstr)
+            updates.append((canonical, rruleset_hash(canonical), record_id))
+        if updates:
+            self.cursor.executemany(
+                "UPDATE Records SET rrulestr = ?, rrulehash = ? WHERE id = ?", updates
+            )
+            self.invalidate_record()
+        self.cursor.execute(
+            "CREATE INDEX IF NOT EXISTS Records_rrulehash ON Records (rrulehash)"
+        )
+
+    def setup_fts(self):
         """
-        Add a new record to the database.
+        Create the RecordsFTS full-text index and its triggers, indexing the
+        existing records if the index is new. has_fts is False if SQLite was
+        built without FTS5, in which case find_records scans Records instead.
+        """
+        is_new = not self._table_exists("RecordsFTS")
+        try:
+            self.cursor.execute(FTS_TABLE)
+        except sqlite3.OperationalError as e:
+            log_msg(f"Full-text search is not available: {e}")
+            self.has_fts = False
+            return
+        for trigger in FTS_TRIGGERS:
+            self.cursor.execute(trigger)
+        if is_new:
+            self.cursor.execute("INSERT INTO RecordsFTS (RecordsFTS) VALUES ('rebuild')")
+        self.has_fts = True
+
+    def add_record(
+        self,
+        record_type,
+        name,
+        details,
+        rrstr,
+        extent,
+        alerts,
+        location,
+        jobs=None,
+        goal=None,
+    ):
+        """
+        Add a new record to the database, with jobs, the jobs returned by
+        Item.finalize_jobs, and goal, the (start, quota, weeks) of a goal, if
+        given.
         """
         # log_msg(
         #     f"Adding record: {record_type = } {name = } {details = } {rrstr = } {extent = } {alerts = } {location = }"
         # )
         self.cursor.execute(
-            "INSERT INTO Records (type, name, details, rrulestr, extent, alerts, location) VALUES (?, ?, ?, ?, ?, ?, ?)",
-            (record_type, name, details, rrstr, extent, alerts, location),
+            RECORD_INSERT,
+            record_row(record_type, name, details, rrstr, extent, alerts, location),
         )
         new_record_id = self.cursor.lastrowid  # Retrieve the new record ID
+        if jobs:
+            self.insert_jobs(new_record_id, jobs, location)
+        if goal:
+            self.set_goal(new_record_id, *goal)
         self.conn.commit()
+        self.invalidate_record(new_record_id)
+        self.pending_records = True
         log_msg(f"Added record {name} with ID {new_record_id}.")
         return new_record_id  # Return the ID to the caller
 
@@ -139,6 +618,323 @@ class DatabaseManager:
         #     )
         #     self.conn.commit()
 
+    def add_records(self, records: Iterable[Tuple]) -> List[int]:
+        """
+        Add records, each a tuple of the arguments of add_record, in a single
+        transaction and return their ids. If one of them cannot be added, none
+        of them is.
+        """
+        ids = []
+        try:
+            for record in records:
+                self.cursor.execute(RECORD_INSERT, record_row(*record[:7]))
+                ids.append(self.cursor.lastrowid)
+                if len(record) > 7 and record[7]:
+                    self.insert_jobs(ids[-1], record[7], record[6])
+                if len(record) > 8 and record[8]:
+                    self.set_goal(ids[-1], *record[8])
+            self.conn.commit()
+        except sqlite3.Error:
+            self.conn.rollback()
+            raise
+        if ids:
+            for record_id in ids:
+                self.invalidate_record(record_id)
+            self.pending_records = True
+            log_msg(f"Added {len(ids)} records with IDs {ids[0]} to {ids[-1]}.")
+        return ids
+
+    def insert_jobs(self, record_id, jobs, location=""):
+        """
+        Insert jobs, the jobs returned by Item.finalize_jobs, as the jobs of
+        record_id, with the counts of their unfinished descendants and the
+        bitmaps of their prerequisites, see JobGraph.prerequisites. A job
+        without a location of its own has location, that of the task. The
+        caller commits.
+        """
+        graph = JobGraph(
+            [job["parent"] for job in jobs],
+            {job["i"] for job in jobs if job["status"] == "finished"},
+        )
+        prereqs = graph.prerequisites()
+        self.cursor.executemany(
+            """
+            INSERT INTO Jobs (record_id, job_index, name, parent, unfinished, status,
+                location, prereqs)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            [
+                (
+                    record_id,
+                    job["i"],
+                    job["j"],
+                    job["parent"],
+                    graph.unfinished[job["i"]],
+                    job["status"],
+                    job.get("l") or location or "",
+                    bitmap_bytes(prereqs[job["i"]]),
+                )
+                for job in jobs
+            ],
+        )
+
+    def get_available_jobs(self, location=None) -> List[Tuple[int, int, str, str, str]]:
+        """
+        Retrieve the available jobs, only those at location if given, from
+        Jobs_status_location.
+
+        Returns:
+            List[Tuple[int, int, str, str, str]]: List of tuples containing
+                record ID, job index, task name, job name and location,
+                ordered by location.
+        """
+        where = "j.status = 'available'"
+        params = ()
+        if location is not None:
+            where += " AND j.location = ?"
+            params = (location,)
+        self.cursor.execute(
+            f"""
+            SELECT j.record_id, j.job_index, r.name, j.name, j.location
+            FROM Jobs j
+            JOIN Records r ON r.id = j.record_id
+            WHERE {where}
+            ORDER BY j.location, r.name, j.job_index
+            """,
+            params,
+        )
+        return self.cursor.fetchall()
+
+    def finish_job(self, record_id, job_index) -> List[int]:
+        """
+        Finish a job of record_id and return the indexes of the jobs that
+        became available. Only the counts of its ancestors are updated, see
+        JobGraph.finish.
+        """
+        key = "record_id = ? AND job_index = ?"
+        self.cursor.execute(
+            f"SELECT parent, status FROM Jobs WHERE {key}", (record_id, job_index)
+        )
+        row = self.cursor.fetchone()
+        if row is None or row[1] == "finished":
+            return []
+        self.cursor.execute(
+            f"UPDATE Jobs SET status = 'finished' WHERE {key}", (record_id, job_index)
+        )
+        available = []
+        ancestor = row[0]
+        while ancestor is not None:
+            self.cursor.execute(
+                f"UPDATE Jobs SET unfinished = unfinished - 1 WHERE {key}",
+                (record_id, ancestor),
+            )
+            self.cursor.execute(
+                f"SELECT parent, unfinished, status FROM Jobs WHERE {key}",
+                (record_id, ancestor),
+            )
+            parent, unfinished, status = self.cursor.fetchone()
+            if not unfinished and status == "waiting":
+                self.cursor.execute(
+                    f"UPDATE Jobs SET status = 'available' WHERE {key}",
+                    (record_id, ancestor),
+                )
+                available.append(ancestor)
+            ancestor = parent
+        self.conn.commit()
+        return available
+
+    def set_goal(self, record_id, start: date, quota: int, weeks: Optional[int] = None):
+        """
+        Set the goal of record_id to quota completions a week for weeks weeks,
+        indefinitely if None, from the week of start. The completions recorded
+        so far are kept. The caller commits.
+        """
+        start_year, start_week, _ = start.isocalendar()
+        self.cursor.execute(
+            """
+            INSERT INTO Goals (record_id, start_year, start_week, quota, weeks)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT (record_id) DO UPDATE SET
+                start_year = excluded.start_year,
+                start_week = excluded.start_week,
+                quota = excluded.quota,
+                weeks = excluded.weeks
+            """,
+            (record_id, start_year, start_week, quota, weeks),
+        )
+
+    def record_goal_completion(self, record_id, when: Optional[date] = None, count=1):
+        """
+        Add count completions of the goal of record_id in the week of when,
+        today if None, to its history and its total.
+        """
+        iso_year, iso_week, _ = (when or date.today()).isocalendar()
+        self.cursor.execute(
+            """
+            INSERT INTO GoalHistory (record_id, iso_year, iso_week, count)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT (record_id, iso_year, iso_week) DO UPDATE SET
+                count = count + excluded.count
+            """,
+            (record_id, iso_year, iso_week, count),
+        )
+        self.cursor.execute(
+            "UPDATE Goals SET total = total + ? WHERE record_id = ?", (count, record_id)
+        )
+        self.conn.commit()
+
+    def set_goal_history(self, record_id, history: Iterable[Tuple[int, int, int]]):
+        """
+        Set the completions of the goal of record_id in the weeks of history,
+        (iso_year, iso_week, count) tuples as in "@h 2024:17 2, 2024:18 1",
+        and recompute its total.
+        """
+        self.cursor.executemany(
+            """
+            INSERT INTO GoalHistory (record_id, iso_year, iso_week, count)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT (record_id, iso_year, iso_week) DO UPDATE SET
+                count = excluded.count
+            """,
+            [(record_id, *week) for week in history],
+        )
+        self.cursor.execute(
+            """
+            UPDATE Goals SET total = (
+                SELECT COALESCE(SUM(count), 0) FROM GoalHistory
+                WHERE GoalHistory.record_id = Goals.record_id
+            )
+            WHERE record_id = ?
+            """,
+            (record_id,),
+        )
+        self.conn.commit()
+
+    def get_goal_history(self, record_id) -> List[Tuple[int, int, int]]:
+        """Return the (iso_year, iso_week, count) of the goal of record_id."""
+        self.cursor.execute(
+            """
+            SELECT iso_year, iso_week, count FROM GoalHistory
+            WHERE record_id = ? ORDER BY iso_year, iso_week
+            """,
+            (record_id,),
+        )
+        return self.cursor.fetchall()
+
+    def get_goal_status(self, today: Optional[date] = None) -> List[GoalStatus]:
+        """
+        Return the status of every goal in the week of today, if None the
+        current date: the active goals ordered by their done/quota ratios,
+        then the inactive ones, with negative quotas, then the ended ones,
+        with zero quotas or whose weeks have passed.
+
+        The completions of the week are read from GoalHistory by its primary
+        key and the averages from the totals kept in Goals, so only one row
+        per goal is read however long its history.
+        """
+        today = today or date.today()
+        iso_year, iso_week, weekday = today.isocalendar()
+        self.cursor.execute(
+            """
+            SELECT g.record_id, r.name, g.start_year, g.start_week, g.quota,
+                g.weeks, g.total, COALESCE(h.count, 0)
+            FROM Goals g
+            JOIN Records r ON r.id = g.record_id
+            LEFT JOIN GoalHistory h ON h.record_id = g.record_id
+                AND h.iso_year = ? AND h.iso_week = ?
+            """,
+            (iso_year, iso_week),
+        )
+        monday = today - timedelta(days=weekday - 1)
+        goals = []
+        for record_id, name, start_year, start_week, quota, weeks, total, done in (
+            self.cursor.fetchall()
+        ):
+            start = date.fromisocalendar(start_year, start_week, 1)
+            elapsed = max((monday - start).days // 7 + 1, 1)
+            if weeks:
+                elapsed = min(elapsed, weeks)
+            if quota == 0 or (weeks and start + timedelta(weeks=weeks) <= monday):
+                state = "ended"
+            elif quota < 0:
+                state = "inactive"
+            else:
+                state = "active"
+            needed = (
+                max(math.ceil(quota * weekday / 7) - done, 0) if state == "active" else 0
+            )
+            goals.append(
+                GoalStatus(
+                    record_id, name, quota, done, needed, total / elapsed, state
+                )
+            )
+        goals.sort(
+            key=lambda goal: (
+                GOAL_STATES.index(goal.state),
+                goal.done / goal.quota if goal.state == "active" else 0,
+                goal.name,
+            )
+        )
+        return goals
+
+    def invalidate_record(self, record_id=None):
+        """
+        Drop record_id, or every record if record_id is None, from the record cache.
+        Every method that writes to Records should call this after committing.
+        """
+        self.record_cache.invalidate(record_id)
+
+    def get_record(self, record_id):
+        """
+        Retrieve the detail columns of a record, using the record cache when possible.
+
+        Args:
+            record_id (int): The ID of the record to retrieve.
+
+        Returns:
+            Optional[Tuple]: (id, type, name, details, rrulestr, extent) or None.
+        """
+        row = self.record_cache.get(record_id)
+        if row is not None:
+            return row
+        self.cursor.execute(
+            f"SELECT {RECORD_DETAIL_COLUMNS} FROM Records WHERE id = ?",
+            (record_id,),
+        )
+        row = self.cursor.fetchone()
+        if row is not None:
+            self.record_cache.put(record_id, row)
+        return row
+
+    def prefetch_records(self, record_ids):
+        """
+        Load the detail columns for the uncached members of record_ids into the record
+        cache using batched queries. At most record_cache.maxsize ids are loaded.
+
+        Args:
+            record_ids (Iterable[int]): The IDs of the records to load.
+        """
+        missing = []
+        seen = set()
+        for record_id in record_ids:
+            if record_id in seen or record_id in self.record_cache:
+                continue
+            seen.add(record_id)
+            missing.append(record_id)
+            if len(missing) >= self.record_cache.maxsize:
+                break
+        # stay well under SQLITE_MAX_VARIABLE_NUMBER
+        batch = 500
+        for i in range(0, len(missing), batch):
+            ids = missing[i : i + batch]
+            placeholders = ", ".join("?" for _ in ids)
+            self.cursor.execute(
+                f"SELECT {RECORD_DETAIL_COLUMNS} FROM Records WHERE id IN ({placeholders})",
+                ids,
+            )
+            for row in self.cursor.fetchall():
+                self.record_cache.put(row[0], row)
+
     def get_due_alerts(self):
         """Retrieve alerts that need execution within the next 6 seconds."""
         now = round(datetime.now().timestamp())
@@ -276,6 +1072,7 @@ class DatabaseManager:
         log_msg(f"formatted alert {alert_command = }")
         return alert_command
 
+    @timed("model.populate_alerts")
     def populate_alerts(self):
         """
         Populate the Alerts table for all records that have alerts defined.
@@ -361,6 +1158,7 @@ class DatabaseManager:
         self.conn.commit()
         log_msg("✅ Alerts table updated with today's relevant alerts.")
 
+    @timed("model.extend_datetimes_for_weeks")
     def extend_datetimes_for_weeks(self, start_year, start_week, weeks):
         """
         Extend the DateTimes table by generating data for the specified number of weeks
@@ -384,6 +1182,13 @@ class DatabaseManager:
         )
         cached_ranges = self.cursor.fetchall()
 
+        if cached_ranges and not self.pending_records:
+            first = min((row[0], row[1]) for row in cached_ranges)
+            last = max((row[2], row[3]) for row in cached_ranges)
+            if first <= (start_year, start_week) and (end_year, end_week) <= last:
+                # already generated and no records have been added since
+                return
+
         # Determine the full range that needs to be generated
         min_year = (
             min(cached_ranges, key=lambda x: x[0])[0] if cached_ranges else start_year
@@ -424,82 +1229,84 @@ class DatabaseManager:
 
         self.conn.commit()
 
+    @timed("model.generate_datetimes_for_period")
     def generate_datetimes_for_period(self, start_date, end_date):
         """
         Populate the DateTimes table with datetimes for all records within the specified range.
         For finite recurrences (e.g., COUNT, UNTIL, or RDATE), generate all datetimes and mark as processed.
 
+        The records are grouped by rrulehash, so that each schedule is expanded
+        once and its occurrences are fanned out to its records, each with its
+        own extent. Records without a schedule have no datetimes.
+
         Args:
             start_date (datetime): The start of the period.
             end_date (datetime): The end of the period.
         """
-        # Fetch all records with their rrule strings, extents, and processed state
-        self.cursor.execute("SELECT id, rrulestr, extent, processed FROM Records")
-        records = self.cursor.fetchall()
-
-        for record_id, rule_str, extent, processed in records:
-            # Replace any escaped newline characters in rrulestr
-            rule_str = rule_str.replace("\\N", "\n").replace("\\n", "\n")
+        # Fetch the records with a schedule, grouped by schedule
+        self.cursor.execute(
+            """
+            SELECT id, rrulestr, rrulehash, extent, processed FROM Records
+            WHERE rrulehash IS NOT NULL
+            """
+        )
+        schedules = {}
+        for record_id, rule_str, rule_hash, extent, processed in self.cursor.fetchall():
+            schedules.setdefault(rule_hash, (rule_str, []))[1].append(
+                (record_id, extent, processed)
+            )
 
+        instances = []
+        processed_ids = []
+        for rule_str, members in schedules.values():
             # Determine if the recurrence is finite
             is_finite = (
                 "RRULE" not in rule_str or "COUNT=" in rule_str or "UNTIL=" in rule_str
             )
-
-            # Skip already-processed finite recurrences
-            if processed == 1 and is_finite:
-                continue
+            if is_finite:
+                # Skip already-processed finite recurrences
+                members = [member for member in members if member[2] != 1]
+                if not members:
+                    continue
 
             try:
-                if is_finite:
-                    # Generate all occurrences for the entire recurrence period
-                    full_occurrences = self.generate_datetimes(
-                        rule_str, extent, datetime.min, datetime.max
-                    )
-                    for start_dt, end_dt in full_occurrences:
-                        self.cursor.execute(
-                            """
-                            INSERT OR IGNORE INTO DateTimes (record_id, start_datetime, end_datetime)
-                            VALUES (?, ?, ?)
-                            """,
-                            (
-                                record_id,
-                                int(start_dt.timestamp()),
-                                int(end_dt.timestamp()),
-                            ),
-                        )
-                    # Mark finite rules (RRULE or RDATE) as processed after all occurrences are inserted
-                    self.cursor.execute(
-                        "UPDATE Records SET processed = 1 WHERE id = ?", (record_id,)
-                    )
-                else:
-                    # Generate occurrences for the specified range for infinite rules
-                    occurrences = self.generate_datetimes(
-                        # rule_str, extent, start_date, end_date
-                        rule_str,
-                        extent,
-                        datetime.min,
-                        end_date,
-                    )
-                    for start_dt, end_dt in occurrences:
-                        self.cursor.execute(
-                            """
-                            INSERT OR IGNORE INTO DateTimes (record_id, start_datetime, end_datetime)
-                            VALUES (?, ?, ?)
-                            """,
-                            (
-                                record_id,
-                                int(start_dt.timestamp()),
-                                int(end_dt.timestamp()),
-                            ),
-                        )
-
+                # All occurrences of finite rules, those through end_date of
+                # infinite ones
+                occurrences = rruleset_occurrences(
+                    rule_str, datetime.min, datetime.max if is_finite else end_date
+                )
             except Exception as e:
+                record_ids = [member[0] for member in members]
                 log_msg(
-                    f"Error processing rrulestr for record_id {record_id}: {rule_str}\n{e}"
+                    f"Error processing rrulestr for record_ids {record_ids}: {rule_str}\n{e}"
                 )
+                continue
 
+            spans_by_extent = {}
+            for record_id, extent, _ in members:
+                spans = spans_by_extent.get(extent)
+                if spans is None:
+                    spans = spans_by_extent[extent] = [
+                        (int(start_dt.timestamp()), int(end_dt.timestamp()))
+                        for start_dt, end_dt in occurrence_spans(occurrences, extent)
+                    ]
+                instances.extend((record_id, start, end) for start, end in spans)
+                if is_finite:
+                    processed_ids.append((record_id,))
+
+        self.cursor.executemany(
+            """
+            INSERT OR IGNORE INTO DateTimes (record_id, start_datetime, end_datetime)
+            VALUES (?, ?, ?)
+            """,
+            instances,
+        )
+        # Mark finite rules (RRULE or RDATE) as processed after all occurrences are inserted
+        self.cursor.executemany(
+            "UPDATE Records SET processed = 1 WHERE id = ?", processed_ids
+        )
         self.conn.commit()
+        self.pending_records = False
 
     def generate_datetimes(self, rule_str, extent, start_date, end_date):
         """
@@ -514,24 +1321,9 @@ class DatabaseManager:
         Returns:
             List[Tuple[datetime, datetime]]: A list of (start_dt, end_dt) tuples.
         """
-        from dateutil.rrule import rrulestr
-
-        rule = rrulestr(rule_str, dtstart=start_date)
-        occurrences = list(rule.between(start_date, end_date, inc=True))
-
-        # Create (start, end) pairs
-        results = []
-        for start_dt in occurrences:
-            end_dt = start_dt + timedelta(minutes=extent) if extent else start_dt
-            while start_dt.date() != end_dt.date():
-                day_end = datetime.combine(start_dt.date(), datetime.max.time())
-                results.append((start_dt, day_end))
-                start_dt = datetime.combine(
-                    start_dt.date() + timedelta(days=1), datetime.min.time()
-                )
-            results.append((start_dt, end_dt))
-
-        return results
+        return occurrence_spans(
+            rruleset_occurrences(rule_str, start_date, end_date), extent
+        )
 
     def get_events_for_period(self, start_date, end_date):
         """
@@ -558,6 +1350,7 @@ class DatabaseManager:
         )
         return self.cursor.fetchall()
 
+    @timed("model.process_events")
     def process_events(self, start_date, end_date):
         """
         Process events and split across days for display.
@@ -668,19 +1461,174 @@ class DatabaseManager:
         )
         return self.cursor.fetchall()
 
+    def _find_clauses(self, query: FindQuery, ids: Optional[List[int]] = None):
+        """
+        Return the join and where clauses, and their parameters, selecting the
+        records r matching query for find_records, only those of ids if given.
+
+        The records are drawn from ids, else from RecordsFTS for words, phrases
+        and locations, else from DateTimes_start for a date range, else from
+        Records itself.
+        The other terms are then tested in order of cost: the type and has:
+        columns of the record, its instances in DateTimes_record_start, and
+        last the text that could not be looked up in RecordsFTS and the regexes.
+        """
+        match = fts_query(query) if self.has_fts else None
+        patterns = []
+        for text in query.words + query.phrases:
+            if match is None or not fts_covers(text):
+                # FTS5 found the records with its words, if any: test for the
+                # text itself, punctuation included
+                patterns.append(f"(?i){re.escape(text)}")
+        patterns.extend(query.regexes)
+        locations = [
+            location.lower()
+            for location in query.locations
+            if match is None or not fts_covers(location)
+        ]
+        bounds, bound_params = [], []
+        if query.after is not None:
+            bounds.append("start_datetime >= ?")
+            bound_params.append(int(query.after.timestamp()))
+        if query.before is not None:
+            bounds.append("start_datetime < ?")
+            bound_params.append(int(query.before.timestamp()))
+        in_range = " AND ".join(bounds)
+
+        candidates, conditions, params = "", [], []
+        if ids is not None:
+            # the ids are looked up in Records by its primary key, and only
+            # those records are tested
+            candidates = """
+            JOIN json_each(?) w ON w.value = r.id"""
+            params.append(json.dumps(ids))
+            if match is not None:
+                conditions.append(
+                    "r.id IN (SELECT rowid FROM RecordsFTS WHERE RecordsFTS MATCH ?)"
+                )
+                params.append(match)
+        elif match is not None:
+            # FTS5 returns the rowids in order, so the records found are in id
+            # order without sorting them and can be streamed, see iter_find_records
+            candidates = """
+            JOIN (
+                SELECT rowid FROM RecordsFTS WHERE RecordsFTS MATCH ? ORDER BY rowid
+            ) f ON f.rowid = r.id"""
+            params.append(match)
+        elif bounds:
+            # SQLite collects the ids into a sorted list and looks them up in
+            # Records, again in id order
+            conditions.append(
+                f"r.id IN (SELECT record_id FROM DateTimes WHERE {in_range})"
+            )
+            params.extend(bound_params)
+        if query.types:
+            conditions.append(f"r.type IN ({', '.join('?' * len(query.types))})")
+            params.extend(query.types)
+        for key in query.has:
+            column = HAS_COLUMNS[key]
+            conditions.append(f"r.{column} IS NOT NULL AND r.{column} != ''")
+        if (ids is not None or match is not None) and bounds:
+            conditions.append(
+                f"EXISTS (SELECT 1 FROM DateTimes d WHERE d.record_id = r.id AND {in_range})"
+            )
+            params.extend(bound_params)
+        for location in locations:
+            conditions.append("instr(lower(r.location), ?) > 0")
+            params.append(location)
+        for pattern in patterns:
+            conditions.append("(r.name REGEXP ? OR r.details REGEXP ?)")
+            params.extend([pattern, pattern])
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        return candidates, where, params
+
+    def _find_sql(self, query: FindQuery) -> Tuple[str, list]:
+        """Return the statement of iter_find_records for query and its parameters."""
+        today = int(datetime.now().timestamp())
+        candidates, conditions, params = self._find_clauses(query)
+        # the last and next instances are looked up in DateTimes_record_start
+        # for the records found only
+        sql = f"""
+            SELECT
+                r.id,
+                r.name,
+                r.details,
+                r.type,
+                (
+                    SELECT MAX(start_datetime) FROM DateTimes d
+                    WHERE d.record_id = r.id AND d.start_datetime < ?
+                ),
+                (
+                    SELECT MIN(start_datetime) FROM DateTimes d
+                    WHERE d.record_id = r.id AND d.start_datetime >= ?
+                )
+            FROM Records r
+            {candidates}
+            {conditions}
+            """
+        return sql, [today, today] + params
+
+    def iter_find_records(
+        self, query: Union[str, FindQuery] = "", batch_size: int = 500
+    ) -> Iterator[List[Tuple[int, str, str, str, Optional[int], Optional[int]]]]:
+        """
+        Yield the rows of find_records in batches of batch_size, in record id
+        order, as SQLite produces them.
+        """
+        sql, params = self._find_sql(as_find_query(query))
+        # a cursor of its own, so that the manager can be used between batches
+        cursor = self.conn.cursor()
+        if instrumentation.enabled:
+            cursor = InstrumentedCursor(cursor, instrumentation)
+        cursor.execute(sql, params)
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            yield rows
+
+    def explain_find(self, query: Union[str, FindQuery]) -> List[str]:
+        """
+        Return the lines of the statement that find_records runs for query
+        followed by its plan from EXPLAIN QUERY PLAN, each step indented under
+        its parent. A SCAN step reads every row of a table while a SEARCH step
+        looks the rows up in an index.
+        """
+        sql, params = self._find_sql(as_find_query(query))
+        lines = [line.strip() for line in sql.splitlines() if line.strip()]
+        lines.append("QUERY PLAN")
+        self.cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+        depth = {0: 0}
+        for step, parent, _, detail in self.cursor.fetchall():
+            depth[step] = depth.get(parent, 0) + 1
+            lines.append(f"{'  ' * depth[step]}{detail}")
+        return lines
+
+    @timed("model.find_records")
     def find_records(
-        self, regex: str
+        self,
+        query: Union[str, FindQuery] = "",
+        regex: Optional[str] = None,
+        within: Optional[list] = None,
     ) -> List[Tuple[int, str, str, str, Optional[int], Optional[int]]]:
         """
-        Find records whose name or details fields contain a match for the given regex,
-        including their last and next instances if they exist.
+        Find the records matching query, see query.py. Words, phrases and
+        locations are looked up in RecordsFTS, a date range in DateTimes, and
+        the remaining terms filter the records found. Without the full-text
+        index, every record is checked for the words and phrases as
+        case-insensitive substrings of their name or details.
 
         Args:
-            regex (str): The regex pattern to match.
+            query (str | FindQuery): The query, parsed by parse_find_query if a
+                string.
+            regex (str): An optional regex pattern to match in addition.
+            within (list): The result of an earlier call that found a superset
+                of these records. Only the records of within are then tested,
+                for their ids, and the rows of within that match are returned.
 
         Returns:
             List[Tuple[int, str, str, str, Optional[int], Optional[int]]]:
-                List of tuples containing:
+                List of tuples containing, in record id order:
                     - record ID
                     - name
                     - details
@@ -688,34 +1636,24 @@ class DatabaseManager:
                     - last instance datetime (or None)
                     - next instance datetime (or None)
         """
-        today = int(datetime.now().timestamp())
-        self.cursor.execute(
-            """
-            WITH
-            LastInstances AS (
-                SELECT record_id, MAX(start_datetime) AS last_datetime
-                FROM DateTimes
-                WHERE start_datetime < ?
-                GROUP BY record_id
-            ),
-            NextInstances AS (
-                SELECT record_id, MIN(start_datetime) AS next_datetime
-                FROM DateTimes
-                WHERE start_datetime >= ?
-                GROUP BY record_id
+        query = as_find_query(query, regex)
+        if within is not None:
+            candidates, conditions, params = self._find_clauses(
+                query, [row[0] for row in within]
             )
-            SELECT
-                r.id,
-                r.name,
-                r.details,
-                r.type,
-                li.last_datetime,
-                ni.next_datetime
-            FROM Records r
-            LEFT JOIN LastInstances li ON r.id = li.record_id
-            LEFT JOIN NextInstances ni ON r.id = ni.record_id
-            WHERE r.name REGEXP ? OR r.details REGEXP ?
-            """,
-            (today, today, regex, regex),
-        )
-        return self.cursor.fetchall()
+            self.cursor.execute(
+                f"SELECT r.id FROM Records r {candidates} {conditions}", params
+            )
+            ids = {row[0] for row in self.cursor.fetchall()}
+            return [row for row in within if row[0] in ids]
+        rows = []
+        for batch in self.iter_find_records(query):
+            rows.extend(batch)
+        return rows
+
+    def interrupt(self):
+        """
+        Abort the query running on this manager's connection, which then raises
+        sqlite3.OperationalError. Safe to call from another thread.
+        """
+        self.conn.interrupt()
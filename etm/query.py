@@ -0,0 +1,131 @@
+"""
+The query language of find.
+
+A find query is a list of terms separated by spaces, optionally followed by a
+regular expression between slashes. A record must match every term:
+
+    dent                  a word beginning with "dent" in its name, details or location
+    "team meeting"        the phrase in its name, details or location
+    type:-                its type is "-"; type:*- for events or available tasks
+    loc:office            a word beginning with "office" in its location
+    loc:"main office"     both words in its location
+    after:2025-01-01      an instance starting on or after the date
+    before:2025-02-01     an instance starting before the date
+    has:alert             it has alerts; also has:details and has:location
+    /^Call/               a match for the regex in its name or details
+
+With both after: and before:, a single instance must start in the range. The
+instances are those in DateTimes, i.e., in the weeks generated so far. A term
+with a key that is not listed above, e.g., "10:30", is taken as words.
+
+parse_find_query turns a query into a FindQuery, which DatabaseManager.find_records
+compiles into SQL.
+"""
+
+import re
+from datetime import datetime
+from typing import NamedTuple, Optional, Tuple
+
+# A find query: terms optionally followed by a regular expression between slashes
+FIND_QUERY_REGEX = re.compile(r"(.*?)/(.+)/\s*", re.DOTALL)
+
+# A term: an optional key followed by a quoted phrase or a word
+FIND_TERM_REGEX = re.compile(r'(?:(\w+):)?(?:"([^"]*)"?|(\S+))')
+
+# The words of a term
+FIND_WORD_REGEX = re.compile(r"\w+")
+
+# The record types accepted by type:
+RECORD_TYPES = "*-~^"
+
+# The Records column checked by each has: value
+HAS_COLUMNS = {
+    "alert": "alerts",
+    "alerts": "alerts",
+    "details": "details",
+    "location": "location",
+    "loc": "location",
+}
+
+
+class FindQuery(NamedTuple):
+    """A parsed find query, see parse_find_query."""
+
+    words: Tuple[str, ...] = ()
+    phrases: Tuple[str, ...] = ()
+    types: str = ""
+    locations: Tuple[str, ...] = ()
+    after: Optional[datetime] = None
+    before: Optional[datetime] = None
+    has: Tuple[str, ...] = ()
+    regexes: Tuple[str, ...] = ()
+
+    @property
+    def words_only(self) -> bool:
+        """True if the query has words and no other terms."""
+        return bool(self.words) and self == FindQuery(words=self.words)
+
+
+def parse_date(key: str, value: str) -> datetime:
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"{key}: expects a date such as 2025-01-01, not {value!r}")
+
+
+def parse_find_query(search_str: str) -> FindQuery:
+    """
+    Parse search_str into a FindQuery, e.g.,
+
+        'type:- loc:office "call back" /Dr\\.? Smith/'
+        -> FindQuery(phrases=("call back",), types="-", locations=("office",),
+                     regexes=("Dr\\.? Smith",))
+
+    Raises ValueError for a type:, after:, before: or has: term with an
+    invalid value.
+    """
+    match = FIND_QUERY_REGEX.fullmatch(search_str)
+    terms, regex = (search_str, None) if match is None else match.groups()
+    words, phrases, locations, has = [], [], [], []
+    types, after, before = "", None, None
+    for term in FIND_TERM_REGEX.finditer(terms):
+        key, quoted, word = term.groups()
+        value = quoted if quoted is not None else word
+        if key is None:
+            if quoted is not None:
+                if quoted.strip():
+                    phrases.append(quoted.strip())
+            else:
+                words.append(word)
+        elif key == "type":
+            invalid = set(value) - set(RECORD_TYPES)
+            if invalid or not value:
+                raise ValueError(
+                    f"type: expects one or more of {RECORD_TYPES}, not {value!r}"
+                )
+            types += "".join(t for t in value if t not in types)
+        elif key == "loc":
+            if value.strip():
+                locations.append(value.strip())
+        elif key == "after":
+            after = parse_date(key, value)
+        elif key == "before":
+            before = parse_date(key, value)
+        elif key == "has":
+            if value not in HAS_COLUMNS:
+                raise ValueError(
+                    f"has: expects one of {', '.join(HAS_COLUMNS)}, not {value!r}"
+                )
+            has.append(value)
+        else:
+            words.append(term.group(0))
+    return FindQuery(
+        words=tuple(words),
+        phrases=tuple(phrases),
+        types=types,
+        locations=tuple(locations),
+        after=after,
+        before=before,
+        has=tuple(has),
+        regexes=(regex,) if regex else (),
+    )
@@ -0,0 +1,253 @@
+"""
+Row sources for the scrollable lists of the Textual view.
+
+A row source provides the markup strings displayed by a ScrollableList or a
+FullScreenList without requiring them to exist as a list:
+
+    len(source)              the number of rows
+    source.get(range(i, j))  the markup strings for rows i to j - 1
+
+ListRows wraps an existing list. PagedRows produces rows a page at a time from
+a fetch(offset, limit) callable, keeping only the most recently used pages, so
+that a list of any length opens after formatting a single page and the memory
+used for formatted rows stays proportional to what has been viewed recently.
+
+Rows whose layout depends on the width of the list are produced as Row tuples,
+which leave the truncation and padding of one column to Row.fit, and wrapped
+in FittedRows. A view calls set_width() when its width changes and FittedRows
+fits each row as it is requested, caching the results by width, so resizing
+neither queries the database nor formats the rows again.
+"""
+
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Callable, Dict, Iterator, List, NamedTuple, Tuple, Union
+
+from rich.cells import cell_len, set_cell_size
+from rich.markup import RE_TAGS
+
+from .common import EtmChar
+
+# Rows formatted by each call to PagedRows.fetch
+PAGE_SIZE = 200
+
+# Number of formatted pages kept by PagedRows
+MAX_PAGES = 8
+
+# Rows requested at a time when iterating over a row source
+CHUNK_SIZE = 1000
+
+# Width used by FittedRows until a view sets one
+DEFAULT_WIDTH = 80
+
+# Widths whose fitted rows are kept by FittedRows
+MAX_WIDTHS = 2
+
+# The fitted column of a Row is never narrower than this
+MIN_FIT_WIDTH = 10
+
+
+def _plain_tag(match) -> str:
+    escapes, tag = match.group(2), match.group(3)
+    half, escaped = divmod(len(escapes), 2)
+    return "\\" * half + (f"[{tag}]" if escaped else "")
+
+
+def markup_to_plain(markup: str) -> str:
+    """
+    Return the plain text of a Rich markup string, i.e., Text.from_markup(markup).plain,
+    without building the styled Text.
+    """
+    return RE_TAGS.sub(_plain_tag, markup)
+
+
+class Row(NamedTuple):
+    """
+    A row of a list with one column, text, that takes the width left over by the
+    markup before and after it. align is a format alignment, "<" or "^".
+    """
+
+    before: str
+    text: str
+    after: str = ""
+    align: str = "<"
+
+    def fit(self, width: int) -> str:
+        """Return the row as markup, truncating and padding text to fill width."""
+        fixed = cell_len(markup_to_plain(self.before + self.after))
+        text_width = max(width - fixed, MIN_FIT_WIDTH)
+        text = self.text
+        if cell_len(text) > text_width:
+            text = f"{set_cell_size(text, text_width - 2)} {EtmChar.ELLIPSIS_CHAR}"
+        # pad by cells rather than characters, for wide characters such as CJK
+        padding = text_width - cell_len(text)
+        left = padding // 2 if self.align == "^" else 0
+        text = f"{' ' * left}{text}{' ' * (padding - left)}"
+        return f"{self.before}{text}{self.after}"
+
+
+class RowSource(ABC):
+    """The protocol for the rows of a ScrollableList: len() and get(range)."""
+
+    @abstractmethod
+    def __len__(self) -> int: ...
+
+    @abstractmethod
+    def get(self, rows: range) -> List[str]:
+        """Return the markup strings for the rows in the range rows."""
+
+    def set_width(self, width: int) -> bool:
+        """Fit the rows to width and return True if that changed them."""
+        return False
+
+    def __iter__(self) -> Iterator[str]:
+        size = len(self)
+        for start in range(0, size, CHUNK_SIZE):
+            yield from self.get(range(start, min(start + CHUNK_SIZE, size)))
+
+
+class ListRows(RowSource):
+    """A row source for a list of markup strings."""
+
+    def __init__(self, lines: List[str]):
+        self.lines = lines
+
+    def __len__(self) -> int:
+        return len(self.lines)
+
+    def get(self, rows: range) -> List[str]:
+        return self.lines[rows.start : rows.stop]
+
+
+class SliceRows(RowSource):
+    """The rows of source from start onwards."""
+
+    def __init__(self, source: RowSource, start: int):
+        self.source = source
+        self.start = start
+
+    def __len__(self) -> int:
+        return max(len(self.source) - self.start, 0)
+
+    def get(self, rows: range) -> List[str]:
+        return self.source.get(range(rows.start + self.start, rows.stop + self.start))
+
+    def set_width(self, width: int) -> bool:
+        return self.source.set_width(width)
+
+
+class PagedRows(RowSource):
+    """
+    A row source of count rows produced by fetch(offset, limit), which must
+    return the markup strings for rows offset to offset + limit - 1. Rows are
+    fetched a page at a time and at most max_pages pages are kept.
+    """
+
+    def __init__(
+        self,
+        count: int,
+        fetch: Callable[[int, int], List[str]],
+        page_size: int = PAGE_SIZE,
+        max_pages: int = MAX_PAGES,
+    ):
+        self.count = count
+        self.fetch = fetch
+        self.page_size = page_size
+        self.max_pages = max_pages
+        self.pages = OrderedDict()
+
+    def __len__(self) -> int:
+        return self.count
+
+    def page(self, number: int) -> List[str]:
+        """Return the rows of page number, fetching them if necessary."""
+        rows = self.pages.get(number)
+        if rows is None:
+            offset = number * self.page_size
+            rows = self.fetch(offset, min(self.page_size, self.count - offset))
+            self.pages[number] = rows
+            while len(self.pages) > self.max_pages:
+                self.pages.popitem(last=False)
+        else:
+            self.pages.move_to_end(number)
+        return rows
+
+    def get(self, rows: range) -> List[str]:
+        start, stop = max(rows.start, 0), min(rows.stop, self.count)
+        lines = []
+        while start < stop:
+            number, offset = divmod(start, self.page_size)
+            page = self.page(number)
+            lines.extend(page[offset : offset + stop - start])
+            start = (number + 1) * self.page_size
+        return lines
+
+
+class FittedRows(RowSource):
+    """
+    The rows of source, markup strings or Row tuples, with each Row fitted to
+    the current width. The fitted rows are cached a page of page_size rows at
+    a time, keeping at most max_pages pages for each of the max_widths most
+    recently used widths, as PagedRows keeps the rows of its source.
+    """
+
+    def __init__(
+        self,
+        source: RowSource,
+        width: int = DEFAULT_WIDTH,
+        max_widths: int = MAX_WIDTHS,
+        page_size: int = PAGE_SIZE,
+        max_pages: int = MAX_PAGES,
+    ):
+        self.source = source
+        self.width = width
+        self.page_size = page_size
+        self.max_entries = max_widths * max_pages
+        # the fitted rows of each (width, page number), most recently used last
+        self.fitted: Dict[Tuple[int, int], Dict[int, str]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self.source)
+
+    def set_width(self, width: int) -> bool:
+        if width == self.width:
+            return False
+        self.width = width
+        return True
+
+    def page(self, number: int) -> Dict[int, str]:
+        """Return the rows of page number fitted so far at the current width."""
+        key = (self.width, number)
+        fitted = self.fitted.get(key)
+        if fitted is None:
+            fitted = self.fitted[key] = {}
+            while len(self.fitted) > self.max_entries:
+                self.fitted.popitem(last=False)
+        else:
+            self.fitted.move_to_end(key)
+        return fitted
+
+    def get(self, rows: range) -> List[str]:
+        start, stop = max(rows.start, 0), min(rows.stop, len(self))
+        lines = []
+        source_rows, first = None, 0
+        fitted, number = None, None
+        for index in range(start, stop):
+            if index // self.page_size != number:
+                number = index // self.page_size
+                fitted = self.page(number)
+            line = fitted.get(index)
+            if line is None:
+                if source_rows is None:
+                    # get the rest of the range from the source at once
+                    source_rows, first = self.source.get(range(index, stop)), index
+                row: Union[str, Row] = source_rows[index - first]
+                line = row.fit(self.width) if isinstance(row, Row) else row
+                fitted[index] = line
+            lines.append(line)
+        return lines
+
+
+def as_row_source(lines) -> RowSource:
+    """Return lines as a row source, wrapping a list in ListRows."""
+    return lines if isinstance(lines, RowSource) else ListRows(list(lines))
@@ -0,0 +1,134 @@
+"""
+Canonical rruleset strings.
+
+An rruleset string, as in Records.rrulestr, has a line for each component of a
+schedule: DTSTART, RRULE, EXRULE, RDATE and EXDATE. The same schedule can be
+written in many ways, with the parameters of a rule in any order, BYDAY=WE,MO
+or BYDAY=MO,WE, INTERVAL=1 or nothing, and dates repeated or split over
+several lines. canonical_rruleset writes each schedule in just one way:
+
+    RRULE:BYDAY=WE,MO;FREQ=WEEKLY;INTERVAL=1
+    DTSTART:20250106T100000
+    RDATE:20250110T100000
+    RDATE:20250108T100000,20250110T100000
+
+becomes
+
+    DTSTART:20250106T100000
+    RRULE:FREQ=WEEKLY;BYDAY=MO,WE
+    RDATE:20250108T100000,20250110T100000
+
+so that rruleset_hash of the canonical string identifies the schedule, e.g.,
+for sharing its occurrences between records.
+"""
+
+import hashlib
+from typing import Optional, Tuple, Union
+
+# The rule components, in the order of a canonical string
+RULE_COMPONENTS = ("RRULE", "EXRULE")
+
+# The date list components, in the order of a canonical string
+DATE_COMPONENTS = ("RDATE", "EXDATE")
+
+# The rule parameters whose values are unordered lists
+LIST_PARAMS = frozenset(
+    {
+        "BYSETPOS",
+        "BYMONTH",
+        "BYMONTHDAY",
+        "BYYEARDAY",
+        "BYEASTER",
+        "BYWEEKNO",
+        "BYDAY",
+        "BYHOUR",
+        "BYMINUTE",
+        "BYSECOND",
+    }
+)
+
+# The rule parameters that are left out when they have their default value
+DEFAULT_PARAMS = {"INTERVAL": "1", "WKST": "MO"}
+
+# Number of bytes of the digest returned by rruleset_hash
+HASH_SIZE = 8
+
+
+def list_value_key(value: str) -> Tuple[int, Union[int, str]]:
+    """Sort integers numerically and before anything else, e.g., weekdays."""
+    try:
+        return 0, int(value)
+    except ValueError:
+        return 1, value
+
+
+def canonical_rule(rule: str) -> str:
+    """
+    Return the canonical form of the value of an RRULE or EXRULE line: FREQ
+    followed by the other parameters in alphabetical order, list values
+    sorted without duplicates and default values left out.
+    """
+    params = {}
+    for part in rule.upper().split(";"):
+        key, _, value = part.strip().partition("=")
+        if not key:
+            continue
+        value = value.strip()
+        if key in LIST_PARAMS:
+            values = {v.strip() for v in value.split(",") if v.strip()}
+            value = ",".join(sorted(values, key=list_value_key))
+        if DEFAULT_PARAMS.get(key) == value:
+            continue
+        params[key] = value
+    parts = [f"FREQ={params.pop('FREQ')}"] if "FREQ" in params else []
+    parts.extend(f"{key}={params[key]}" for key in sorted(params))
+    return ";".join(parts)
+
+
+def canonical_rruleset(rrstr: str) -> str:
+    """
+    Return the canonical form of rrstr: the last DTSTART, then the distinct
+    rules of each kind, sorted, then the distinct dates of each kind, sorted,
+    on a single line. Escaped newlines are taken as newlines, as by
+    DatabaseManager.generate_datetimes_for_period, and a line without a
+    property name as an RRULE. Other lines, such as ones with a TZID
+    parameter, are kept as they are, sorted, at the end.
+    """
+    dtstart = None
+    rules = {name: set() for name in RULE_COMPONENTS}
+    dates = {name: set() for name in DATE_COMPONENTS}
+    other = set()
+    for line in rrstr.replace("\\N", "\n").replace("\\n", "\n").splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        name, sep, value = line.partition(":")
+        name = name.strip().upper()
+        if not sep:
+            name, value = "RRULE", line
+        if name == "DTSTART":
+            dtstart = value.strip()
+        elif name in rules:
+            rules[name].add(canonical_rule(value))
+        elif name in dates:
+            dates[name].update(v.strip() for v in value.split(",") if v.strip())
+        else:
+            other.add(line)
+    lines = [f"DTSTART:{dtstart}"] if dtstart else []
+    for name in RULE_COMPONENTS:
+        lines.extend(f"{name}:{rule}" for rule in sorted(rules[name]))
+    for name in DATE_COMPONENTS:
+        if dates[name]:
+            lines.append(f"{name}:{','.join(sorted(dates[name]))}")
+    lines.extend(sorted(other))
+    return "\n".join(lines)
+
+
+def rruleset_hash(canonical: str) -> Optional[str]:
+    """
+    Return a hash of canonical, a string returned by canonical_rruleset, that
+    is the same in every process, or None if it is empty.
+    """
+    if not canonical:
+        return None
+    return hashlib.blake2b(canonical.encode(), digest_size=HASH_SIZE).hexdigest()
@@ -0,0 +1,77 @@
+import io
+from datetime import date
+
+import pytest
+
+from etm.importer import import_reminders, iter_reminders, parse_reminder
+from etm.model import DatabaseManager
+
+REMINDERS = """\
+# a comment
+* lunch @s 2025-01-10 12pm @e 1h @a 15m: d @l cafe
+
+- call back @s 2025-01-10 @r w &i 2
+  @d about the estimate
+% a journal entry
+* broken @s not a date
+- plain task
+"""
+
+
+def test_iter_reminders():
+    assert list(iter_reminders(REMINDERS.splitlines())) == [
+        "* lunch @s 2025-01-10 12pm @e 1h @a 15m: d @l cafe",
+        "- call back @s 2025-01-10 @r w &i 2\n@d about the estimate",
+        "% a journal entry",
+        "* broken @s not a date",
+        "- plain task",
+    ]
+
+
+def test_parse_reminder():
+    record, reasons = parse_reminder("* lunch @s 2025-01-10 12pm @e 1h @a 15m: d @l cafe")
+    assert reasons is None
+    assert record == ("*", "lunch", "", "RDATE:20250110T120000", 60, "900: d", "cafe", None, None)
+    record, reasons = parse_reminder("* broken @s not a date")
+    assert record is None
+    assert "Invalid datetime" in reasons
+
+
+@pytest.mark.parametrize("workers", [0, 2])
+def test_import_reminders(tmp_path, monkeypatch, workers):
+    # log_msg writes to the current working directory
+    monkeypatch.chdir(tmp_path)
+    dbm = DatabaseManager(str(tmp_path / "test.db"), reset=True)
+    errors = io.StringIO()
+    batches = []
+    result = import_reminders(
+        dbm,
+        io.StringIO(REMINDERS),
+        workers=workers,
+        batch_size=2,
+        errors=errors,
+        progress=batches.append,
+    )
+    assert (result.reminders, result.imported, result.rejected) == (5, 3, 2)
+    assert [batch.imported for batch in batches] == [2, 3]
+    names = [row[0] for row in dbm.cursor.execute("SELECT name FROM Records ORDER BY id")]
+    assert names == ["lunch", "call back", "plain task"]
+    # the imported records are found
+    assert [row[1] for row in dbm.find_records("estimate")] == ["call back"]
+
+    rejected = errors.getvalue()
+    assert "% a journal entry\n\n" in rejected
+    assert "* broken @s not a date\n\n" in rejected
+    # the error file can be imported in turn
+    assert list(iter_reminders(rejected.splitlines())) == [
+        "% a journal entry",
+        "* broken @s not a date",
+    ]
+
+
+def test_parse_goal():
+    record, reasons = parse_reminder("~ interval training @s 2024/4/24 @q 3, 5")
+    assert reasons is None
+    assert record[0] == "~" and record[8] == (date(2024, 4, 24), 3, 5)
+    record, reasons = parse_reminder("~ interval training @q 3")
+    assert record is None and reasons == "a goal requires @s"
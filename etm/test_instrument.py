@@ -0,0 +1,49 @@
+import json
+
+from etm.instrument import Instrumentation, InstrumentedCursor, percentile
+
+
+def test_percentile():
+    ordered = [float(x) for x in range(1, 101)]
+    assert percentile(ordered, 50) == 50.0
+    assert percentile(ordered, 95) == 95.0
+    assert percentile(ordered, 99) == 99.0
+    assert percentile([], 50) == 0.0
+
+
+def test_disabled_records_nothing():
+    inst = Instrumentation()
+    with inst.span("noop"):
+        pass
+    inst.incr("noop")
+    assert inst.summary() == {"spans": {}, "counters": {}}
+
+
+def test_spans_and_json(tmp_path):
+    inst = Instrumentation(enabled=True)
+
+    @inst.timed("double")
+    def double(x):
+        return 2 * x
+
+    assert double(3) == 6
+    with inst.span("block"):
+        pass
+    inst.incr("frames.late", 2)
+
+    summary = inst.summary()
+    assert summary["spans"]["double"]["count"] == 1
+    assert summary["spans"]["block"]["count"] == 1
+    assert summary["counters"] == {"frames.late": 2}
+
+    path = tmp_path / "timings.json"
+    inst.dump_json(str(path))
+    assert json.loads(path.read_text()) == summary
+
+
+def test_sql_span_names():
+    name = InstrumentedCursor.span_name
+    assert name("SELECT id FROM Records WHERE id = ?") == "sql SELECT Records"
+    assert name("\n  INSERT INTO Alerts (x) VALUES (?)") == "sql INSERT Alerts"
+    assert name("DELETE FROM GeneratedWeeks") == "sql DELETE GeneratedWeeks"
+    assert name("CREATE TABLE IF NOT EXISTS Records (id)") == "sql CREATE Records"
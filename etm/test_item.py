@@ -1,8 +1,9 @@
+import pytest
 import sys
 import os
 
 sys.path.append(os.path.dirname(__file__))  # for pytest
-from item import Item
+from item import Item, JobGraph, ParseDiagnostics
 from datetime import datetime, date, timedelta
 from dateutil.rrule import rrule, rruleset, rrulestr, DAILY
 from dateutil.tz import gettz
@@ -266,3 +267,170 @@ def test_jobs_without_prerequisites():
 test_task_without_completions()
 test_task_with_completions()
 # test_jobs_without_prerequisites()
+
+
+def parsed_state(item):
+    return (
+        item.tokens,
+        item.item,
+        item.rrules,
+        item.jobs,
+        item.tags,
+        item.rdates,
+        item.exdates,
+        item.parse_ok,
+    )
+
+
+def test_incremental_parse_matches_full_parse():
+    entry = "* meeting @s 2024-08-07 4pm @r w &i 2 &w WE @t work @+ 2024-08-09 2pm @- 2024-08-21 4pm @t team"
+    edits = [entry[:n] for n in range(len(entry) + 1)]
+    edits += [
+        entry.replace("2024-08-07 4pm", "2024-08-08 5pm"),  # @s changes DTSTART
+        entry.replace("@t work ", ""),  # a token removed
+        entry.replace("meeting", "team meeting"),  # later tokens shifted
+        entry.replace("* ", "- "),
+        entry.replace(" @r", " r"),  # a token merged into the previous one
+        entry,
+    ]
+    item = Item()
+    for text in edits:
+        fresh = Item()
+        try:
+            fresh.parse_input(text)
+        except Exception as e:
+            with pytest.raises(type(e)):
+                item.parse_input(text)
+            continue
+        item.parse_input(text)
+        assert parsed_state(item) == parsed_state(fresh), text
+
+
+def test_incremental_parse_dispatches_changed_tokens_only():
+    item = Item()
+    item.parse_input("* meeting @s 2024-08-07 4pm @r w &i 2 @t work")
+    dispatched = []
+    dispatch = item._dispatch_token
+
+    def spy(token, start_pos, end_pos, token_type):
+        dispatched.append(token)
+        return dispatch(token, start_pos, end_pos, token_type)
+
+    item._dispatch_token = spy
+    # editing the subject shifts the later tokens without dispatching them
+    item.parse_input("* team meeting @s 2024-08-07 4pm @r w &i 2 @t work")
+    assert dispatched == ["team meeting "]
+    assert item.item["t"] == "work"
+    assert item.rrules == [{"FREQ": "WEEKLY", "ri": "INTERVAL=2", "DTSTART": "20240807T160000"}]
+
+    dispatched.clear()
+    item.parse_input("* team meeting @s 2024-08-07 4pm @r w &i 2 @t home")
+    assert dispatched == ["@t home"]
+    assert item.tags == ["home"]
+
+
+def test_parse_diagnostics(capsys):
+    Item().parse_input("* lunch @s 2024-08-07 noonish @r w &i 2")
+    # off by default: parsing writes nothing
+    assert capsys.readouterr().out == ""
+
+    diagnostics = ParseDiagnostics(enabled=True)
+    item = Item(diagnostics=diagnostics)
+    item.parse_input("* lunch @s 2024-08-07 noonish @r w &i 2")
+    handlers = [event.handler for event in diagnostics.events]
+    assert handlers == [
+        "do_itemtype",
+        "do_summary",
+        "do_datetime",
+        "do_rrule",
+        "do_interval",
+        "finalize_rruleset",
+    ]
+    error, finalize_error = diagnostics.errors()
+    assert finalize_error.error == "Error parsing tokens"
+    assert error.token == "@s 2024-08-07 noonish "
+    assert error.span == (8, 30)
+    assert "Invalid datetime" in error.error
+    assert not item.parse_ok
+
+
+def test_dispatch_table():
+    handlers = Item.handlers()
+    assert handlers is Item.handlers()
+    # classmethods are bound to the class, methods are passed the item
+    assert handlers["subject"] == (Item.do_summary, False)
+    assert handlers["s"] == (Item.do_datetime, True)
+
+    # a key whose handler is not implemented is reported, not raised
+    diagnostics = ParseDiagnostics(enabled=True)
+    item = Item(diagnostics=diagnostics)
+    item.parse_input("- task @b 3 @l home")
+    assert item.parse_ok
+    assert item.item["l"] == "home"
+    assert [event.token for event in diagnostics.errors()] == ["@b 3 "]
+
+
+DOG_HOUSE = """- dog house @s 2024-08-07 4:00pm
+@j paint &l shop
+@j   sand &l shop
+@j     assemble &l shop
+@j       cut pieces &l shop
+@j         get wood &l Lowes
+@j       get hardware &l Lowes
+@j   get paint &l Lowes"""
+
+
+def test_job_graph():
+    graph = JobGraph.from_nodes([0, 1, 2, 3, 4, 3, 1, 0])
+    assert graph.parents == [None, 0, 1, 2, 3, 2, 0, None]
+    assert graph.unfinished == [6, 4, 3, 1, 0, 0, 0, 0]
+    assert graph.prerequisites() == [0b1111110, 0b111100, 0b111000, 0b10000, 0, 0, 0, 0]
+    assert graph.summary == "4/4/0"
+    assert graph.finish(4) == [3]
+    assert graph.finish(3) == []
+    assert graph.finish(5) == [2]
+    assert graph.summary == "3/2/3"
+    assert graph.reopen(5) == [2]
+    assert graph.status(2) == "waiting"
+    assert graph.summary == "3/3/2"
+
+
+def test_finalize_jobs_updates_the_job_graph():
+    item = Item()
+    item.parse_input(DOG_HOUSE)
+    graph = item.job_graph
+    assert [job["status"] for job in item.item["j"]] == [
+        "waiting",
+        "waiting",
+        "waiting",
+        "waiting",
+        "available",
+        "available",
+        "available",
+    ]
+    assert item.item["j"][4]["subject"] == "get wood (Lowes) 3/4/0"
+
+    # finishing jobs updates the graph of the same outline
+    item.parse_input(DOG_HOUSE.replace("wood &l Lowes", "wood &l Lowes &f 2025-03-26 4pm"))
+    assert item.job_graph is graph
+    assert [job["itemtype"] for job in item.item["j"]] == list("+++-x--")
+    item.parse_input(DOG_HOUSE)
+    assert item.job_graph is graph
+    assert graph.summary == "3/4/0"
+
+    # a new outline gets a new graph
+    item.parse_input(DOG_HOUSE.replace("@j   get paint", "@j get paint"))
+    assert item.job_graph is not graph
+    assert item.item["j"][6]["parent"] is None
+
+
+def test_quota():
+    item = Item()
+    item.parse_input("~ interval training @s 2024/4/22 @q 3")
+    assert item.parse_ok and item.item["q"] == (3, None)
+    item = Item()
+    item.parse_input("~ interval training @s 2024/4/22 @q -3, 5")
+    assert item.parse_ok and item.item["q"] == (-3, 5)
+    item = Item()
+    item.parse_input("~ interval training @s 2024/4/22 @q 3, 0")
+    assert not item.parse_ok
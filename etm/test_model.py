@@ -0,0 +1,319 @@
+import re
+import sqlite3
+from datetime import date, datetime
+
+import pytest
+
+from etm.model import DatabaseManager, literal_text, regexp, rruleset_occurrences
+
+
+def make_manager(tmp_path, monkeypatch):
+    # log_msg writes to the current working directory
+    monkeypatch.chdir(tmp_path)
+    return DatabaseManager(str(tmp_path / "test.db"), reset=True)
+
+
+def test_record_cache(tmp_path, monkeypatch):
+    dbm = make_manager(tmp_path, monkeypatch)
+    ids = [
+        dbm.add_record("*", f"event {i}", "details", "RDATE:20250101T100000", 60, "", "")
+        for i in range(5)
+    ]
+    assert len(dbm.record_cache) == 0
+
+    dbm.prefetch_records(ids[:3])
+    assert len(dbm.record_cache) == 3
+    assert dbm.get_record(ids[0])[2] == "event 0"
+
+    # a cached row is served without touching Records
+    dbm.cursor.execute("UPDATE Records SET name = 'changed' WHERE id = ?", (ids[0],))
+    assert dbm.get_record(ids[0])[2] == "event 0"
+    dbm.invalidate_record(ids[0])
+    assert dbm.get_record(ids[0])[2] == "changed"
+
+    assert dbm.get_record(10_000) is None
+    assert 10_000 not in dbm.record_cache
+
+
+def test_record_cache_is_bounded(tmp_path, monkeypatch):
+    dbm = make_manager(tmp_path, monkeypatch)
+    dbm.record_cache.maxsize = 3
+    ids = [dbm.add_record("-", f"task {i}", "", "RDATE:20250101", 0, "", "") for i in range(5)]
+    for record_id in ids:
+        dbm.get_record(record_id)
+    assert len(dbm.record_cache) == 3
+    assert ids[0] not in dbm.record_cache
+    assert ids[-1] in dbm.record_cache
+
+
+def test_reader_is_read_only_and_shares_cache(tmp_path, monkeypatch):
+    dbm = make_manager(tmp_path, monkeypatch)
+    record_id = dbm.add_record("*", "event", "", "RDATE:20250101T100000", 60, "", "")
+    reader = dbm.reader()
+    assert reader.get_record(record_id)[2] == "event"
+    assert record_id in dbm.record_cache
+    with pytest.raises(sqlite3.OperationalError):
+        reader.add_record("*", "other", "", "RDATE:20250101T100000", 60, "", "")
+    reader.close()
+
+
+@pytest.mark.parametrize("directory", ["x#y", "x?y", "x%20y"])
+def test_reader_path_with_uri_characters(tmp_path, monkeypatch, directory):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / directory).mkdir()
+    dbm = DatabaseManager(str(tmp_path / directory / "test.db"), reset=True)
+    record_id = dbm.add_record("*", "event", "", "RDATE:20250101T100000", 60, "", "")
+    reader = DatabaseManager(dbm.db_path, read_only=True)
+    assert reader.get_record(record_id)[2] == "event"
+    reader.close()
+
+
+def test_extend_datetimes_skips_generated_weeks(tmp_path, monkeypatch):
+    dbm = make_manager(tmp_path, monkeypatch)
+    dbm.add_record("*", "weekly", "", "DTSTART:20250106T100000\nRRULE:FREQ=WEEKLY", 60, "", "")
+    dbm.extend_datetimes_for_weeks(2025, 2, 4)
+    count = dbm.cursor.execute("SELECT COUNT(*) FROM DateTimes").fetchone()[0]
+    assert count > 0
+    # nothing new to generate for weeks inside the generated range
+    dbm.extend_datetimes_for_weeks(2025, 3, 2)
+    assert dbm.cursor.execute("SELECT COUNT(*) FROM DateTimes").fetchone()[0] == count
+
+
+def test_find_records_full_text(tmp_path, monkeypatch):
+    dbm = make_manager(tmp_path, monkeypatch)
+    first = dbm.add_record("*", "Dentist appointment", "Dr. Smith #health", "RDATE:20250101T100000", 60, "", "downtown")
+    second = dbm.add_record("-", "Call the dentist", "reschedule", "RDATE:20250102", 0, "", "")
+    dbm.add_record("-", "Buy milk", "", "RDATE:20250102", 0, "", "shop")
+
+    def found(*args):
+        return [row[0] for row in dbm.find_records(*args)]
+
+    assert found("dent") == [first, second]
+    assert found("DENTIST health") == [first]
+    assert found("downtown") == [first]
+    # a regex filters the records with the words
+    assert found("dentist", r"^Call") == [second]
+    # a regex alone, or words without word characters, scan every record
+    assert found("", r"Dr\.") == [first]
+    assert found("#") == [first]
+    # a word with punctuation matches as text, not as its separate words
+    code = dbm.add_record("-", "Learn C++", "at 10:30", "RDATE:20250103", 0, "", "")
+    assert found("C++") == [code]
+    assert found("10:30") == [code]
+    assert found("dr.") == [first]
+
+    # the index follows updates and deletes
+    dbm.cursor.execute("UPDATE Records SET name = 'Orthodontist' WHERE id = ?", (first,))
+    dbm.cursor.execute("DELETE FROM Records WHERE id = ?", (second,))
+    dbm.conn.commit()
+    assert found("dent") == []
+    assert found("ortho") == [first]
+
+
+def test_find_records_query_terms(tmp_path, monkeypatch):
+    dbm = make_manager(tmp_path, monkeypatch)
+    meeting = dbm.add_record("*", "Team meeting", "", "RDATE:20250110T100000", 60, "", "main office")
+    call = dbm.add_record("-", "Call back the office", "", "RDATE:20250120", 0, "1: e", "home")
+    lunch = dbm.add_record("*", "Lunch", "", "RDATE:20250201T120000", 60, "", "")
+    dbm.generate_datetimes_for_period(datetime(2025, 1, 1), datetime(2025, 3, 1))
+
+    def found(query):
+        return [row[0] for row in dbm.find_records(query)]
+
+    assert found("office") == [meeting, call]
+    assert found("loc:office") == [meeting]
+    assert found('"back the office"') == [call]
+    assert found("type:*") == [meeting, lunch]
+    assert found("type:- office") == [call]
+    assert found("has:alert") == [call]
+    assert found("has:location type:*") == [meeting]
+    assert found("after:2025-01-15") == [call, lunch]
+    assert found("after:2025-01-15 before:2025-02-01") == [call]
+    assert found("before:2025-02-01 office") == [meeting, call]
+    # without word characters, locations are checked as text
+    assert found("loc:-") == []
+
+    plan = "\n".join(dbm.explain_find("after:2025-01-15 type:*"))
+    assert "DateTimes_start" in plan
+    assert "SCAN r" not in plan
+
+
+def test_literal_text():
+    assert literal_text("dentist") == "dentist"
+    assert literal_text(r"Dr\. Smith") == "Dr. Smith"
+    assert literal_text(re.escape("a+b (c)")) == "a+b (c)"
+    assert literal_text("colou?r") is None
+    assert literal_text(r"\bword") is None
+    assert literal_text("trailing\\") is None
+
+
+@pytest.mark.parametrize(
+    "pattern",
+    ["lorem", "Lorem", "(?i)LOREM", r"(?i)dr\. smith", r"^Dr", r"smi(th|ss)", "(?i)a|b"],
+)
+def test_regexp_agrees_with_re_search(pattern):
+    values = ["Dr. Smith", "lorem ipsum", "LOREM", "Mr Smiss", "", "dr. smith"]
+    for value in values:
+        assert regexp(pattern, value) == (re.search(pattern, value) is not None)
+    assert regexp(pattern, None) is False
+
+
+def test_records_share_canonical_schedules(tmp_path, monkeypatch):
+    dbm = make_manager(tmp_path, monkeypatch)
+    first = dbm.add_record(
+        "*", "standup", "", "RRULE:BYDAY=TU,MO;FREQ=WEEKLY\nDTSTART:20250106T093000", 15, "", ""
+    )
+    second = dbm.add_record(
+        "*", "review", "", "DTSTART:20250106T093000\nRRULE:FREQ=WEEKLY;BYDAY=MO,TU", 60, "", ""
+    )
+    rows = dbm.cursor.execute(
+        "SELECT rrulestr, rrulehash FROM Records WHERE id IN (?, ?)", (first, second)
+    ).fetchall()
+    assert rows[0] == rows[1]
+    assert rows[0][0] == "DTSTART:20250106T093000\nRRULE:FREQ=WEEKLY;BYDAY=MO,TU"
+    dbm.close()
+
+    # a database created before rrulehash gets the column and the hashes
+    conn = sqlite3.connect(tmp_path / "test.db")
+    conn.execute("UPDATE Records SET rrulehash = NULL")
+    conn.commit()
+    conn.close()
+    dbm = DatabaseManager(str(tmp_path / "test.db"))
+    hashes = dbm.cursor.execute("SELECT DISTINCT rrulehash FROM Records").fetchall()
+    assert len(hashes) == 1 and hashes[0][0] is not None
+
+
+def test_generate_datetimes_expands_each_schedule_once(tmp_path, monkeypatch):
+    dbm = make_manager(tmp_path, monkeypatch)
+    weekly = "DTSTART:20250106T093000\nRRULE:FREQ=WEEKLY"
+    ids = [dbm.add_record("*", f"standup {i}", "", weekly, 15 * (i % 2 + 1), "", "") for i in range(6)]
+    ids.append(dbm.add_record("*", "review", "", "RRULE:FREQ=WEEKLY\nDTSTART:20250106T093000", 60, "", ""))
+    ids.append(dbm.add_record("-", "once", "", "RDATE:20250110T120000", 0, "", ""))
+    rruleset_occurrences.cache_clear()
+    dbm.generate_datetimes_for_period(datetime(2025, 1, 1), datetime(2025, 2, 1))
+    assert rruleset_occurrences.cache_info().misses == 2
+
+    def instances(record_id):
+        return dbm.cursor.execute(
+            "SELECT start_datetime, end_datetime FROM DateTimes WHERE record_id = ? ORDER BY 1",
+            (record_id,),
+        ).fetchall()
+
+    # each record has the occurrences of its schedule with its own extent
+    assert len(instances(ids[0])) == 4
+    assert [end - start for start, end in instances(ids[0])] == [15 * 60] * 4
+    assert [end - start for start, end in instances(ids[1])] == [30 * 60] * 4
+    assert [end - start for start, end in instances(ids[6])] == [60 * 60] * 4
+    assert len(instances(ids[7])) == 1
+
+    # generating a longer period adds only the new instances
+    dbm.generate_datetimes_for_period(datetime(2025, 1, 1), datetime(2025, 3, 1))
+    assert len(instances(ids[0])) == 8
+
+
+def test_jobs(tmp_path, monkeypatch):
+    dbm = make_manager(tmp_path, monkeypatch)
+    # paint waits for sand and get paint, sand for get sandpaper
+    jobs = [
+        {"i": 0, "j": "paint", "parent": None, "status": "waiting"},
+        {"i": 1, "j": "sand", "parent": 0, "status": "waiting"},
+        {"i": 2, "j": "get sandpaper", "parent": 1, "status": "available"},
+        {"i": 3, "j": "get paint", "parent": 0, "status": "finished"},
+    ]
+    record_id = dbm.add_record("-", "fence", "", "", 0, "", "", jobs=jobs)
+
+    def statuses():
+        return dbm.cursor.execute(
+            "SELECT status, unfinished FROM Jobs WHERE record_id = ? ORDER BY job_index",
+            (record_id,),
+        ).fetchall()
+
+    assert statuses() == [("waiting", 2), ("waiting", 1), ("available", 0), ("finished", 0)]
+    assert dbm.finish_job(record_id, 2) == [1]
+    assert dbm.finish_job(record_id, 2) == []
+    assert dbm.finish_job(record_id, 1) == [0]
+    assert statuses() == [("available", 0), ("finished", 0), ("finished", 0), ("finished", 0)]
+
+    dbm.cursor.execute("DELETE FROM Records WHERE id = ?", (record_id,))
+    assert statuses() == []
+
+
+def test_available_jobs_by_location(tmp_path, monkeypatch):
+    dbm = make_manager(tmp_path, monkeypatch)
+    jobs = [
+        {"i": 0, "j": "paint", "parent": None, "status": "waiting"},
+        {"i": 1, "j": "sand", "parent": 0, "status": "available", "l": "shop"},
+        {"i": 2, "j": "get paint", "parent": 0, "status": "available", "l": "Lowes"},
+    ]
+    fence = dbm.add_record("-", "fence", "", "", 0, "", "home", jobs=jobs)
+    shed = dbm.add_records(
+        [("-", "shed", "", "", 0, "", "", [{"i": 0, "j": "get nails", "parent": None, "status": "available", "l": "Lowes"}])]
+    )[0]
+
+    assert dbm.get_available_jobs() == [
+        (fence, 2, "fence", "get paint", "Lowes"),
+        (shed, 0, "shed", "get nails", "Lowes"),
+        (fence, 1, "fence", "sand", "shop"),
+    ]
+    assert [row[3] for row in dbm.get_available_jobs("shop")] == ["sand"]
+    # a job without a location has that of its task, a bitmap of its prerequisites
+    assert dbm.cursor.execute(
+        "SELECT location, prereqs FROM Jobs WHERE record_id = ? AND job_index = 0", (fence,)
+    ).fetchone() == ("home", bytes([0b110]))
+
+    dbm.finish_job(fence, 1)
+    dbm.finish_job(fence, 2)
+    assert [row[3] for row in dbm.get_available_jobs("home")] == ["paint"]
+
+    dbm.cursor.execute("EXPLAIN QUERY PLAN " + "SELECT * FROM Jobs WHERE status = 'available' AND location = 'shop'")
+    assert "Jobs_status_location" in str(dbm.cursor.fetchall())
+
+
+def test_goal_status(tmp_path, monkeypatch):
+    dbm = make_manager(tmp_path, monkeypatch)
+    start = date(2024, 4, 3)  # in the week 2024:14
+    dog = dbm.add_record("~", "walk the dog", "", "", 0, "", "", goal=(start, 7, None))
+    dishes, intervals, reading, piano = dbm.add_records(
+        [
+            ("~", "wash dishes", "", "", 0, "", "", None, (start, 5, None)),
+            ("~", "interval training", "", "", 0, "", "", None, (start, 4, None)),
+            ("~", "reading", "", "", 0, "", "", None, (start, -2, None)),
+            ("~", "piano", "", "", 0, "", "", None, (start, 3, 2)),
+        ]
+    )
+    dbm.set_goal_history(dog, [(2024, 14, 5), (2024, 15, 6), (2024, 16, 4)])
+    # a history entered again replaces the counts of its weeks
+    dbm.set_goal_history(dog, [(2024, 16, 7)])
+    friday = date(2024, 4, 26)  # the 5th day of the week 2024:17
+    for _ in range(3):
+        dbm.record_goal_completion(dog, friday)
+    dbm.record_goal_completion(dishes, friday, 3)
+    dbm.record_goal_completion(intervals, friday, 3)
+    assert dbm.get_goal_history(dog)[-2:] == [(2024, 16, 7), (2024, 17, 3)]
+
+    status = dbm.get_goal_status(friday)
+    assert [(goal.name, goal.done, goal.needed, goal.state) for goal in status] == [
+        ("walk the dog", 3, 2, "active"),
+        ("wash dishes", 3, 1, "active"),
+        ("interval training", 3, 0, "active"),
+        ("reading", 0, 0, "inactive"),
+        ("piano", 0, 0, "ended"),
+    ]
+    # 21 completions in the 4 weeks since the start
+    assert status[0].average == 21 / 4
+
+    dbm.cursor.execute("DELETE FROM Records WHERE id = ?", (dog,))
+    assert dbm.get_goal_history(dog) == []
+    assert len(dbm.get_goal_status(friday)) == 4
+
+
+def test_find_records_within(tmp_path, monkeypatch):
+    dbm = make_manager(tmp_path, monkeypatch)
+    first = dbm.add_record("*", "Dentist appointment", "Dr. Smith", "RDATE:20250101T100000", 60, "", "")
+    second = dbm.add_record("-", "Call the dentist", "reschedule", "RDATE:20250102", 0, "", "")
+    other = dbm.add_record("-", "Dentist invoice", "", "", 0, "", "")
+    previous = [row for row in dbm.find_records("dent") if row[0] != other]
+    # only the records of within are tested
+    assert [row[0] for row in dbm.find_records("dentist", within=previous)] == [first, second]
+    assert dbm.find_records("dentist Smith", within=previous) == previous[:1]
+    assert dbm.find_records("dentist invoice", within=previous) == []
@@ -0,0 +1,31 @@
+from datetime import datetime
+
+import pytest
+
+from etm.query import FindQuery, parse_find_query
+
+
+def test_parse_find_query():
+    query = parse_find_query(
+        'type:-* loc:"main office" after:2025-01-01 has:alert "call back" dent /Dr\\.? Smith/'
+    )
+    assert query == FindQuery(
+        words=("dent",),
+        phrases=("call back",),
+        types="-*",
+        locations=("main office",),
+        after=datetime(2025, 1, 1),
+        has=("alert",),
+        regexes=("Dr\\.? Smith",),
+    )
+    # a term with an unknown key is taken as words
+    assert parse_find_query("at 10:30").words == ("at", "10:30")
+    assert parse_find_query("dent dentist").words_only
+    assert not parse_find_query("dent type:-").words_only
+    assert not parse_find_query("").words_only
+
+
+@pytest.mark.parametrize("search_str", ["type:x", "after:soon", "before:2025-13-01", "has:cats"])
+def test_parse_find_query_rejects_invalid_values(search_str):
+    with pytest.raises(ValueError):
+        parse_find_query(search_str)
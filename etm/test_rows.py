@@ -0,0 +1,102 @@
+import pytest
+from rich.cells import cell_len
+
+from etm.rows import (
+    FittedRows,
+    ListRows,
+    PagedRows,
+    Row,
+    RowSource,
+    SliceRows,
+    as_row_source,
+    markup_to_plain,
+)
+
+
+def test_list_rows():
+    rows = as_row_source(["a", "b", "c"])
+    assert isinstance(rows, ListRows)
+    assert len(rows) == 3
+    assert rows.get(range(1, 5)) == ["b", "c"]
+    assert as_row_source(rows) is rows
+
+
+def test_paged_rows_fetch_only_what_is_needed():
+    fetched = []
+
+    def fetch(offset, limit):
+        fetched.append((offset, limit))
+        return [f"row {i}" for i in range(offset, offset + limit)]
+
+    rows = PagedRows(25, fetch, page_size=10, max_pages=2)
+    assert len(rows) == 25
+    assert rows.get(range(8, 12)) == ["row 8", "row 9", "row 10", "row 11"]
+    assert fetched == [(0, 10), (10, 10)]
+    assert rows.get(range(20, 30)) == [f"row {i}" for i in range(20, 25)]
+    assert fetched[-1] == (20, 5)
+    # only the two most recently used pages are kept
+    assert list(rows.pages) == [1, 2]
+    assert list(rows) == [f"row {i}" for i in range(25)]
+
+
+def test_slice_rows():
+    rows = SliceRows(ListRows(["title", "header", "x", "y"]), 2)
+    assert len(rows) == 2
+    assert rows.get(range(0, 2)) == ["x", "y"]
+    assert len(SliceRows(ListRows(["title"]), 2)) == 0
+
+
+def test_markup_to_plain():
+    assert markup_to_plain("[bold]a[/bold] \\[b] c") == "a [b] c"
+
+
+def test_row_fit():
+    row = Row("[dim]ab[/dim] ", "a long name", " [red]x[/red]")
+    assert row.fit(20) == "[dim]ab[/dim] a long name     [red]x[/red]"
+    assert markup_to_plain(row.fit(15)) == "ab a long n … x"
+    assert len(markup_to_plain(Row("", "name", align="^").fit(12))) == 12
+    # never narrower than MIN_FIT_WIDTH
+    assert row.fit(4) == row.fit(15)
+    # wide characters are fitted by cells
+    wide = Row("> ", "会议 with the 团队 about 🎉")
+    for width in (12, 20, 40):
+        assert cell_len(markup_to_plain(wide.fit(width))) == width
+
+
+def test_fitted_rows_cache_by_width():
+    fetched = []
+
+    def fetch(offset, limit):
+        fetched.append(offset)
+        return [Row("> ", f"name {i}") for i in range(offset, offset + limit)]
+
+    rows = FittedRows(PagedRows(30, fetch, page_size=10, max_pages=1), width=12)
+    assert rows.get(range(0, 2)) == ["> name 0    ", "> name 1    "]
+    assert rows.set_width(16) and not rows.set_width(16)
+    assert rows.get(range(1, 2)) == ["> name 1        "]
+    rows.set_width(12)
+    rows.get(range(20, 21))
+    # the rows fitted at width 12 are still cached
+    assert rows.get(range(0, 2)) == ["> name 0    ", "> name 1    "]
+    assert fetched == [0, 20]
+
+
+def test_fitted_rows_are_bounded():
+    def fetch(offset, limit):
+        return [Row("> ", f"name {i}") for i in range(offset, offset + limit)]
+
+    source = PagedRows(1000, fetch, page_size=10, max_pages=2)
+    rows = FittedRows(source, width=12, max_widths=1, page_size=10, max_pages=2)
+    for start in range(0, 1000, 5):
+        rows.get(range(start, start + 5))
+    assert len(rows.fitted) == 2
+    assert sum(len(page) for page in rows.fitted.values()) == 20
+
+
+def test_row_source_requires_len_and_get():
+    class NoGet(RowSource):
+        def __len__(self):
+            return 0
+
+    with pytest.raises(TypeError):
+        NoGet()
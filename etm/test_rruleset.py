@@ -0,0 +1,41 @@
+from datetime import datetime
+
+from dateutil.rrule import rrulestr
+
+from etm.rruleset import canonical_rruleset, rruleset_hash
+
+
+def occurrences(rrstr):
+    return list(rrulestr(rrstr).between(datetime(2025, 1, 1), datetime(2025, 3, 1), inc=True))
+
+
+def test_canonical_rruleset():
+    rrstr = """\
+RRULE:BYDAY=WE,MO;FREQ=WEEKLY;INTERVAL=1
+DTSTART:20250106T100000
+RDATE:20250110T100000
+RDATE:20250108T100000,20250110T100000"""
+    canonical = canonical_rruleset(rrstr)
+    assert canonical == (
+        "DTSTART:20250106T100000\n"
+        "RRULE:FREQ=WEEKLY;BYDAY=MO,WE\n"
+        "RDATE:20250108T100000,20250110T100000"
+    )
+    assert occurrences(canonical) == occurrences(rrstr)
+    assert canonical_rruleset(canonical) == canonical
+    # escaped newlines, as stored by some databases
+    assert canonical_rruleset(rrstr.replace("\n", "\\N")) == canonical
+    assert canonical_rruleset("") == ""
+
+
+def test_rruleset_hash():
+    first = canonical_rruleset(
+        "DTSTART:20250106T100000\nRRULE:FREQ=MONTHLY;BYMONTHDAY=15,1;COUNT=4"
+    )
+    second = canonical_rruleset(
+        "RRULE:count=4;bymonthday=1,15;freq=monthly\nDTSTART:20250106T100000"
+    )
+    assert rruleset_hash(first) == rruleset_hash(second)
+    assert len(rruleset_hash(first)) == 16
+    assert rruleset_hash(first) != rruleset_hash(first.replace("COUNT=4", "COUNT=5"))
+    assert rruleset_hash("") is None
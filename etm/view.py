@@ -1,5 +1,15 @@
 from .__version__ import version as etm_version
 from .common import log_msg, display_messages
+
+# The 4-week grid matches the rich table from Controller.generate_table
+from .controller import (
+    FRAME_COLOR as GRID_FRAME_COLOR,
+    HEADER_STYLE as GRID_HEADER_STYLE,
+    SELECTED_BACKGROUND as GRID_SELECTED_BACKGROUND,
+    SELECTED_COLOR as GRID_SELECTED_COLOR,
+)
+from .instrument import instrumentation, span
+from .rows import PAGE_SIZE, RowSource, SliceRows, as_row_source, markup_to_plain
 from datetime import datetime, timedelta
 from logging import log
 from packaging.version import parse as parse_version
@@ -7,12 +17,15 @@ from prompt_toolkit.styles.named_colors import NAMED_COLORS
 from rich import box
 from rich.console import Console
 from rich.segment import Segment
+from rich.style import Style
 from rich.table import Table
 from rich.text import Text
 from rich.rule import Rule
 from textual.app import App, ComposeResult
+from textual.binding import Binding
+from textual.cache import LRUCache
 from textual.containers import Vertical
-from textual.geometry import Size
+from textual.geometry import Region, Size
 from textual.reactive import reactive
 from textual.screen import ModalScreen
 from textual.screen import Screen
@@ -23,9 +36,14 @@ from textual.widgets import Input
 from textual.widgets import Label
 from textual.widgets import Markdown, Static, Footer, Header
 from textual.widgets import Placeholder
+from textual.worker import get_current_worker
 import string
 import shutil
+import sqlite3
 import asyncio
+from collections import OrderedDict
+from bisect import bisect_left, bisect_right
+from time import perf_counter
 
 
 VERSION = parse_version(etm_version)
@@ -53,6 +71,26 @@ TITLE_COLOR = NAMED_COLORS["Cornsilk"]
 # SELECTED_COLOR = NAMED_COLORS["Yellow"]
 SELECTED_COLOR = "bold yellow"
 
+# Navigation keys arriving within NAVIGATION_DELAY seconds of the last update
+# are coalesced into a single update, but one is made at least every
+# NAVIGATION_MAX_DELAY seconds while a key is held down
+NAVIGATION_DELAY = 0.06
+NAVIGATION_MAX_DELAY = 0.25
+
+# Seconds before a pending controller call shows the loading indicator
+LOADING_DELAY = 0.2
+
+# Seconds without a keystroke in the find input before the query is run
+FIND_DELAY = 0.15
+
+# The render scheduler ticks every FRAME_INTERVAL seconds while it has work or
+# instrumentation is on. A tick more than FRAME_BUDGET seconds late is counted
+# as a late frame. Deferred work runs only after IDLE_DELAY seconds without a
+# key press.
+FRAME_INTERVAL = 1 / 30
+FRAME_BUDGET = 1 / 60
+IDLE_DELAY = 0.5
+
 ONEDAY = timedelta(days=1)
 ONEWK = 7 * ONEDAY
 alpha = [x for x in string.ascii_lowercase]
@@ -70,6 +108,117 @@ TYPE_TO_COLOR = {
 }
 
 
+class SearchIndex:
+    """
+    A case-insensitive substring index over the plain text of a row source.
+
+    The lowercased text is built once, on the first search after the content
+    changes, so later searches are plain substring checks. A search term that
+    extends the previous one only checks the previous matches.
+    """
+
+    # Lines added to the index by each call to build_step
+    BUILD_STEP = 500
+
+    def __init__(self, rows: RowSource):
+        self.rows = rows
+        self.size = len(rows)
+        self.lowered = None
+        self._partial = []
+        self.last_term = None
+        self.last_matches = []
+
+    def build_step(self) -> bool:
+        """
+        Add the next BUILD_STEP lines to the index and return True if there are
+        more to add, so that the index can be built in idle time.
+        """
+        if self.lowered is not None:
+            return False
+        start = len(self._partial)
+        stop = min(start + self.BUILD_STEP, self.size)
+        self._partial.extend(
+            markup_to_plain(line).lower() for line in self.rows.get(range(start, stop))
+        )
+        if stop < self.size:
+            return True
+        self.lowered, self._partial = self._partial, []
+        return False
+
+    def search(self, term: str) -> list[int]:
+        """Return the sorted indices of the lines containing term, ignoring case."""
+        if not term:
+            self.last_term, self.last_matches = None, []
+            return []
+        while self.build_step():
+            pass
+        term = term.lower()
+        lowered = self.lowered
+        if self.last_term and self.last_term in term:
+            # the new matches are a subset of the last ones
+            candidates = self.last_matches
+        else:
+            candidates = range(self.size)
+        matches = [i for i in candidates if term in lowered[i]]
+        self.last_term, self.last_matches = term, matches
+        return matches
+
+
+class RenderScheduler:
+    """
+    Frame timing and idle work for DynamicViewApp.
+
+    While there is deferred work or instrumentation is on, a timer ticks every
+    FRAME_INTERVAL seconds. A tick that arrives more than FRAME_BUDGET seconds
+    late means the event loop was busy for at least a frame. It is counted as
+    frames.late, with the number of whole frames missed added to
+    frames.dropped.
+
+    Jobs given to defer() run on ticks that are on time and come at least
+    IDLE_DELAY seconds after the last key press, one job per tick. A job that
+    returns True has more to do and is queued again. Deferring a job under a
+    name that is already queued replaces it.
+    """
+
+    def __init__(self, app: App):
+        self.app = app
+        self.jobs = OrderedDict()
+        self.last_input = 0.0
+        self.last_tick = 0.0
+        self.timer = None
+
+    def note_input(self):
+        self.last_input = perf_counter()
+
+    def defer(self, name: str, job):
+        """Run job, a callable without arguments, when the app is idle."""
+        self.jobs.pop(name, None)
+        self.jobs[name] = job
+        self.start()
+
+    def start(self):
+        if self.timer is None:
+            self.last_tick = perf_counter()
+            self.timer = self.app.set_interval(FRAME_INTERVAL, self.tick)
+
+    def tick(self):
+        now = perf_counter()
+        late = now - self.last_tick - FRAME_INTERVAL
+        self.last_tick = now
+        if late > FRAME_BUDGET:
+            instrumentation.incr("frames.late")
+            instrumentation.incr("frames.dropped", int(late / FRAME_INTERVAL))
+        elif self.jobs and now - self.last_input >= IDLE_DELAY:
+            name, job = self.jobs.popitem(last=False)
+            with span(f"idle.{name}"):
+                more = job()
+            if more:
+                self.jobs[name] = job
+        if not self.jobs and not instrumentation.enabled:
+            self.timer.stop()
+            self.timer = None
+
+
 def format_date_range(start_dt: datetime, end_dt: datetime):
     """
     Format a datetime object as a week string, taking not to repeat the month name unless the week spans two months.
@@ -155,6 +304,7 @@ HelpText = f"""\
 [bold][{HEADER_COLOR}]View[/{HEADER_COLOR}][/bold]
   [bold]W[/bold]:           Weeks view          [bold]N[/bold]:         Next occurrences 
   [bold]F[/bold]:           Find in items       [bold]L[/bold]:         Last occurrences 
+  [bold]J[/bold]:           Available jobs      [bold]G[/bold]:         Goals this week
 [bold][{HEADER_COLOR}]Search Keys[/{HEADER_COLOR}][/bold]
   [bold]/[/bold]:           Set search          [bold]>[/bold]:         Next match 
   [bold]escape[/bold]:      Clear search        [bold]<[/bold]:         Previous match           
@@ -193,115 +343,456 @@ class DetailsScreen(Screen):
 
 
 class SearchScreen(Screen):
-    """A screen to handle search input and display results."""
+    """
+    Find as you type: the items matching the words, and optional /regex/, in the
+    input are listed after each pause of FIND_DELAY seconds in typing.
+
+    The query runs in a thread worker on a copy of the controller, see
+    DynamicViewApp.fetch, and the matches are shown as they arrive. A new query
+    cancels the one in progress, interrupting its database statement and
+    closing its copy unless the list still shows its rows. Enter moves the
+    focus to the list so that its tags can be used.
+    """
 
     def __init__(self, controller):
         super().__init__()
         self.controller = controller
-        self.search_term = None  # Store the search term
-        self.results = []  # Store search results
+        self.search_term = None  # The term of the latest query
+        self._find_timer = None
+        self._find = None  # (worker, controller copy) of the latest query
 
     def compose(self) -> ComposeResult:
-        # Display search input at the top
-        yield Input(placeholder="Enter search term...", id="search_input")
-        # Display the scrollable list for search results
-        yield ScrollableList([], id="search_results")
-        # Display a footer
+        yield Input(
+            placeholder='Find words, "phrases", type:- loc:office after:2025-01-01 before:... has:alert, then /regex/ ...',
+            id="search_input",
+        )
+        yield Static("", id="scroll_title", expand=True, classes="title-class")
+        yield ScrollableList([], id="list")
         yield Static(
-            "[bold yellow]?[/bold yellow] Help [bold yellow]ESC[/bold yellow] Back",
+            "[bold yellow]?[/bold yellow] Help [bold yellow]ENTER[/bold yellow] Tags [bold yellow]ESC[/bold yellow] Back",
             id="custom_footer",
         )
 
+    @property
+    def busy(self) -> bool:
+        """True while a query is waiting for the typing to pause or running."""
+        return self._find_timer is not None or (
+            self._find is not None and not self._find[0].is_finished
+        )
+
+    def on_input_changed(self, event: Input.Changed):
+        """Query again when the typing pauses."""
+        if event.input.id != "search_input":
+            return
+        event.stop()
+        if self._find_timer is not None:
+            self._find_timer.stop()
+        self._find_timer = self.set_timer(
+            FIND_DELAY, lambda: self.perform_search(event.value)
+        )
+
     def on_input_submitted(self, event: Input.Submitted):
-        """Handle the submission of the search input."""
-        if event.input.id == "search_input":
-            self.search_term = event.value  # Capture the search term
-            self.query_one("#search_input", Input).remove()  # Remove the input
-            self.perform_search(self.search_term)  # Perform the search
+        """Query at once, if necessary, and move the focus to the list."""
+        if event.input.id != "search_input":
+            return
+        event.stop()
+        if self._find_timer is not None or event.value != self.search_term:
+            self.perform_search(event.value)
+        self.query_one("#list", ScrollableList).focus()
 
     def perform_search(self, search_term: str):
-        """Perform the search and update the results."""
-        self.results = self.controller.find_records(search_term)  # Query controller
-        scrollable_list = self.query_one("#search_results", ScrollableList)
-        if self.results:
-            # Populate the scrollable list with results
-            scrollable_list.lines = [Text.from_markup(line) for line in self.results]
-        else:
-            # Display a message if no results are found
-            scrollable_list.lines = [Text("No matches found.")]
-        scrollable_list.refresh()
+        """Cancel the query in progress and start one for search_term."""
+        if self._find_timer is not None:
+            self._find_timer.stop()
+            self._find_timer = None
+        self.cancel_search()
+        self.search_term = search_term
+        if not search_term.strip():
+            self.query_one("#scroll_title", Static).update("")
+            self.query_one("#list", ScrollableList).update_lines([])
+            return
+        controller = self.controller.for_worker()
+
+        def work():
+            worker = get_current_worker()
+            try:
+                for rows in controller.find_records_stream(search_term):
+                    if worker.is_cancelled:
+                        return
+                    self.app.call_from_thread(self.show_results, worker, controller, rows)
+            except sqlite3.Error:
+                # raised by the statement that cancel_search interrupted, or
+                # by the connection it closed
+                if not worker.is_cancelled:
+                    raise
+
+        worker = self.run_worker(
+            work, name="find", group="find", exclusive=True, thread=True
+        )
+        self._find = (worker, controller)
+
+    def cancel_search(self):
+        """
+        Cancel the query in progress, if any, and close its copy of the
+        controller unless the list shows its rows and so closes it in turn.
+        """
+        if self._find is not None:
+            worker, controller = self._find
+            if not worker.is_finished:
+                worker.cancel()
+                controller.interrupt()
+            # the list may have been removed, closing its owner, on unmount
+            if all(rows.owner is not controller for rows in self.query(ScrollableList)):
+                controller.close()
+            self._find = None
+
+    def show_results(self, worker, controller, rows: RowSource):
+        """Show the title and the rows of a result from the find worker."""
+        if worker.is_cancelled:
+            return
+        self.controller.adopt(controller)
+        self.app.afill = controller.afill
+        title, *_ = rows.get(range(0, 1))
+        self.query_one("#scroll_title", Static).update(title)
+        self.query_one("#list", ScrollableList).update_lines(
+            SliceRows(rows, 1), owner=controller
+        )
 
     def on_key(self, event):
         """Handle key presses."""
         if event.key == "escape":
+            if self.query_one("#list", ScrollableList).search_term:
+                # leave clearing the search of the list to the app
+                return
+            self.cancel_search()
             # Return to the previous screen
             self.app.pop_screen()
 
+    def on_unmount(self):
+        self.cancel_search()
+
 
 class ScrollableList(ScrollView):
-    """A scrollable list widget with a fixed title and search functionality."""
+    """A scrollable list widget with a fixed title and search functionality.
+
+    The lines come from a row source, see rows.py, or a list of markup strings.
+    Only the lines scrolled into view are requested and each is parsed into Rich
+    Text when it is first needed. Parsed lines and rendered strips are kept in
+    bounded caches, the strips keyed by (line index, width, highlighted), which
+    are cleared only when the content or the width changes.
 
-    def __init__(self, lines: list[str], **kwargs) -> None:
+    A row source that formats its rows through a copy of the controller from
+    Controller.for_worker is shown with that copy as its owner, which the list
+    closes when the rows are replaced or the list is removed.
+    """
+
+    # Maximum number of parsed lines and of rendered strips to keep
+    LINE_CACHE_SIZE = 2048
+    STRIP_CACHE_SIZE = 2048
+
+    def __init__(self, lines: list[str] | RowSource, owner=None, **kwargs) -> None:
         super().__init__(**kwargs)
 
         # Extract the title and remaining lines
         # self.title = Text.from_markup(title) if title else Text("Untitled")
         width = shutil.get_terminal_size().columns - 3
-        self.lines = [Text.from_markup(line) for line in lines]  # Exclude the title
-        self.virtual_size = Size(
-            width, len(self.lines)
-        )  # Adjust virtual size for lines
         self.console = Console()
         self.search_term = None
         self.matches = []
+        self.match_set = set()
+        self._line_cache = LRUCache(self.LINE_CACHE_SIZE)
+        self._strip_cache = LRUCache(self.STRIP_CACHE_SIZE)
+        self._strip_width = None
+        self.owner = None
+        self.update_lines(lines, width, owner)
+
+    def update_lines(
+        self, lines: list[str] | RowSource, width: int = None, owner=None
+    ) -> None:
+        """
+        Replace the content with lines, a row source or list of markup strings,
+        and close the owner of the previous content unless it is owner.
+        """
+        if self.owner is not None and self.owner is not owner:
+            self.owner.close()
+        self.owner = owner
+        self.rows = as_row_source(lines)
+        self.search_index = SearchIndex(self.rows)
+        self._line_cache.clear()
+        self._strip_cache.clear()
+        self.virtual_size = Size(
+            self.virtual_size.width if width is None else width,
+            len(self.rows),
+        )  # Adjust virtual size for lines
+        self.refresh()
+
+    def on_unmount(self):
+        if self.owner is not None:
+            self.owner.close()
+            self.owner = None
+
+    @property
+    def lines(self) -> list[Text]:
+        """All lines as Rich Text. Prefer get_line(), which parses only one line."""
+        return [Text.from_markup(line) for line in self.rows]
+
+    def get_line(self, index: int) -> Text:
+        """Return line index as Rich Text, parsing its markup on first use."""
+        text = self._line_cache.get(index)
+        if text is None:
+            text = Text.from_markup(self.rows.get(range(index, index + 1))[0])
+            self._line_cache[index] = text
+        return text
+
+    def get_plain(self, index: int) -> str:
+        """Return the plain text of line index without parsing its styles."""
+        text = self._line_cache.get(index)
+        if text is not None:
+            return text.plain
+        return markup_to_plain(self.rows.get(range(index, index + 1))[0])
+
+    def refit(self):
+        """Drop what depends on the text of the rows after their width changed."""
+        self._line_cache.clear()
+        self.search_index = SearchIndex(self.rows)
+        if self.search_term:
+            self.matches = self.search_index.search(self.search_term)
+            self.match_set = set(self.matches)
 
     def set_search_term(self, search_term: str):
         """Set the search term, clear previous matches, and find new matches."""
         log_msg(f"Setting search term: {search_term}")
         self.clear_search()  # Clear previous search results
         self.search_term = search_term.lower() if search_term else None
-        self.matches = [
-            i
-            for i, line in enumerate(self.lines)
-            if self.search_term and self.search_term in line.plain.lower()
-        ]
+        self.matches = self.search_index.search(self.search_term)
+        self.match_set = set(self.matches)
         if self.matches:
-            self.scroll_to(0, self.matches[0])  # Scroll to the first match
+            # jump rather than animate: the default scroll speed is 50 lines a
+            # second and a match may be thousands of lines away
+            self.scroll_to(0, self.matches[0], animate=False)
             self.refresh()
 
+    def next_match(self, y: int):
+        """Return the first match after line y or None."""
+        i = bisect_right(self.matches, y)
+        return self.matches[i] if i < len(self.matches) else None
+
+    def previous_match(self, y: int):
+        """Return the last match before line y or None."""
+        i = bisect_left(self.matches, y)
+        return self.matches[i - 1] if i > 0 else None
+
     def clear_search(self):
         """Clear the current search and remove all highlights."""
         self.search_term = None
         self.matches = []  # Clear the list of matches
+        self.match_set = set()
         self.refresh()  # Refresh the view to remove highlights
 
     def render_line(self, y: int) -> Strip:
         """Render a single line of the list."""
         scroll_x, scroll_y = self.scroll_offset  # Current scroll position
         y += scroll_y  # Adjust for the current vertical scroll offset
+        width = self.size.width
 
         # If the line index is out of bounds, return an empty line
-        if y < 0 or y >= len(self.lines):
-            return Strip.blank(self.size.width)
+        if y < 0 or y >= len(self.rows):
+            return Strip.blank(width)
+
+        if width != self._strip_width:
+            self._strip_cache.clear()
+            self._strip_width = width
+            if self.rows.set_width(width):
+                self.refit()
+
+        highlighted = bool(self.search_term) and y in self.match_set
+        key = (y, width, highlighted)
+        strip = self._strip_cache.get(key)
+        if strip is not None:
+            return strip
 
         # Get the Rich Text object for the current line
-        line_text = self.lines[y].copy()  # Create a copy to apply styles dynamically
+        line_text = self.get_line(y)
 
         # Highlight the line if it matches the search term
-        if self.search_term and y in self.matches:
+        if highlighted:
+            line_text = line_text.copy()  # Copy to apply styles dynamically
             line_text.stylize(f"bold {MATCH_COLOR}")  # Apply highlighting
 
         # Render the Rich Text into segments
         segments = list(line_text.render(self.console))
 
         # Adjust segments for horizontal scrolling
-        cropped_segments = Segment.adjust_line_length(
-            segments, self.size.width, style=None
-        )
-        return Strip(
-            cropped_segments,
-            self.size.width,
-        )
+        cropped_segments = Segment.adjust_line_length(segments, width, style=None)
+        strip = Strip(cropped_segments, width)
+        self._strip_cache[key] = strip
+        return strip
+
+
+class WeekGrid(Widget):
+    """
+    The 4-week grid of the weeks view as a persistent widget.
+
+    The grid is drawn with the Line API in the style of the rich table from
+    Controller.generate_table. Each cell is rendered only when its markup,
+    selection or column width changes and update_grid refreshes only the
+    lines of the week rows that differ from those already displayed, so moving
+    the selection to the next week repaints two rows rather than the table.
+    """
+
+    WEEKDAYS = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+    ROW_HEIGHT = 2  # lines of content in each week row
+    CELL_CACHE_SIZE = 512
+
+    def __init__(self, weeks: list, selected_week: tuple, **kwargs):
+        super().__init__(**kwargs)
+        self.console = Console()
+        self.frame_style = Style.parse(GRID_FRAME_COLOR)
+        self.weeks = []  # (yr_wk, cells) for each displayed week
+        self.selected_week = None
+        self._cell_cache = LRUCache(self.CELL_CACHE_SIZE)
+        self._row_strips = {}  # row -> strips for the content lines of the row
+        self._width = None
+        self._column_widths = []
+        self.update_grid(weeks, selected_week)
+
+    def get_content_height(self, container, viewport, width: int) -> int:
+        # top border, header, rule and each week row followed by a rule
+        return 3 + (self.ROW_HEIGHT + 1) * len(self.weeks)
+
+    def _row_key(self, row: int):
+        yr_wk, cells = self.weeks[row]
+        return tuple(cells), yr_wk == self.selected_week
+
+    def update_grid(self, weeks: list, selected_week: tuple):
+        """
+        Display the (yr_wk, cells) rows from Controller.generate_grid with
+        selected_week highlighted, refreshing only the rows that changed.
+        """
+        old_keys = [self._row_key(row) for row in range(len(self.weeks))]
+        resized = len(weeks) != len(self.weeks)
+        self.weeks = list(weeks)
+        self.selected_week = selected_week
+        if resized:
+            self._row_strips.clear()
+            self.refresh(layout=True)
+            return
+        for row in range(len(self.weeks)):
+            if self._row_key(row) != old_keys[row]:
+                self._row_strips.pop(row, None)
+                y = 3 + (self.ROW_HEIGHT + 1) * row
+                self.refresh(Region(0, y, self.size.width, self.ROW_HEIGHT))
+
+    def _set_width(self, width: int):
+        if width == self._width:
+            return
+        self._width = width
+        self._row_strips.clear()
+        # ratio=1 columns: the space left after the 8 vertical bars is shared
+        # equally with any remainder going to the leftmost columns
+        base, extra = divmod(max(width - 8, 7), 7)
+        self._column_widths = [base + 1 if i < extra else base for i in range(7)]
+
+    def _render_cell(self, markup: str, width: int, height: int, style: str):
+        """Return the lines of segments for a centered cell with 1 space padding."""
+        key = (markup, width, height, style)
+        lines = self._cell_cache.get(key)
+        if lines is None:
+            row_style = Style.parse(style) if style else Style()
+            text = Text.from_markup(markup, justify="center")
+            options = self.console.options.update(
+                width=max(width - 2, 1), height=height
+            )
+            pad = Segment(" ", row_style)
+            lines = [
+                [pad, *line, pad]
+                for line in self.console.render_lines(
+                    text, options, style=row_style, pad=True
+                )
+            ]
+            self._cell_cache[key] = lines
+        return lines
+
+    def _join(self, cell_lines: list, height: int) -> list[Strip]:
+        bar = Segment(box.SQUARE.mid_vertical, self.frame_style)
+        strips = []
+        for k in range(height):
+            segments = [bar]
+            for lines in cell_lines:
+                segments.extend(lines[k])
+                segments.append(bar)
+            strips.append(Strip(segments).adjust_cell_length(self._width))
+        return strips
+
+    def _header(self) -> Strip:
+        strips = self._row_strips.get("header")
+        if strips is None:
+            strips = self._join(
+                [
+                    self._render_cell(day, width, 1, GRID_HEADER_STYLE)
+                    for day, width in zip(self.WEEKDAYS, self._column_widths)
+                ],
+                1,
+            )
+            self._row_strips["header"] = strips
+        return strips[0]
+
+    def _week_row(self, row: int) -> list[Strip]:
+        strips = self._row_strips.get(row)
+        if strips is None:
+            yr_wk, cells = self.weeks[row]
+            if yr_wk == self.selected_week:
+                cells = [
+                    f"[{GRID_SELECTED_COLOR}]{cell}[/{GRID_SELECTED_COLOR}]"
+                    for cell in cells
+                ]
+                style = f"{DAY_COLOR} on {GRID_SELECTED_BACKGROUND}"
+            else:
+                style = DAY_COLOR
+            strips = self._join(
+                [
+                    self._render_cell(cell, width, self.ROW_HEIGHT, style)
+                    for cell, width in zip(cells, self._column_widths)
+                ],
+                self.ROW_HEIGHT,
+            )
+            self._row_strips[row] = strips
+        return strips
+
+    def _rule(self, y: int) -> Strip:
+        if y == 0:
+            line = box.SQUARE.get_top(self._column_widths)
+        elif y == 2:
+            line = box.SQUARE.get_row(self._column_widths, "head")
+        elif y == self.get_content_height(None, None, self._width) - 1:
+            line = box.SQUARE.get_bottom(self._column_widths)
+        else:
+            line = box.SQUARE.get_row(self._column_widths, "row")
+        return Strip([Segment(line, self.frame_style)]).adjust_cell_length(self._width)
+
+    def show_selection(self, selected_week: tuple) -> bool:
+        """
+        Move the highlight to selected_week if it is one of the displayed weeks
+        and return True, otherwise return False.
+        """
+        if selected_week not in [yr_wk for yr_wk, _ in self.weeks]:
+            return False
+        self.update_grid(self.weeks, selected_week)
+        return True
+
+    def render_line(self, y: int) -> Strip:
+        """Render a single line of the grid."""
+        self._set_width(self.size.width)
+        if y == 1:
+            return self._header()
+        if y in (0, 2):
+            return self._rule(y)
+        row, k = divmod(y - 3, self.ROW_HEIGHT + 1)
+        if row >= len(self.weeks):
+            return Strip.blank(self._width)
+        if k == self.ROW_HEIGHT:
+            return self._rule(y)
+        return self._week_row(row)[k]
 
 
 class WeeksScreen(Screen):
@@ -310,23 +801,27 @@ class WeeksScreen(Screen):
     def __init__(
         self,
         title: str,
-        table: str,
+        weeks: list,
+        selected_week: tuple,
         list_title: str,
         details: list[str],
         footer_content: str = "[bold yellow]?[/bold yellow] Help [bold yellow]/[/bold yellow] Search",
     ):
         super().__init__()
         self.table_title = title
-        self.table = table
+        self.weeks = weeks
+        self.selected_week = selected_week
         self.list_title = list_title
         self.details = details
         self.footer_content = footer_content
 
     def compose(self) -> ComposeResult:
         # Display the table
-        if self.table_title and self.table:
+        if self.table_title and self.weeks:
             yield Static(self.table_title, id="table_title", classes="title-class")
-            yield Static(self.table, id="table", classes="weeks-table")
+            yield WeekGrid(
+                self.weeks, self.selected_week, id="table", classes="weeks-table"
+            )
 
         # Display the title and scrollable list
         yield Static(self.list_title, id="list_title", classes="title-class")
@@ -339,19 +834,26 @@ class FullScreenList(Screen):
 
     def __init__(
         self,
-        details: list[str],
+        details: list[str] | RowSource,
         footer_content: str = "[bold yellow]?[/bold yellow] Help [bold yellow]/[/bold yellow] Search",
+        owner=None,
     ):
         super().__init__()
+        self.owner = owner  # see ScrollableList
+        details = as_row_source(details)
+        self.details = details
         if details:
-            self.title = details[0]  # First line is the title
-            self.header = details[1]  # First line is also the header
-            self.lines = details[2:]  # Remaining lines are scrollable content
+            first = details.get(range(0, 3))
+            self.title = first[0]  # First line is the title
+            self.header = first[1] if len(first) > 1 else ""  # Second is the header
+            # Remaining lines are scrollable content
+            self.lines = SliceRows(details, 2)
         else:
             self.title = "Untitled"
             self.lines = []
+            first = []
         self.footer_content = footer_content
-        log_msg(f"FullScreenList: {details[:3] = }")
+        log_msg(f"FullScreenList: {first = }")
 
     def compose(self) -> ComposeResult:
         """Compose the layout."""
@@ -366,9 +868,22 @@ class FullScreenList(Screen):
         yield Static(
             Rule("", style="#fff8dc"), id="separator"
         )  # Add a horizontal line separator
-        yield ScrollableList(self.lines, id="list")  # Using "list" as the ID
+        # Using "list" as the ID
+        yield ScrollableList(self.lines, owner=self.owner, id="list")
         yield Static(self.footer_content, id="custom_footer")
 
+    def on_resize(self, event):
+        # the list fits its rows to its width when it is next rendered
+        self.call_after_refresh(self.refit_header)
+
+    def refit_header(self):
+        """Show the header as fitted to the current width of the list."""
+        if len(self.details) > 1:
+            header = self.details.get(range(1, 2))[0]
+            if header != self.header:
+                self.header = header
+                self.query_one("#scroll_header", Static).update(header)
+
 
 class DynamicViewApp(App):
     """A dynamic app that supports temporary and permanent view changes."""
@@ -389,6 +904,8 @@ class DynamicViewApp(App):
         ("A", "show_alerts", "Show Alerts"),  # Bind 'A' for Agenda
         ("L", "show_last", "Show Last"),  # Bind 'L' for Last Instances
         ("N", "show_next", "Show Next"),  # Bind 'N' for Next Instances
+        ("J", "show_jobs", "Show Jobs"),  # Bind 'J' for available Jobs
+        ("G", "show_goals", "Show Goals"),  # Bind 'G' for Goals this week
         ("F", "show_find", "Find"),  # Bind 'F' for Find
         ("W", "show_weeks", "Show Weeks"),  # Bind 'W' for Weeks view
         ("?", "show_help", "Help"),
@@ -396,6 +913,7 @@ class DynamicViewApp(App):
         ("/", "start_search", "Search"),
         (">", "next_match", "Next Match"),
         ("<", "previous_match", "Previous Match"),
+        Binding("ctrl+t", "show_timings", "Timings", show=False),
     ]
     search_term = reactive("")  # Store the current search term
 
@@ -409,6 +927,12 @@ class DynamicViewApp(App):
         self.view_mode = "list"  # Initial view is the ScrollableList
         self.view = "week"
         self.saved_lines = []
+        self._update_timer = None  # pending coalesced update_table_and_list
+        self._loading_timer = None
+        self._fetch = None  # (worker, controller copy) of the latest fetch
+        self.scheduler = RenderScheduler(self)
+        self._update_pending_since = 0.0
+        self._last_update = 0.0
 
     def action_take_screenshot(self):
         """Save a screenshot of the current app state."""
@@ -418,6 +942,7 @@ class DynamicViewApp(App):
 
     def on_key(self, event):
         """Handle key events."""
+        self.scheduler.note_input()
         if event.key == "escape":
             if self.view_mode == "info":
                 # self.action_clear_info()  # Use the new action for clearing the search
@@ -435,6 +960,9 @@ class DynamicViewApp(App):
     async def on_mount(self):
         """Start periodic alert checking aligned to 6-second intervals."""
         self.action_show_weeks()
+        if instrumentation.enabled:
+            # count late frames from the start
+            self.scheduler.start()
 
         # Get the current time
         now = datetime.now()
@@ -451,9 +979,10 @@ class DynamicViewApp(App):
     async def check_alerts(self):
         """Check for due alerts and execute commands."""
         now = datetime.now()
-        # Ensure populate_alerts() runs exactly once at midnight
+        # Ensure populate_alerts() runs exactly once at midnight, but not while
+        # keys are being pressed
         if now.hour == 0 and now.minute == 0 and 0 <= now.second < 6:
-            self.controller.populate_alerts()
+            self.scheduler.defer("populate_alerts", self.controller.populate_alerts)
 
         # just for testing
         if now.minute % 10 == 0 and now.second == 0:
@@ -473,15 +1002,10 @@ class DynamicViewApp(App):
         #     except subprocess.CalledProcessError as e:
         #         self.notify(f"Alert {alert_id} failed: {e}", severity="error")
 
-    def mount_full_screen_list(self, details: list[str], footer_content: str):
+    def mount_full_screen_list(
+        self, details: list[str] | RowSource, footer_content: str
+    ):
         """Mount a full-screen list with the given details and footer content."""
-        if details:
-            title = details[0]
-            lines = details[1:]
-        else:
-            title = "Untitled"
-            lines = []
-
         # Create and mount the full-screen list
         full_screen_list = FullScreenList(details, footer_content)
         self.mount(full_screen_list)  # Mount the full-screen list directly
@@ -508,79 +1032,172 @@ class DynamicViewApp(App):
     def action_show_weeks(self):
         """Switch back to the Weeks view."""
         self.view = "week"
-        title, table, details = self.controller.get_table_and_list(
-            self.current_start_date, self.selected_week
+        selected_week = self.selected_week
+
+        def show(result):
+            title, weeks, details = result
+            list_title = details[0]
+            details = details[1:]
+            self.afill = 1 if len(details) <= 26 else 2 if len(details) <= 676 else 3
+            footer = "[bold yellow]?[/bold yellow] Help [bold yellow]/[/bold yellow] Search"
+            self.push_screen(
+                WeeksScreen(title, weeks, selected_week, list_title, details, footer)
+            )
+
+        self.controller.extend_period(self.current_start_date)
+        self.fetch(
+            show, "get_grid_and_list", self.current_start_date, selected_week
         )
-        list_title = details[0]
-        details = details[1:]
-        self.afill = 1 if len(details) <= 26 else 2 if len(details) <= 676 else 3
-        footer = "[bold yellow]?[/bold yellow] Help [bold yellow]/[/bold yellow] Search"
-        self.push_screen(WeeksScreen(title, table, list_title, details, footer))
 
     def action_show_last(self):
         """Show the 'Last' view."""
         self.view = "last"
-        details = self.controller.get_last()
-        self.afill = 1 if len(details) <= 26 else 2 if len(details) <= 676 else 3
-        footer = (
-            "[bold yellow]?[/bold yellow] Help [bold yellow]/[/bold yellow] ESC Back"
-        )
-        self.push_screen(FullScreenList(details, footer))
+        self.fetch(self.show_full_screen_list, "get_last_rows")
 
     def action_show_next(self):
         """Show the 'Next' view."""
         self.view = "next"
-        details = self.controller.get_next()
-        self.afill = 1 if len(details) <= 26 else 2 if len(details) <= 676 else 3
-        footer = (
-            "[bold yellow]?[/bold yellow] Help [bold yellow]/[/bold yellow] ESC Back"
-        )
-        self.push_screen(FullScreenList(details, footer))
+        self.fetch(self.show_full_screen_list, "get_next_rows")
+
+    def action_show_jobs(self):
+        """Show the available jobs by location."""
+        self.view = "jobs"
+        self.fetch(self.show_full_screen_list, "get_jobs_rows")
+
+    def action_show_goals(self):
+        """Show the status of the goals in the current week."""
+        self.view = "goals"
+        self.fetch(self.show_full_screen_list, "get_goals_rows")
 
     def action_show_find(self):
         """Show the 'Find' view."""
         self.view = "find"
-        search_input = Input(
-            placeholder="Enter search term for item name or details ...",
-            id="find_input",
-        )
-        self.mount(search_input)  # Mount the search input widget
-        self.set_focus(search_input)  # Focus on the search input
+        self.push_screen(SearchScreen(self.controller))
 
     def action_show_alerts(self):
         """Show the 'Alerts' view."""
-        width = self.app.size.width
         self.view = "alerts"
-        details = self.controller.get_active_alerts()
+        self.fetch(self.show_full_screen_list, "get_active_alerts_rows")
+
+    def show_full_screen_list(self, details: list[str] | RowSource, owner=None):
+        """
+        Push a FullScreenList for the last, next, jobs, goals or alerts view,
+        whose list closes owner, the controller copy of the rows, see fetch.
+        """
         self.afill = 1 if len(details) <= 26 else 2 if len(details) <= 676 else 3
         footer = (
             "[bold yellow]?[/bold yellow] Help [bold yellow]/[/bold yellow] ESC Back"
         )
-        self.push_screen(FullScreenList(details, footer))
+        self.push_screen(FullScreenList(details, footer, owner))
+        self.call_after_refresh(self.warm_search_index)
+
+    def warm_search_index(self):
+        """
+        Build the search index of the active list in idle time if the list has
+        no more than a page of rows. The index of a longer one is built by its
+        first search, since building it formats every row, which a row source
+        otherwise leaves until the row is scrolled into view.
+        """
+        for scrollable_list in self.screen.query(ScrollableList):
+            if len(scrollable_list.rows) > PAGE_SIZE:
+                continue
+            self.scheduler.defer(
+                "search_index", scrollable_list.search_index.build_step
+            )
+
+    def fetch(self, on_result, method: str, *args):
+        """
+        Call the controller method named method with args in a thread worker and
+        pass its result to on_result on the event loop.
+
+        The worker uses a copy of the controller from Controller.for_worker with
+        its own read-only connection. Starting a fetch cancels the pending one,
+        interrupting its database query, and the result of a cancelled worker is
+        discarded, so only the latest request is displayed. The list in the active screen shows a loading indicator if
+        the result takes longer than LOADING_DELAY seconds.
+
+        The copy is closed when the worker is done, unless the result is a row
+        source, which formats its rows later through the copy. Then the copy
+        is passed to on_result with it, as the owner that the list showing the
+        rows closes, see ScrollableList.
+        """
+        controller = self.controller.for_worker()
+
+        def deliver(worker, result) -> bool:
+            if worker.is_cancelled:
+                return False
+            self.set_loading(False)
+            self.controller.adopt(controller)
+            if isinstance(result, RowSource):
+                on_result(result, controller)
+                return True
+            on_result(result)
+            return False
+
+        def work():
+            worker = get_current_worker()
+            owned = False
+            try:
+                result = getattr(controller, method)(*args)
+                if not worker.is_cancelled:
+                    owned = self.call_from_thread(deliver, worker, result)
+            except sqlite3.Error:
+                # raised by the query that a later fetch interrupted
+                if not worker.is_cancelled:
+                    raise
+            finally:
+                if not owned:
+                    controller.close()
+
+        if self._loading_timer is None:
+            self._loading_timer = self.set_timer(
+                LOADING_DELAY, lambda: self.set_loading(True)
+            )
+        if self._fetch is not None and not self._fetch[0].is_finished:
+            self._fetch[0].cancel()
+            self._fetch[1].interrupt()
+        worker = self.run_worker(
+            work, name=method, group="controller", exclusive=True, thread=True
+        )
+        self._fetch = (worker, controller)
+
+    @property
+    def busy(self) -> bool:
+        """
+        True while a navigation update, a controller fetch or a query of the
+        active SearchScreen is pending.
+        """
+        return (
+            self._update_timer is not None
+            or any(
+                worker.group == "controller" and not worker.is_finished
+                for worker in self.workers
+            )
+            or getattr(self.screen, "busy", False)
+        )
+
+    def set_loading(self, loading: bool):
+        """Show or hide the loading indicator over the list in the active screen."""
+        if not loading and self._loading_timer is not None:
+            self._loading_timer.stop()
+            self._loading_timer = None
+        for widget in self.screen.query("#list"):
+            widget.loading = loading
 
     def on_input_submitted(self, event: Input.Submitted):
-        """Handle submission from search or find input."""
+        """Handle submission from the inline search input."""
         search_term = event.value  # Get the submitted search term
         event.input.remove()  # Remove the input widget after submission
 
-        if event.input.id == "find_input":
-            self.view = "find"
-            # Handle the 'Find' view
-            results = self.controller.find_records(search_term)  # Fetch results
-            footer = (
-                "[bold yellow]?[/bold yellow] Help "
-                "[bold yellow]ESC[/bold yellow] Back "
-                '[bold yellow]"/"[/bold yellow] Search'
-            )
-            # Mount a FullScreenList to display the results
-            self.afill = 1 if len(results) <= 26 else 2 if len(results) <= 676 else 3
-            self.push_screen(FullScreenList(results))
-            # self.mount_full_screen_list(results, footer)
-
-        elif event.input.id == "search":
+        if event.input.id == "search":
             # Handle inline search in the current list
             self.perform_search(search_term)  # Perform the search in the active list
 
+    def on_input_changed(self, event: Input.Changed):
+        """Search the current list as the inline search term is typed."""
+        if event.input.id == "search":
+            self.perform_search(event.value)
+
     def update_footer(self, search_active: bool = False, search_string: str = ""):
         """Update the footer based on the current state."""
         if search_active:
@@ -596,7 +1213,8 @@ class DynamicViewApp(App):
                 "[bold yellow]?[/bold yellow] Help, [bold yellow]/[/bold yellow] Search"
             )
 
-        self.query_one("#custom_footer", Static).update_content(footer_content)
+        footer = self.screen.query_one("#custom_footer", Static)
+        footer.update_content(footer_content)
 
     def action_start_search(self):
         """Show the search input widget for inline search."""
@@ -606,7 +1224,7 @@ class DynamicViewApp(App):
 
     def action_clear_info(self):
         try:
-            footer = self.query_one("#custom_footer", Static)
+            footer = self.screen.query_one("#custom_footer", Static)
             footer.update(
                 "[bold yellow]?[/bold yellow] Help [bold yellow]/[/bold yellow] Search"
             )
@@ -618,7 +1236,7 @@ class DynamicViewApp(App):
         self.search_term = ""  # Clear the global search term
         try:
             # Find the active ScrollableList and clear the search
-            scrollable_list = self.query_one("#list", ScrollableList)
+            scrollable_list = self.screen.query_one("#list", ScrollableList)
             scrollable_list.clear_search()
             scrollable_list.refresh()
         except LookupError:
@@ -626,7 +1244,7 @@ class DynamicViewApp(App):
 
         # Update the footer to reflect the cleared search state
         try:
-            footer = self.query_one("#custom_footer", Static)
+            footer = self.screen.query_one("#custom_footer", Static)
             footer.update(
                 "[bold yellow]?[/bold yellow] Help [bold yellow]/[/bold yellow] Search"
             )
@@ -636,13 +1254,11 @@ class DynamicViewApp(App):
     def action_next_match(self):
         """Scroll to the next match."""
         try:
-            scrollable_list = self.query_one("#list", ScrollableList)
+            scrollable_list = self.screen.query_one("#list", ScrollableList)
             current_y = scrollable_list.scroll_offset.y
-            next_match = next(
-                (i for i in scrollable_list.matches if i > current_y), None
-            )
+            next_match = scrollable_list.next_match(current_y)
             if next_match is not None:
-                scrollable_list.scroll_to(0, next_match)  # Scroll to the next match
+                scrollable_list.scroll_to(0, next_match, animate=False)
                 scrollable_list.refresh()
             else:
                 log_msg("No next match found.")
@@ -652,15 +1268,11 @@ class DynamicViewApp(App):
     def action_previous_match(self):
         """Scroll to the previous match."""
         try:
-            scrollable_list = self.query_one("#list", ScrollableList)
+            scrollable_list = self.screen.query_one("#list", ScrollableList)
             current_y = scrollable_list.scroll_offset.y
-            previous_match = next(
-                (i for i in reversed(scrollable_list.matches) if i < current_y), None
-            )
+            previous_match = scrollable_list.previous_match(current_y)
             if previous_match is not None:
-                scrollable_list.scroll_to(
-                    0, previous_match
-                )  # Scroll to the previous match
+                scrollable_list.scroll_to(0, previous_match, animate=False)
                 scrollable_list.refresh()
             else:
                 log_msg("No previous match found.")
@@ -672,7 +1284,7 @@ class DynamicViewApp(App):
         self.search_term = search_term  # Update the search term globally
         try:
             # Find the ScrollableList in the current view
-            scrollable_list = self.query_one("#list", ScrollableList)
+            scrollable_list = self.screen.query_one("#list", ScrollableList)
             scrollable_list.set_search_term(search_term)
             scrollable_list.refresh()
         except LookupError:
@@ -681,6 +1293,10 @@ class DynamicViewApp(App):
     def action_show_help(self):
         self.push_screen(DetailsScreen(HelpText))
 
+    def action_show_timings(self):
+        """Show the instrumentation summary (hidden binding)."""
+        self.push_screen(DetailsScreen(instrumentation.as_lines()))
+
     def action_show_details(self, tag: str):
         """Show a temporary details screen for the selected item."""
         log_msg(f"{tag = }, {self.view = }, {self.selected_week = }")
@@ -691,54 +1307,112 @@ class DynamicViewApp(App):
         """Exit the app."""
         self.exit()
 
+    def schedule_table_update(self):
+        """
+        Update the table and list after a navigation key, coalescing key repeats.
+
+        The first key after a pause updates at once. Keys that follow within
+        NAVIGATION_DELAY only change the target week and restart a timer so that
+        just the final state is fetched and rendered, while the grid highlight
+        is moved immediately when the target week is already displayed.
+        """
+        now = perf_counter()
+        if self._update_timer is None:
+            if now - self._last_update >= NAVIGATION_DELAY:
+                self.update_table_and_list()
+                return
+            self._update_pending_since = now
+        else:
+            self._update_timer.stop()
+            instrumentation.incr("view.coalesced_updates")
+            if now - self._update_pending_since >= NAVIGATION_MAX_DELAY:
+                self._update_timer = None
+                self.update_table_and_list()
+                return
+        try:
+            self.screen.query_one("#table", WeekGrid).show_selection(
+                self.selected_week
+            )
+        except LookupError:
+            pass
+        self._update_timer = self.set_timer(
+            NAVIGATION_DELAY, self._flush_table_update
+        )
+
+    def _flush_table_update(self):
+        self._update_timer = None
+        self.update_table_and_list()
+
     def update_table_and_list(self):
         """Update the table and scrollable list."""
+        if not isinstance(self.screen, WeeksScreen):
+            # the new period and week are shown when the weeks view is next opened
+            return
         log_msg(f"{self.selected_week = }, {self.current_start_date = }")
-        title, table, details = self.controller.get_table_and_list(
-            self.current_start_date, self.selected_week
+        start = perf_counter()
+        selected_week = self.selected_week
+        self.controller.extend_period(self.current_start_date)
+        self.fetch(
+            lambda result: self.show_table_and_list(result, selected_week, start),
+            "get_grid_and_list",
+            self.current_start_date,
+            selected_week,
         )
+        self._last_update = perf_counter()
+
+    def show_table_and_list(self, result: tuple, selected_week: tuple, start: float):
+        """Display the result of get_grid_and_list in the weeks view."""
+        if not isinstance(self.screen, WeeksScreen):
+            return
+        title, weeks, details = result
+        with span("view.update_widgets"), self.batch_update():
+            # The weeks view is a pushed screen so query it rather than the app
+            screen = self.screen
+            # Update the grid in place
+            screen.query_one("#table_title", Static).update(title)
+            screen.query_one("#table", WeekGrid).update_grid(weeks, selected_week)
+
+            # Extract the title (always the first line) and update the title widget
+            if details:
+                title = details[0]  # Use the first line as the title
+                screen.query_one("#list_title", Static).update(title)
+
+            # Update the scrollable list with the remaining lines
+            scrollable_list = screen.query_one("#list", ScrollableList)
+            scrollable_list.update_lines(details[1:], 40)  # Exclude title
+
+            # Reapply the search term if it's active
+            if self.search_term:
+                scrollable_list.set_search_term(self.search_term)
+            else:
+                self.warm_search_index()
 
-        # Update the table widget
-        self.query_one("#table_title", Static).update(title)
-        self.query_one("#table", Static).update(table)
-
-        # Extract the title (always the first line) and update the title widget
-        if details:
-            title = details[0]  # Use the first line as the title
-            self.query_one("#list_title", Static).update(title)
-
-        # Update the scrollable list with the remaining lines
-        scrollable_list = self.query_one("#list", ScrollableList)
-        scrollable_list.lines = [
-            Text.from_markup(line) for line in details[1:]
-        ]  # Exclude title
-        scrollable_list.virtual_size = Size(40, len(details[1:]))  # Adjust virtual size
-        scrollable_list.refresh()
-
-        # Reapply the search term if it's active
-        if self.search_term:
-            scrollable_list.set_search_term(self.search_term)
+        if instrumentation.enabled:
+            # key press to painted screen, measured once Textual has refreshed
+            self.call_after_refresh(
+                lambda: instrumentation.record("view.refresh", perf_counter() - start)
+            )
 
     def action_current_period(self):
         self.current_start_date = calculate_4_week_start()
         self.selected_week = tuple(datetime.now().isocalendar()[:2])
-        self.update_table_and_list()
+        self.schedule_table_update()
 
     def action_next_period(self):
         self.current_start_date += timedelta(weeks=4)
         self.selected_week = tuple(self.current_start_date.isocalendar()[:2])
-        self.update_table_and_list()
+        self.schedule_table_update()
 
     def action_previous_period(self):
         self.current_start_date -= timedelta(weeks=4)
         self.selected_week = tuple(self.current_start_date.isocalendar()[:2])
-        self.update_table_and_list()
+        self.schedule_table_update()
 
     def action_previous_week(self):
         self.selected_week = get_previous_yrwk(*self.selected_week)
         if self.selected_week < tuple((self.current_start_date).isocalendar()[:2]):
             self.current_start_date -= timedelta(weeks=1)
-        self.update_table_and_list()
+        self.schedule_table_update()
 
     def action_next_week(self):
         self.selected_week = get_next_yrwk(*self.selected_week)
@@ -746,7 +1420,7 @@ class DynamicViewApp(App):
             (self.current_start_date + timedelta(weeks=4) - ONEDAY).isocalendar()[:2]
         ):
             self.current_start_date += timedelta(weeks=1)
-        self.update_table_and_list()
+        self.schedule_table_update()
 
     def action_center_week(self):
         """Make the selected week the 2nd row of the 4-week period."""
@@ -755,7 +1429,7 @@ class DynamicViewApp(App):
             " ".join(map(str, [self.selected_week[0], self.selected_week[1], 1])),
             "%G %V %u",
         ) - timedelta(weeks=1)
-        self.update_table_and_list()
+        self.schedule_table_update()
 
     def action_replace_with_tree_view(self):
         """Replace the list view with a tree view."""
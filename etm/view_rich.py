@@ -20,10 +20,14 @@ from rich import box
 from prompt_toolkit.key_binding import KeyBindings
 from prompt_toolkit.keys import Keys
 from prompt_toolkit.shortcuts import PromptSession
+import asyncio
+import io
 import string
 import shutil
+from time import perf_counter
 from typing import List, Tuple, Dict
 from .common import log_msg, display_messages
+from .instrument import instrumentation
 
 
 DAY_COLOR = NAMED_COLORS["LemonChiffon"]
@@ -50,6 +54,20 @@ HEADER_COLOR = NAMED_COLORS["LemonChiffon"]
 
 ONEDAY = timedelta(days=1)
 ONEWK = 7 * ONEDAY
+
+# Navigation keys arriving within NAVIGATION_DELAY seconds of the last redraw
+# are coalesced into a single redraw, but one is made at least every
+# NAVIGATION_MAX_DELAY seconds while a key is held down
+NAVIGATION_DELAY = 0.06
+NAVIGATION_MAX_DELAY = 0.25
+
+# Terminal control sequences used by LineRenderer. Terminals without
+# synchronized output ignore BEGIN_SYNC and END_SYNC.
+BEGIN_SYNC = "\x1b[?2026h"
+END_SYNC = "\x1b[?2026l"
+CLEAR_SCREEN = "\x1b[H\x1b[2J"
+CLEAR_TO_EOL = "\x1b[K"
+
 alpha = [x for x in string.ascii_lowercase]
 
 TYPE_TO_COLOR = {
@@ -143,11 +161,68 @@ def calculate_4_week_start():
     return start_of_week - timedelta(weeks=weeks_into_cycle)
 
 
+class LineRenderer:
+    """
+    Draw a renderable over the whole terminal, writing only the lines that
+    differ from the previous frame.
+
+    Each frame is printed to an off-screen console of the terminal's size and
+    split into lines of ANSI text. When the size is unchanged, only the lines
+    that differ are written, each positioned with a cursor move and cleared
+    to the end of the line, in a single write wrapped in a synchronized update.
+    A resize, or invalidate() after other output, redraws everything.
+    """
+
+    def __init__(self, console: Console):
+        self.console = console
+        self.lines = []
+        self.size = None
+
+    def invalidate(self):
+        """Redraw every line on the next draw."""
+        self.size = None
+
+    def render_lines(self, renderable, width: int, height: int) -> List[str]:
+        buffer = Console(
+            file=io.StringIO(),
+            width=width,
+            height=height,
+            force_terminal=self.console.is_terminal,
+            color_system=self.console.color_system,
+            theme=Theme({}),
+        )
+        buffer.print(renderable, no_wrap=True, overflow="ellipsis", end="")
+        lines = buffer.file.getvalue().split("\n")[:height]
+        return lines + [""] * (height - len(lines))
+
+    def draw(self, renderable):
+        if not self.console.is_terminal:
+            self.console.print(renderable, no_wrap=True, overflow="ellipsis")
+            return
+        width, height = size = tuple(self.console.size)
+        lines = self.render_lines(renderable, width, height)
+        if size != self.size:
+            changed = range(height)
+            output = [CLEAR_SCREEN]
+        else:
+            changed = [i for i in range(height) if lines[i] != self.lines[i]]
+            output = []
+        for i in changed:
+            output.append(f"\x1b[{i + 1};1H{lines[i]}{CLEAR_TO_EOL}")
+        # leave the cursor at the start of the last line for the prompt
+        output.append(f"\x1b[{height};1H")
+        self.console.file.write(BEGIN_SYNC + "".join(output) + END_SYNC)
+        self.console.file.flush()
+        self.lines, self.size = lines, size
+        instrumentation.incr("rich.lines_written", len(changed))
+
+
 class FourWeekView:
     def __init__(self, controller, bindings):
         self.controller = controller  # Use the controller instead of db_manager
         self.bindings = bindings
         self.console = Console(theme=Theme({}))
+        self.renderer = LineRenderer(self.console)
         self.layout = Layout(name="root")
 
         self.layout.split_column(
@@ -168,6 +243,9 @@ class FourWeekView:
         self.afill = 1
         self.tag_to_id = {}  # Maps tag numbers to event IDs
         self.scroll_offset = 0  # Keeps track of scrolling position
+        self._display_handle = None  # pending coalesced display_panel
+        self._display_pending_since = 0.0
+        self._last_display = 0.0
         self.setup_key_bindings()
 
     def toggle_view(self, view_name: str):
@@ -177,20 +255,6 @@ class FourWeekView:
         for section in ["list", "details", "info"]:
             self.layout[section].visible = section == view_name
 
-    def bind_keys(self):
-        """
-        Bind keys dynamically based on the current `afill` value.
-        """
-        for char in "abcdefghijklmnopqrstuvwxyz":
-
-            @key_bindings.add(char)
-            def _(event, char=char):
-                self.digit_buffer.append(char)
-                if len(self.digit_buffer) == self.afill:
-                    base26_tag = "".join(self.digit_buffer)
-                    self.digit_buffer.clear()
-                    self.display_tag(base26_tag)
-
     def setup_key_bindings(self):
         """
         Set up key bindings for navigation, actions, and date selection.
@@ -236,8 +300,7 @@ class FourWeekView:
             Restore the display when Escape is pressed.
             """
             self.toggle_view("list")
-            self.console.clear()
-            self.console.print(self.layout, no_wrap=True, overflow="ellipsis")
+            self.renderer.draw(self.layout)
 
     def handle_key(self, key: str):
         """
@@ -255,7 +318,7 @@ class FourWeekView:
         """
         self.current_start_date += timedelta(weeks=4)
         self.selected_week = tuple(self.current_start_date.isocalendar()[:2])
-        self.display_panel()
+        self.schedule_display()
 
     def move_next_week(self):
         """
@@ -266,7 +329,7 @@ class FourWeekView:
             (self.current_start_date + timedelta(weeks=4) - ONEDAY).isocalendar()[:2]
         ):
             self.current_start_date += timedelta(weeks=1)
-        self.display_panel()
+        self.schedule_display()
 
     def move_previous_period(self):
         """
@@ -275,7 +338,7 @@ class FourWeekView:
         self.current_start_date -= timedelta(weeks=4)
         self.selected_week = tuple(self.current_start_date.isocalendar()[:2])
         # self.controller.refresh_display(self.current_start_date, self.selected_week)
-        self.display_panel()
+        self.schedule_display()
 
     def move_previous_week(self):
         """
@@ -285,7 +348,7 @@ class FourWeekView:
         if self.selected_week < tuple((self.current_start_date).isocalendar()[:2]):
             self.current_start_date -= timedelta(weeks=1)
         # self.controller.refresh_display(self.current_start_date, self.selected_week)
-        self.display_panel()
+        self.schedule_display()
 
     def reset_to_today(self):
         """
@@ -294,7 +357,7 @@ class FourWeekView:
         self.current_start_date = calculate_4_week_start()
         self.selected_week = tuple(datetime.now().isocalendar()[:2])
         # self.controller.refresh_display(self.current_start_date, self.selected_week)
-        self.display_panel()
+        self.schedule_display()
 
     def restore_details(self):
         """
@@ -306,6 +369,38 @@ class FourWeekView:
         # self.controller.refresh_display(self.current_start_date, self.selected_week)
         self.display_panel()
 
+    def schedule_display(self):
+        """
+        Redraw after a navigation key, coalescing key repeats.
+
+        The first key after a pause redraws at once. Keys that follow within
+        NAVIGATION_DELAY only change the target week and restart a timer on the
+        prompt_toolkit event loop so that just the final state is drawn.
+        """
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # not running under the prompt session
+            self.display_panel()
+            return
+        now = perf_counter()
+        if self._display_handle is None:
+            if now - self._last_display >= NAVIGATION_DELAY:
+                self.display_panel()
+                return
+            self._display_pending_since = now
+        else:
+            self._display_handle.cancel()
+            if now - self._display_pending_since >= NAVIGATION_MAX_DELAY:
+                self._display_handle = None
+                self.display_panel()
+                return
+        self._display_handle = loop.call_later(NAVIGATION_DELAY, self._flush_display)
+
+    def _flush_display(self):
+        self._display_handle = None
+        self.display_panel()
+
     def display_panel(self, offset=0):
         """
         Display the table for the current period and the list of items for the current selected week,
@@ -371,8 +466,8 @@ class FourWeekView:
             )
         )
 
-        self.console.clear()
-        self.console.print(self.layout, no_wrap=True, overflow="ellipsis")
+        self.renderer.draw(self.layout)
+        self._last_display = perf_counter()
 
     def display_tag(self, tag):
         tag_str = self.controller.process_tag(tag, self.selected_week)
@@ -386,8 +481,7 @@ class FourWeekView:
             )
         )
         self.toggle_view("details")
-        self.console.clear()
-        self.console.print(self.layout, no_wrap=True, overflow="ellipsis")
+        self.renderer.draw(self.layout)
 
     def quit(self):
         """
@@ -409,3 +503,7 @@ class FourWeekView:
                 session.prompt("")
             except (EOFError, KeyboardInterrupt):
                 self.quit()
+            # the prompt wrote its line and a newline, scrolling the screen,
+            # outside the renderer
+            self.renderer.invalidate()
+            self.display_panel()
@@ -0,0 +1,45 @@
+#! /usr/bin/env python3
+"""
+Show the SQL and the SQLite query plan of a find query.
+
+    python explain_find.py etm.db 'type:- loc:office after:2025-01-01 "call back"'
+    python explain_find.py etm.db 'dent /Dr\\.? Smith/' --run
+
+The statement is printed followed by its plan from EXPLAIN QUERY PLAN, where a
+SEARCH step looks rows up in an index and a SCAN step reads every row of a
+table. With --run, the query is also run and the number of records found and
+the time taken are printed.
+"""
+
+import argparse
+import os
+import sys
+from time import perf_counter
+
+from etm.model import DatabaseManager
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("db", help="the etm database")
+    parser.add_argument("query", help="the find query, see etm/query.py")
+    parser.add_argument("--run", action="store_true", help="also run the query")
+    args = parser.parse_args()
+    if not os.path.exists(args.db):
+        parser.error(f"no such database: {args.db}")
+
+    db_manager = DatabaseManager(args.db, read_only=True)
+    try:
+        lines = db_manager.explain_find(args.query)
+    except ValueError as e:
+        sys.exit(f"invalid query: {e}")
+    print("\n".join(lines))
+    if args.run:
+        start = perf_counter()
+        count = len(db_manager.find_records(args.query))
+        print(f"\n{count} records in {(perf_counter() - start) * 1000:.1f} ms")
+    db_manager.close()
+
+
+if __name__ == "__main__":
+    main()